@@ -10,6 +10,9 @@ import logging
 import asyncio
 from utils.database import DatabaseManager
 print("Imported DatabaseManager")
+from utils.sheets import SheetsManager
+print("Imported SheetsManager")
+from utils.outbox import DMOutbox, PermanentDeliveryError
 from utils.logger import setup_logger
 print("Imported setup_logger")
 
@@ -30,15 +33,33 @@ class RPGBot(commands.Bot):
             intents=intents,
             help_command=None
         )
-        self.db_manager = DatabaseManager()
+        self.db_manager = DatabaseManager(group_commit=config.DB_GROUP_COMMIT, readers=config.DB_READERS)
+        # 모든 Cog가 공유하는 단일 SheetsManager (인증/캐시 1회)
+        self.sheets = SheetsManager()
+        # DM 알림 전송함 (DB에 기록 후 백그라운드 전송)
+        self.outbox = DMOutbox(self.db_manager, self.send_dm, concurrency=config.DM_CONCURRENCY)
         self.investigation_data = {}
 
+    async def send_dm(self, user_id, content, embeds):
+        """DM 전송함에서 호출 - 유저에게 DM 1건 전송"""
+        await self.wait_until_ready()
+        try:
+            user = self.get_user(user_id) or await self.fetch_user(user_id)
+            await user.send(content=content, embeds=[discord.Embed.from_dict(e) for e in embeds])
+        except (discord.Forbidden, discord.NotFound) as e:
+            raise PermanentDeliveryError(str(e)) from e
+
     async def setup_hook(self):
         print("Starting setup_hook...")
         # 1. DB 초기화
         print("Initializing database...")
         await self.db_manager.initialize()
         print("Database initialized.")
+        # 스탯 캐시 갱신 시 character_stats 미러도 갱신
+        self.sheets.attach_db(self.db_manager)
+        # 재시작 전에 남은 DM 포함 전송 시작
+        self.outbox.start()
+        self.outbox.notify()
         
         # 2. Cog 로드
         print("Loading cogs...")
@@ -66,6 +87,7 @@ class RPGBot(commands.Bot):
 
     async def close(self):
         print("Closing bot...")
+        self.outbox.stop()
         await self.db_manager.close()
         await super().close()
 
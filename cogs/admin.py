@@ -1,8 +1,9 @@
 import discord
 from discord.ext import commands, tasks
 from discord import Interaction, app_commands
-from utils.sheets import SheetsManager
 from utils.diagnostics import SelfDiagnostics
+from utils.sheets import MASTER_DATA_REFRESH_MINUTES
+from utils.quota import background_priority
 import config
 import logging
 import datetime
@@ -12,13 +13,15 @@ logger = logging.getLogger('cogs.admin')
 class Admin(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.sheets = SheetsManager()
+        self.sheets = bot.sheets
         # 봇 시작 시 초기 데이터 로드 (비동기)
         self.bot.loop.create_task(self.perform_sync())
         self.sync_task.start()
+        self.master_data_refresh_task.start()
 
     def cog_unload(self):
         self.sync_task.cancel()
+        self.master_data_refresh_task.cancel()
 
     def check_admin_permission(self, user: discord.User):
         """유저가 관리자 권한(ID 또는 Admin 역할)을 가지고 있는지 확인"""
@@ -39,7 +42,8 @@ class Admin(commands.Cog):
         logger.info("Starting scheduled data sync (03:00 AM)...")
         
         # 자동 작업이므로 권한 체크 불필요 (시스템이 수행)
-        success = await self.perform_sync()
+        with background_priority():
+            success = await self.perform_sync()
         
         if success:
             data_count = len(self.bot.investigation_data) if self.bot.investigation_data else 0
@@ -47,6 +51,19 @@ class Admin(commands.Cog):
         else:
             logger.error("❌ Scheduled sync failed.")
 
+    @tasks.loop(minutes=MASTER_DATA_REFRESH_MINUTES)
+    async def master_data_refresh_task(self):
+        """마스터 데이터(아이템 카탈로그, 관리자 권한 등)를 주기적으로 갱신합니다."""
+        try:
+            with background_priority():
+                await self.sheets.load_master_data_snapshot_async()
+        except Exception as e:
+            logger.error(f"Master data refresh failed: {e}")
+
+    @master_data_refresh_task.before_loop
+    async def before_master_data_refresh(self):
+        await self.bot.wait_until_ready()
+
     @app_commands.command(name="동기화", description="[관리자] 구글 시트 데이터를 동기화합니다.")
     async def sheet_sync(self, interaction: discord.Interaction):
         """
@@ -72,14 +89,17 @@ class Admin(commands.Cog):
         try:
             # 1. 시트 데이터 가져오기 & 캐시 저장
             # 메타데이터, 스탯, 조사 데이터 등을 모두 갱신
-            await self.sheets.get_metadata_map_async() 
+            # Spreadsheet B 마스터 데이터는 batchGet 1회로 일괄 갱신
+            await self.sheets.load_master_data_snapshot_async()
+            # 스탯은 DB character_stats 테이블에도 미러링
             await self.sheets.fetch_all_stats_async()
-            await self.sheets.get_item_data_async("dummy") # 캐시 웜업용
-            await self.sheets.get_madness_data_async()
             
             # 조사 데이터 갱신 및 봇 인스턴스에 적용
             data = await self.sheets.fetch_investigation_data_async()
             self.bot.investigation_data = data
+            # 새로 컴파일된 조사 그래프의 채널 연결도 동기화 시점에 갱신
+            if self.bot.guilds:
+                self.sheets.investigation_graph.bind_channels(self.bot.guilds[0])
             
             # DB 동기화 (시트 -> DB 허기 정보 등)
             # Admin cog doesn't have direct access to Survival cog's DB easily if not initialized
@@ -134,7 +154,15 @@ class Admin(commands.Cog):
             sheet_status = f"❌ 오류: {str(e)}"
             sheet_latency = "N/A"
 
-        # 5. 종합 진단
+        # 5. API 할당량 현황
+        quota = self.sheets.quota.snapshot()
+        quota_status = (
+            f"읽기: {quota['read']['available']}/{quota['read']['capacity']}\n"
+            f"쓰기: {quota['write']['available']}/{quota['write']['capacity']}\n"
+            f"429 발생: {quota['throttled']}회"
+        )
+
+        # 6. 종합 진단
         diagnostics = SelfDiagnostics(self.sheets)
         report = diagnostics.run_all_tests()
         
@@ -143,6 +171,7 @@ class Admin(commands.Cog):
         embed.add_field(name="🤖 봇 상태", value=f"Latency: {bot_latency}ms", inline=True)
         embed.add_field(name="📊 구글 시트", value=f"{sheet_status}\nPing: {sheet_latency}", inline=True)
         embed.add_field(name="💾 캐시", value=cache_status, inline=True)
+        embed.add_field(name="📶 API 할당량 (분당)", value=quota_status, inline=True)
         
         embed.add_field(name="📈 데이터 현황", value=f"스탯: {stats_count}명 | 지역: {investigation_count}개", inline=False)
         
@@ -2,7 +2,6 @@ import discord
 from discord.ext import commands, tasks
 from discord import app_commands
 from utils.game_logic import GameLogic
-from utils.sheets import SheetsManager
 import logging
 
 logger = logging.getLogger('cogs.clues')
@@ -14,7 +13,9 @@ import discord
 from discord.ext import commands, tasks
 from discord import app_commands
 from utils.game_logic import GameLogic
-from utils.sheets import SheetsManager
+from utils.clue_combiner import ClueCombinationIndex
+from utils.sheets import MASTER_DATA_REFRESH_MINUTES
+from utils.quota import background_priority
 import logging
 
 logger = logging.getLogger('cogs.clues')
@@ -22,28 +23,55 @@ logger = logging.getLogger('cogs.clues')
 class Clues(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.sheets = SheetsManager()
-        self.check_combinations_task.start()
+        self.sheets = bot.sheets
+        # 단서 ID -> 레시피 역색인 (레시피 갱신 시 재컴파일)
+        self.combinations = ClueCombinationIndex(self.sheets.cached_data.get('clue_combinations', []))
+        self.refresh_recipes_task.start()
     
     def cog_unload(self):
-        self.check_combinations_task.cancel()
+        self.refresh_recipes_task.cancel()
     
-    @tasks.loop(minutes=5)
-    async def check_combinations_task(self):
-        """5분마다 모든 유저의 정보 조합 가능성 체크"""
+    @tasks.loop(minutes=MASTER_DATA_REFRESH_MINUTES)
+    async def refresh_recipes_task(self):
+        """
+        단서 조합 레시피를 주기적으로 다시 컴파일합니다.
+        레시피 내용이 바뀐 경우에만 전체 유저를 1회 재검사합니다.
+        """
         try:
-            db = self.bot.db_manager
+            with background_priority():
+                recipes = await self.sheets.get_clue_combinations_async()
+            previous = self.combinations.signature
+            self.combinations = ClueCombinationIndex(recipes)
             
+            if self.combinations.signature == previous:
+                return
+            
+            logger.info(f"Clue recipes changed ({len(self.combinations.recipes)} recipes). Re-checking all users.")
+            db = self.bot.db_manager
             users = await db.fetch_all("SELECT DISTINCT user_id FROM user_clues")
             
             for (user_id,) in users:
                 await self.check_user_combinations(user_id)
         except Exception as e:
-            logger.error(f"Error in check_combinations_task: {e}")
+            logger.error(f"Error in refresh_recipes_task: {e}")
 
-    async def check_user_combinations(self, user_id):
+    @refresh_recipes_task.before_loop
+    async def before_refresh_recipes(self):
+        await self.bot.wait_until_ready()
+
+    async def on_clue_added(self, user_id, clue_id):
+        """
+        유저가 단서를 획득했을 때 호출됩니다.
+        해당 단서를 재료로 쓰는 레시피만 검사하여 즉시 조합합니다.
+        """
+        if not self.combinations.recipes_for(clue_id):
+            return
+        await self.check_user_combinations(user_id, clue_id)
+
+    async def check_user_combinations(self, user_id, new_clue_id=None):
         """
         유저의 단서 조합을 확인하고, 조건을 만족하면 새로운 단서나 아이템을 지급합니다.
+        new_clue_id가 주어지면 그 단서가 포함된 레시피만 검사합니다.
         """
         try:
             # 1. 유저가 보유한 단서 목록 조회 (DB)
@@ -54,69 +82,65 @@ class Clues(commands.Cog):
             # 조회된 튜플 리스트를 set으로 변환하여 검색 속도를 높입니다. (예: {'clue_A', 'clue_B'})
             user_clues = set(row[0] for row in user_clues_data)
             
-            # 2. 단서 조합 레시피 조회 (Google Sheets)
-            # SheetsManager를 통해 정의된 조합식을 가져옵니다.
-            recipes = await self.sheets.get_clue_combinations_async()
+            # 2. 완성된 레시피 조회 (역색인)
+            # 레시피 구조: 
+            # {
+            #   "recipe_id": "comb_001", 
+            #   "required_clues": ["clue_A", "clue_B"], 
+            #   "required": frozenset({"clue_A", "clue_B"}),
+            #   "result_type": "단서", 
+            #   "result_id": "clue_C", 
+            #   "message": "두 단서를 조합하여 새로운 사실을 알게 되었습니다!"
+            # }
+            completed = self.combinations.find_completed(user_clues, new_clue_id)
             
-            # 3. 각 레시피 검사
-            for recipe in recipes:
-                # 레시피 구조: 
-                # {
-                #   "recipe_id": "comb_001", 
-                #   "required_clues": ["clue_A", "clue_B"], 
-                #   "result_type": "단서", 
-                #   "result_id": "clue_C", 
-                #   "message": "두 단서를 조합하여 새로운 사실을 알게 되었습니다!"
-                # }
-                
-                required = set(recipe['required_clues'])
+            # 3. 각 레시피 보상 지급
+            for recipe in completed:
+                required = recipe['required']
                 
-                # 3-1. 필요 단서를 모두 가지고 있는지 확인 (부분집합 여부 확인)
-                if required.issubset(user_clues):
-                    
-                    # 3-2. 이미 보상을 받았는지 확인 (중복 지급 방지)
-                    if recipe['result_type'] == '단서':
-                        # 결과 단서를 이미 가지고 있는지 확인
-                        if recipe['result_id'] in user_clues:
-                            continue # 이미 가지고 있으면 스킵
-                            
-                        # 보상 지급: 단서 추가
-                        await db.execute_query(
-                            "INSERT INTO user_clues (user_id, clue_id, clue_name) VALUES (?, ?, ?)",
-                            (user_id, recipe['result_id'], recipe['result_id']) # 이름은 ID와 동일하게 처리하거나 별도 조회 필요
-                        )
-                        logger.info(f"User {user_id} combined clues {required} -> New Clue: {recipe['result_id']}")
-                        
-                    elif recipe['result_type'] == '아이템':
-                        # 결과 아이템을 이미 가지고 있는지 확인 (인벤토리 조회)
-                        has_item = await db.fetch_one(
-                            "SELECT count FROM user_inventory WHERE user_id = ? AND item_name = ?",
-                            (user_id, recipe['result_id'])
-                        )
-                        if has_item and has_item[0] > 0:
-                            continue # 이미 가지고 있으면 스킵 (아이템은 중복 소지 가능하게 할지 기획에 따라 다르나, 보통 조합 이벤트는 1회성)
+                # 3-1. 이미 보상을 받았는지 확인 (중복 지급 방지)
+                if recipe['result_type'] == '단서':
+                    # 결과 단서를 이미 가지고 있는지 확인
+                    if recipe['result_id'] in user_clues:
+                        continue # 이미 가지고 있으면 스킵
                         
-                        # 보상 지급: 아이템 추가
-                        await db.execute_query(
-                            "INSERT INTO user_inventory (user_id, item_name, count) VALUES (?, ?, 1) "
-                            "ON CONFLICT(user_id, item_name) DO UPDATE SET count = count + 1",
-                            (user_id, recipe['result_id'])
-                        )
-                        logger.info(f"User {user_id} combined clues {required} -> New Item: {recipe['result_id']}")
+                    # 보상 지급: 단서 추가
+                    await db.execute_query(
+                        "INSERT INTO user_clues (user_id, clue_id, clue_name) VALUES (?, ?, ?)",
+                        (user_id, recipe['result_id'], recipe['result_id']) # 이름은 ID와 동일하게 처리하거나 별도 조회 필요
+                    )
+                    user_clues.add(recipe['result_id'])
+                    logger.info(f"User {user_id} combined clues {set(required)} -> New Clue: {recipe['result_id']}")
                     
-                    # 4. 유저에게 알림 전송
-                    user = self.bot.get_user(user_id)
-                    if user:
-                        try:
-                            embed = discord.Embed(
-                                title="🧩 단서 조합 성공!",
-                                description=f"{recipe['message']}\n\n**획득**: {recipe['result_id']} ({recipe['result_type']})",
-                                color=0x9b59b6 # 보라색
-                            )
-                            await user.send(embed=embed)
-                        except discord.Forbidden:
-                            logger.warning(f"Cannot send DM to user {user_id}")
-                            
+                elif recipe['result_type'] == '아이템':
+                    # 결과 아이템을 이미 가지고 있는지 확인 (인벤토리 조회)
+                    has_item = await db.fetch_one(
+                        "SELECT count FROM user_inventory WHERE user_id = ? AND item_name = ?",
+                        (user_id, recipe['result_id'])
+                    )
+                    if has_item and has_item[0] > 0:
+                        continue # 이미 가지고 있으면 스킵 (아이템은 중복 소지 가능하게 할지 기획에 따라 다르나, 보통 조합 이벤트는 1회성)
+                    
+                    # 보상 지급: 아이템 추가
+                    await db.execute_query(
+                        "INSERT INTO user_inventory (user_id, item_name, count) VALUES (?, ?, 1) "
+                        "ON CONFLICT(user_id, item_name) DO UPDATE SET count = count + 1",
+                        (user_id, recipe['result_id'])
+                    )
+                    logger.info(f"User {user_id} combined clues {set(required)} -> New Item: {recipe['result_id']}")
+                
+                # 4. 유저에게 알림 (DM 전송함)
+                embed = discord.Embed(
+                    title="🧩 단서 조합 성공!",
+                    description=f"{recipe['message']}\n\n**획득**: {recipe['result_id']} ({recipe['result_type']})",
+                    color=0x9b59b6 # 보라색
+                )
+                await self.bot.outbox.enqueue(user_id, embed=embed.to_dict())
+                
+                # 5. 조합으로 얻은 단서가 다른 레시피의 재료라면 연쇄 검사
+                if recipe['result_type'] == '단서' and self.combinations.recipes_for(recipe['result_id']):
+                    await self.check_user_combinations(user_id, recipe['result_id'])
+                        
         except Exception as e:
             logger.error(f"Error checking combinations for user {user_id}: {e}")
 
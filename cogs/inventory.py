@@ -1,7 +1,7 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
-from utils.sheets import SheetsManager
+from utils.quota import background_priority
 import logging
 import asyncio
 from typing import Literal
@@ -13,7 +13,7 @@ logger = logging.getLogger('cogs.inventory')
 class Inventory(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.sheets = SheetsManager()
+        self.sheets = bot.sheets
         self.db = self.bot.db_manager
         self.inventory_sync_task.start()
 
@@ -28,8 +28,14 @@ class Inventory(commands.Cog):
     @tasks.loop(minutes=1.0)
     async def inventory_sync_task(self):
         """1분마다 DB 인벤토리를 시트로 동기화"""
+        # 플레이어 요청이 할당량을 쓰고 있으면 이번 주기는 양보
+        if self.sheets.quota.should_yield('read') or self.sheets.quota.should_yield('write'):
+            logger.debug("Sheets quota is low. Skipping this inventory sync cycle.")
+            return
+        
         logger.debug("Running periodic inventory sync (DB -> Sheet)...")
-        await self.sheets.sync_db_inventory_to_sheet_async(self.db)
+        with background_priority():
+            await self.sheets.sync_db_inventory_to_sheet_async(self.db)
 
     @inventory_sync_task.before_loop
     async def before_inventory_sync(self):
@@ -75,15 +81,16 @@ class Inventory(commands.Cog):
                 await interaction.followup.send(f"❌ {msg}", ephemeral=True)
                 return
 
-            # 3. DB 업데이트 (유저 인벤토리 차감)
-            await self.db.execute_query("UPDATE user_inventory SET count = count - ? WHERE user_id = ? AND item_name = ?", (count, user_id, item))
-            await self.db.execute_query("DELETE FROM user_inventory WHERE user_id = ? AND count <= 0", (user_id,))
-            
-            # 4. DB 창고 테이블 업데이트 (싱크용)
-            await self.db.execute_query(
-                "INSERT INTO warehouse (item_name, item_type, count) VALUES (?, ?, ?) ON CONFLICT(item_name) DO UPDATE SET count = count + ?",
-                (item, item_type, count, count)
-            )
+            async with self.db.transaction():
+                # 3. DB 업데이트 (유저 인벤토리 차감)
+                await self.db.execute_query("UPDATE user_inventory SET count = count - ? WHERE user_id = ? AND item_name = ?", (count, user_id, item))
+                await self.db.execute_query("DELETE FROM user_inventory WHERE user_id = ? AND count <= 0", (user_id,))
+                
+                # 4. DB 창고 테이블 업데이트 (싱크용)
+                await self.db.execute_query(
+                    "INSERT INTO warehouse (item_name, item_type, count) VALUES (?, ?, ?) ON CONFLICT(item_name) DO UPDATE SET count = count + ?",
+                    (item, item_type, count, count)
+                )
             
             await interaction.followup.send(f"✅ {item} {count}개를 창고에 보관했습니다.", ephemeral=True)
 
@@ -96,15 +103,16 @@ class Inventory(commands.Cog):
                 await interaction.followup.send(f"❌ {msg}", ephemeral=True)
                 return
 
-            # 2. DB 업데이트 (유저 인벤토리 추가)
-            await self.db.execute_query(
-                "INSERT INTO user_inventory (user_id, item_name, count) VALUES (?, ?, ?) ON CONFLICT(user_id, item_name) DO UPDATE SET count = count + ?",
-                (user_id, item, count, count)
-            )
-            
-            # 3. DB 창고 테이블 업데이트 (싱크용)
-            await self.db.execute_query("UPDATE warehouse SET count = count - ? WHERE item_name = ?", (count, item))
-            await self.db.execute_query("DELETE FROM warehouse WHERE count <= 0", ())
+            async with self.db.transaction():
+                # 2. DB 업데이트 (유저 인벤토리 추가)
+                await self.db.execute_query(
+                    "INSERT INTO user_inventory (user_id, item_name, count) VALUES (?, ?, ?) ON CONFLICT(user_id, item_name) DO UPDATE SET count = count + ?",
+                    (user_id, item, count, count)
+                )
+                
+                # 3. DB 창고 테이블 업데이트 (싱크용)
+                await self.db.execute_query("UPDATE warehouse SET count = count - ? WHERE item_name = ?", (count, item))
+                await self.db.execute_query("DELETE FROM warehouse WHERE count <= 0", ())
             
             await interaction.followup.send(f"✅ {item} {count}개를 창고에서 불출했습니다.", ephemeral=True)
 
@@ -131,7 +139,7 @@ class Inventory(commands.Cog):
         receiver_id = target_user.id
         
         # 관리자 여부 확인
-        is_admin = await asyncio.to_thread(self.sheets.get_admin_permission, sender_id)
+        is_admin = self.sheets.get_admin_permission(sender_id)
         
         if is_admin:
             # 관리자: 아이템 생성 지급
@@ -141,33 +149,38 @@ class Inventory(commands.Cog):
                 await interaction.followup.send(f"❌ '{item}'은(는) 존재하지 않는 아이템입니다. 아이템 데이터 시트를 확인해주세요.", ephemeral=True)
                 return
             
-            # 2. 지급 처리 (DB 추가)
+            # 2. 지급 처리 (DB 추가) - 입력값이 아닌 카탈로그 이름으로 저장 (공백/ID 입력 대비)
+            item_name = item_data['name']
             await self.db.execute_query(
                 "INSERT INTO user_inventory (user_id, item_name, count) VALUES (?, ?, ?) ON CONFLICT(user_id, item_name) DO UPDATE SET count = count + ?",
-                (receiver_id, item, count, count)
+                (receiver_id, item_name, count, count)
             )
             
-            await interaction.followup.send(f"✅ [관리자] {target_user.display_name}님에게 {item} {count}개를 지급했습니다.", ephemeral=True)
+            await interaction.followup.send(f"✅ [관리자] {target_user.display_name}님에게 {item_name} {count}개를 지급했습니다.", ephemeral=True)
             
         else:
             # 일반 유저: 거래
-            # 1. 보내는 사람 인벤토리 확인
-            sender_item = await self.db.fetch_one("SELECT count FROM user_inventory WHERE user_id = ? AND item_name = ?", (sender_id, item))
-            if not sender_item or sender_item[0] < count:
+            # 확인/차감/지급을 한 트랜잭션(커밋 1회)으로 처리 - 동시 거래로 수량이 음수가 되지 않음
+            async with self.db.transaction():
+                # 1. 보내는 사람 인벤토리 확인
+                sender_item = await self.db.fetch_one("SELECT count FROM user_inventory WHERE user_id = ? AND item_name = ?", (sender_id, item))
+                enough = bool(sender_item) and sender_item[0] >= count
+                
+                if enough:
+                    # 2. 보내는 사람 차감
+                    await self.db.execute_query("UPDATE user_inventory SET count = count - ? WHERE user_id = ? AND item_name = ?", (count, sender_id, item))
+                    await self.db.execute_query("DELETE FROM user_inventory WHERE user_id = ? AND count <= 0", (sender_id,))
+                    
+                    # 3. 받는 사람 추가
+                    await self.db.execute_query(
+                        "INSERT INTO user_inventory (user_id, item_name, count) VALUES (?, ?, ?) ON CONFLICT(user_id, item_name) DO UPDATE SET count = count + ?",
+                        (receiver_id, item, count, count)
+                    )
+            
+            if not enough:
                 await interaction.followup.send("❌ 인벤토리에 아이템이 부족합니다.", ephemeral=True)
                 return
             
-            # 2. 트랜잭션 처리
-            # 보내는 사람 차감
-            await self.db.execute_query("UPDATE user_inventory SET count = count - ? WHERE user_id = ? AND item_name = ?", (count, sender_id, item))
-            await self.db.execute_query("DELETE FROM user_inventory WHERE user_id = ? AND count <= 0", (sender_id,))
-            
-            # 받는 사람 추가
-            await self.db.execute_query(
-                "INSERT INTO user_inventory (user_id, item_name, count) VALUES (?, ?, ?) ON CONFLICT(user_id, item_name) DO UPDATE SET count = count + ?",
-                (receiver_id, item, count, count)
-            )
-            
             await interaction.followup.send(f"✅ {target_user.display_name}님에게 {item} {count}개를 보냈습니다.", ephemeral=True)
 
     # Autocompletes
@@ -192,7 +205,7 @@ class Inventory(commands.Cog):
 
     @trade.autocomplete('item')
     async def trade_item_autocomplete(self, interaction: discord.Interaction, current: str):
-        is_admin = await asyncio.to_thread(self.sheets.get_admin_permission, interaction.user.id)
+        is_admin = self.sheets.get_admin_permission(interaction.user.id)
         
         if is_admin:
             # 관리자는 모든 아이템 (캐시된 아이템 데이터 기준)
@@ -2,18 +2,24 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 from utils.game_logic import GameLogic
-from utils.sheets import SheetsManager
 from utils.condition_parser import ConditionParser
 from utils.effect_parser import EffectParser
+from utils.user_state import STAT_FIELDS
 import logging
-import asyncio
 import datetime
 import config
 import json
 import random
+import uuid
+from utils.scheduler import TimerScheduler
 
 logger = logging.getLogger('cogs.investigation')
 
+# 예약 시각이 이만큼 지난 예약은 재시작 시 시작하지 않고 만료 처리
+RESERVATION_GRACE = datetime.timedelta(minutes=10)
+RESERVATION_NOTICE = datetime.timedelta(minutes=5)
+RESERVATION_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
 class InvestigationSession:
     def __init__(self, leader_id, channel_id, members, location_name, scheduled_time):
         self.leader_id = leader_id
@@ -118,11 +124,12 @@ class GatheringTimeoutView(discord.ui.View):
         self.stop()
 
 class InvestigationInteractionView(discord.ui.View):
-    def __init__(self, cog, session, node):
+    def __init__(self, cog, session, node, leader_state):
         super().__init__(timeout=900)
         self.cog = cog
         self.session = session
         self.node = node
+        self.leader_state = leader_state # 버튼 조건 판정용 리더 상태 (show_location에서 1회 조회)
         self.message = None
         self.generate_buttons()
 
@@ -137,24 +144,19 @@ class InvestigationInteractionView(discord.ui.View):
 
     def generate_buttons(self):
         world_state = self.cog.get_world_state(self.session)
-        investigation_data = self.cog.sheets.cached_data.get('investigation', {})
-        category_root = investigation_data.get(self.session.location_name)
-        
-        if category_root and self.node.get("id") != category_root.get("id"):
-            parent = self.cog.find_parent_node(category_root, self.node.get("id"))
-            if parent:
-                back_btn = discord.ui.Button(label="◀️ 돌아가기", style=discord.ButtonStyle.secondary, row=4)
-                back_btn.callback = self.create_move_callback(parent)
-                self.add_item(back_btn)
+        # 상위 장소는 컴파일된 그래프에서 바로 조회 (지역 루트는 부모 없음)
+        parent = self.cog.sheets.investigation_graph.parent(self.node.get("id"))
+        if parent:
+            back_btn = discord.ui.Button(label="◀️ 돌아가기", style=discord.ButtonStyle.secondary, row=4)
+            back_btn.callback = self.create_move_callback(parent)
+            self.add_item(back_btn)
 
         if "children" in self.node:
             for child_name, child_data in self.node["children"].items():
                 # 하위 지역 진입 조건 확인 (block 등)
                 if "condition" in child_data and child_data["condition"]:
                     conds = ConditionParser.parse_condition_string(child_data["condition"])
-                    leader_id = self.session.members[0]
-                    leader_state = self.cog.get_user_state(leader_id)
-                    check = ConditionParser.evaluate_all(conds, leader_state, world_state)
+                    check = ConditionParser.evaluate_all(conds, self.leader_state, world_state)
                     
                     if not check["visible"]:
                         continue # 버튼 숨김
@@ -168,12 +170,9 @@ class InvestigationInteractionView(discord.ui.View):
                 visible = False
                 enabled = False
                 
-                leader_id = self.session.members[0]
-                leader_state = self.cog.get_user_state(leader_id)
-                
                 for variant in item["variants"]:
                     conds = ConditionParser.parse_condition_string(variant["condition"])
-                    check = ConditionParser.evaluate_all(conds, leader_state, world_state)
+                    check = ConditionParser.evaluate_all(conds, self.leader_state, world_state)
                     if check["visible"]:
                         visible = True
                         if check["enabled"]:
@@ -203,9 +202,9 @@ class InvestigationInteractionView(discord.ui.View):
             
             # A열 장소(최상위)이고 하위 장소가 없는 경우 -> 채널 이동
             if target_node.get("is_channel", False) and not target_node.get("children"):
-                # 해당 이름의 채널 찾기
+                # 노드에 연결된 채널 찾기
                 guild = interaction.guild
-                target_channel = discord.utils.get(guild.channels, name=target_node["name"])
+                target_channel = self.cog.sheets.investigation_graph.channel_for(guild, target_node)
                 if target_channel:
                     await interaction.response.send_message(f"🏃 {target_channel.mention}으로 이동합니다!", ephemeral=True)
                     # 이동한 채널에서 조사 UI 출력
@@ -234,7 +233,7 @@ class InvestigationInteractionView(discord.ui.View):
             self.disable_all_items()
             await interaction.response.edit_message(view=self)
 
-            user_state = self.cog.get_user_state(interaction.user.id)
+            user_state = await self.cog.get_user_state(interaction.user.id)
             world_state = self.cog.get_world_state(self.session)
             world_state['current_item_id'] = f"{self.node['id']}_{item['name']}"
             
@@ -271,17 +270,21 @@ class InvestigationInteractionView(discord.ui.View):
                     costs.append((res_name, int(amount)))
 
             db = self.cog.survival_db
-            if consumed_items:
-                for it in consumed_items:
-                    await db.execute_query("UPDATE user_inventory SET count = count - 1 WHERE user_id = ? AND item_name = ?", (interaction.user.id, it))
-                    await db.execute_query("DELETE FROM user_inventory WHERE user_id = ? AND item_name = ? AND count <= 0", (interaction.user.id, it))
+            deltas = {}
+            for res, amt in costs:
+                deltas[res] = deltas.get(res, 0) - amt
+            # 스탯 상한(시트 캐시)은 트랜잭션 밖에서 미리 조회 - 트랜잭션에는 SQL만 포함
+            limits = await self.cog.stat_limits([interaction.user.id]) if deltas else {}
             
-            if costs:
-                for res, amt in costs:
-                    col_map = {"hp": "current_hp", "sanity": "current_sanity", "hunger": "current_hunger"}
-                    col = col_map.get(res)
-                    if col:
-                        await db.execute_query(f"UPDATE user_state SET {col} = {col} - ? WHERE user_id = ?", (amt, interaction.user.id))
+            # 아이템 소모와 비용 차감은 커밋 1회로 함께 반영
+            async with db.transaction():
+                if consumed_items:
+                    for it in consumed_items:
+                        await db.execute_query("UPDATE user_inventory SET count = count - 1 WHERE user_id = ? AND item_name = ?", (interaction.user.id, it))
+                        await db.execute_query("DELETE FROM user_inventory WHERE user_id = ? AND item_name = ? AND count <= 0", (interaction.user.id, it))
+                
+                if deltas:
+                    await self.cog.apply_stat_changes({interaction.user.id: deltas}, update_nicknames=False, limits=limits)
 
             i_type = item["type"]
             
@@ -351,12 +354,7 @@ class RitualChoiceView(discord.ui.View):
     async def process_forfeit(self, interaction: discord.Interaction, stat, cost_type, cost_val):
         self.forfeit_stat = stat
         user_id = interaction.user.id
-        db = self.cog.survival_db
-        
-        col_map = {"hp": "current_hp", "sanity": "current_sanity", "hunger": "current_hunger"}
-        col = col_map.get(cost_type)
-        if col:
-            await db.execute_query(f"UPDATE user_state SET {col} = {col} - ? WHERE user_id = ?", (cost_val, user_id))
+        await self.cog.apply_stat_changes({user_id: {cost_type: -cost_val}})
             
         await interaction.response.send_message(f"⚠️ {cost_type} {cost_val} 감소! {stat} 판정을 제외하고 의례를 진행합니다.")
         self.stop()
@@ -400,9 +398,10 @@ class CombatView(discord.ui.View):
 class Investigation(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.sheets = SheetsManager()
+        self.sheets = bot.sheets
         self.sessions = {} 
-        self.reservations = []
+        # 조사 예약: investigation_sessions 테이블 + 단일 타이머 스케줄러
+        self.scheduler = TimerScheduler(self.on_reservation_event)
         self.active_investigations = {}
         self.db = None 
 
@@ -413,12 +412,69 @@ class Investigation(commands.Cog):
             if cog: self.db = cog.db
         return self.db
 
-    def get_user_state(self, user_id):
-        stats = self.sheets.get_user_stats(discord_id=str(user_id)) or {}
+    async def cog_load(self):
+        self.scheduler.start()
+        await self.restore_reservations()
+
+    def cog_unload(self):
+        self.scheduler.stop()
+
+    async def restore_reservations(self):
+        """재시작 시 DB에 남은 조사 예약으로 스케줄러 재구성"""
+        db = self.bot.db_manager
+        rows = await db.fetch_all(
+            "SELECT session_id, scheduled_at, notified FROM investigation_sessions WHERE state = 'scheduled'"
+        )
+        now = datetime.datetime.now()
+        expired = []
+        for session_id, scheduled_at, notified in rows:
+            target_time = datetime.datetime.strptime(scheduled_at, RESERVATION_TIME_FORMAT)
+            if target_time < now - RESERVATION_GRACE:
+                expired.append((session_id,))
+                continue
+            self.schedule_reservation(session_id, target_time, notified)
+        
+        if expired:
+            await db.executemany("UPDATE investigation_sessions SET state = 'expired' WHERE session_id = ?", expired)
+        logger.info(f"Restored {len(rows) - len(expired)} investigation reservations ({len(expired)} expired)")
+
+    def schedule_reservation(self, session_id, target_time, notified=False):
+        """예약 알림(5분 전)과 시작 이벤트 등록"""
+        if not notified:
+            self.scheduler.schedule(target_time - RESERVATION_NOTICE, session_id, "notify")
+        self.scheduler.schedule(target_time, session_id, "start")
+
+    async def stat_limits(self, user_ids):
+        """스탯 상한 조회 (트랜잭션을 열기 전에 호출)"""
+        cog = self.bot.get_cog("Survival")
+        if not cog: return {}
+        return await cog.stat_limits(user_ids)
+
+    async def apply_stat_changes(self, changes, update_nicknames=True, limits=None):
+        """스탯 변화량 적용 (Survival의 공통 스탯 변경 엔진 사용)"""
+        cog = self.bot.get_cog("Survival")
+        if not cog: return {}
+        return await cog.apply_stat_changes(changes, update_nicknames=update_nicknames, limits=limits)
+
+    async def get_user_state(self, user_id):
+        """조건 판정용 유저 상태 (시트 스탯 + 메모리 유저 상태 + 인벤토리)"""
+        stats = await self.sheets.get_user_stats_async(discord_id=str(user_id)) or {}
+        db = self.bot.db_manager
+        record = await db.user_states.find(user_id)
+        
+        if record:
+            # lazy 모드면 경과 시간을 반영한 현재 허기/정신력
+            hunger, sanity = db.user_states.live_values(record, stats)
+            hp, pollution = record.hp, record.pollution or 0
+        else:
+            # 아직 상태가 없는 유저는 생성 시 초기값과 같은 값으로 판정
+            hp, sanity, hunger, pollution = stats.get('hp', 100), stats.get('sanity', 80), 50, 0
+        
+        inventory = await db.fetch_all("SELECT item_name FROM user_inventory WHERE user_id = ? AND count > 0", (user_id,))
         return {
             "stats": stats,
-            "inventory": [], 
-            "hp": 100, "sanity": 100, "hunger": 100, "pollution": 0, 
+            "inventory": [row[0] for row in inventory],
+            "hp": hp, "sanity": sanity, "hunger": hunger, "pollution": pollution,
             "skills": []
         }
 
@@ -432,14 +488,6 @@ class Investigation(commands.Cog):
             "current_item_id": ""
         }
     
-    def find_parent_node(self, root_node, target_node_id):
-        if "children" not in root_node: return None
-        for child_name, child_node in root_node["children"].items():
-            if child_node.get("id") == target_node_id: return root_node
-            parent = self.find_parent_node(child_node, target_node_id)
-            if parent: return parent
-        return None
-
     async def category_autocomplete(self, interaction: discord.Interaction, current: str) -> list[app_commands.Choice[str]]:
         guild = interaction.guild
         if not guild: return []
@@ -476,14 +524,15 @@ class Investigation(commands.Cog):
             await interaction.followup.send(f"❌ '{category}' 카테고리 또는 채널을 찾을 수 없습니다.", ephemeral=True)
             return
 
-        reservation = {
-            'leader_id': interaction.user.id,
-            'members': members,
-            'time': target_time,
-            'category': category,
-            'channel_id': target_category.channels[0].id
-        }
-        self.reservations.append(reservation)
+        session_id = uuid.uuid4().hex
+        await self.bot.db_manager.execute_query(
+            "INSERT INTO investigation_sessions (session_id, leader_id, members, location_id, state, channel_id, scheduled_at) "
+            "VALUES (?, ?, ?, ?, 'scheduled', ?, ?)",
+            (session_id, interaction.user.id, json.dumps(members), category,
+             target_category.channels[0].id, target_time.strftime(RESERVATION_TIME_FORMAT))
+        )
+        # 응답 전송이 실패해도 저장된 예약은 실행되도록 먼저 등록
+        self.schedule_reservation(session_id, target_time)
         
         member_names = [self.bot.get_user(uid).display_name for uid in members if self.bot.get_user(uid)]
         
@@ -493,30 +542,43 @@ class Investigation(commands.Cog):
         embed.add_field(name="멤버", value=", ".join(member_names), inline=False)
         await interaction.followup.send(embed=embed)
 
-        self.bot.loop.create_task(self.schedule_investigation(target_time, reservation))
-
-    async def schedule_investigation(self, target_time, reservation):
-        notify_time = target_time - datetime.timedelta(minutes=5)
-        wait_sec = (notify_time - datetime.datetime.now()).total_seconds()
-        if wait_sec > 0: await asyncio.sleep(wait_sec)
-        
-        if reservation not in self.reservations: return
-
-        channel = self.bot.get_channel(reservation['channel_id'])
-        notice_channel = self.bot.get_channel(config.NOTICE_CHANNEL_ID)
+    async def on_reservation_event(self, session_id, kind):
+        """스케줄러 콜백 - 예약 알림(notify) / 점호 시작(start)"""
+        await self.bot.wait_until_ready()
+        db = self.bot.db_manager
         
-        if notice_channel:
-            mentions = " ".join([f"<@{uid}>" for uid in reservation['members']])
-            # 알림 메시지 수정
-            await notice_channel.send(f"📢 **조사 알림**\n{mentions}님, {reservation['category']} 조사가 곧 시작됩니다. 신청한 카테고리의 맨 위 채널({channel.mention})로 와주세요!")
-
-        wait_start = (target_time - datetime.datetime.now()).total_seconds()
-        if wait_start > 0: await asyncio.sleep(wait_start)
+        if kind == "notify":
+            # 아직 예약 상태이고 알림 전인 경우만 (PK 조회 1회)
+            rows = await db.execute_returning(
+                "UPDATE investigation_sessions SET notified = 1 WHERE session_id = ? AND state = 'scheduled' AND notified = 0 "
+                "RETURNING members, location_id, channel_id",
+                (session_id,)
+            )
+            if not rows: return
+            members, category, channel_id = rows[0]
             
-        if reservation not in self.reservations: return
-        self.reservations.remove(reservation)
+            channel = self.bot.get_channel(channel_id)
+            notice_channel = self.bot.get_channel(config.NOTICE_CHANNEL_ID)
+            if notice_channel and channel:
+                mentions = " ".join([f"<@{uid}>" for uid in json.loads(members)])
+                # 알림 메시지 수정
+                await notice_channel.send(f"📢 **조사 알림**\n{mentions}님, {category} 조사가 곧 시작됩니다. 신청한 카테고리의 맨 위 채널({channel.mention})로 와주세요!")
         
-        await self.start_gathering(channel, reservation['members'], reservation['leader_id'], reservation['category'])
+        elif kind == "start":
+            # 예약 상태인 경우만 점호로 전환 (중복 시작 방지)
+            rows = await db.execute_returning(
+                "UPDATE investigation_sessions SET state = 'gathering', last_activity = CURRENT_TIMESTAMP "
+                "WHERE session_id = ? AND state = 'scheduled' RETURNING leader_id, members, location_id, channel_id",
+                (session_id,)
+            )
+            if not rows: return
+            leader_id, members, category, channel_id = rows[0]
+            
+            channel = self.bot.get_channel(channel_id)
+            if not channel:
+                logger.warning(f"Reservation {session_id}: channel {channel_id} not found")
+                return
+            await self.start_gathering(channel, json.loads(members), leader_id, category)
 
     async def start_gathering(self, channel, members, leader_id, category_name):
         embed = discord.Embed(title="🕵️ 조사 인원 점호", description="5분 내에 ✅를 눌러주세요.", color=0xf1c40f)
@@ -525,6 +587,8 @@ class Investigation(commands.Cog):
 
     async def start_investigation(self, channel, members, category_name):
         data = self.sheets.fetch_investigation_data()
+        # 갱신된 조사 그래프를 이 길드 채널에 바로 연결 (이동 버튼에서 채널 검색 방지)
+        self.sheets.investigation_graph.bind_channels(channel.guild)
         if category_name not in data:
             await channel.send(f"❌ '{category_name}' 데이터가 없습니다.")
             return
@@ -539,7 +603,8 @@ class Investigation(commands.Cog):
     async def show_location(self, channel, session):
         node = session.current_location_node
         embed = discord.Embed(title=f"📍 {node['name']}", description=node.get('description', ''), color=0x3498db)
-        view = InvestigationInteractionView(self, session, node)
+        leader_state = await self.get_user_state(session.members[0])
+        view = InvestigationInteractionView(self, session, node, leader_state)
         msg = await channel.send(embed=embed, view=view)
         view.message = msg
 
@@ -700,36 +765,37 @@ class Investigation(commands.Cog):
             if outcome["group_escape"]:
                 group_escape = True
 
-        db = self.survival_db
-        
         if group_escape:
             await channel.send("🏃‍♂️ **대성공!** 동료의 활약으로 모두 무사히 도망쳤습니다!")
             await self.show_location(channel, session)
             return
 
+        # 라운드 전체 결과를 SQL 1문장으로 반영 (0 ~ 최대치로 제한)
+        deltas = {}
         for user_id, stat_type, res, outcome in round_outcomes:
             user_res_text = f"<@{user_id}> ({stat_type}): {res}\n"
             
             if outcome["escape"]:
                 user_res_text += "💨 도주 성공 (피해 없음)\n"
             else:
+                # 같은 라운드에 여러 번 피해를 입으면 모두 합산
+                user_deltas = deltas.setdefault(user_id, {})
+                for stat in ("hp", "sanity", "hunger", "pollution"):
+                    user_deltas[stat] = user_deltas.get(stat, 0) + outcome[stat]
                 if outcome["hp"] != 0:
-                    await db.execute_query("UPDATE user_state SET current_hp = current_hp + ? WHERE user_id = ?", (outcome["hp"], user_id))
                     user_res_text += f"체력 {outcome['hp']:+}\n"
                 if outcome["sanity"] != 0:
-                    await db.execute_query("UPDATE user_state SET current_sanity = current_sanity + ? WHERE user_id = ?", (outcome["sanity"], user_id))
                     user_res_text += f"정신력 {outcome['sanity']:+}\n"
                 if outcome["hunger"] != 0:
-                    await db.execute_query("UPDATE user_state SET current_hunger = current_hunger + ? WHERE user_id = ?", (outcome["hunger"], user_id))
                     user_res_text += f"허기 {outcome['hunger']:+}\n"
                 if outcome["pollution"] != 0:
-                    await db.execute_query("UPDATE user_state SET current_pollution = current_pollution + ? WHERE user_id = ?", (outcome["pollution"], user_id))
                     user_res_text += f"오염 {outcome['pollution']:+}\n"
             
             if outcome["info"]:
                 user_res_text += f"💡 정보: {outcome['info']}\n"
                 
             results_text.append(user_res_text)
+        await self.apply_stat_changes(deltas)
 
         embed = discord.Embed(title="⚔️ 전투 결과", description="\n".join(results_text), color=0xe74c3c)
         await channel.send(embed=embed)
@@ -742,63 +808,79 @@ class Investigation(commands.Cog):
         db = self.survival_db
         if not db: return ["DB 연결 실패"], description
 
-        for effect in effects:
-            etype = effect['type']
-            val = effect['value']
+        # 스탯 상한(시트 캐시)은 트랜잭션 밖에서 미리 조회 - 트랜잭션에는 SQL만 포함
+        limits = {}
+        if any(effect['type'] == "stat_change" for effect in effects):
+            limits = await self.stat_limits([user_id])
+        
+        # 효과 전체를 한 트랜잭션(커밋 1회)으로 적용 - 중간에 실패하면 모두 롤백
+        added_clues = []
+        stat_deltas = {}
+        async with db.transaction():
+            for effect in effects:
+                etype = effect['type']
+                val = effect['value']
             
-            if etype == "stat_change":
-                stat = effect['stat']
-                col_map = {"hp": "current_hp", "sanity": "current_sanity", "hunger": "current_hunger", "pollution": "current_pollution", "오염도": "current_pollution"}
-                col = col_map.get(stat)
-                if col:
-                    await db.execute_query(f"UPDATE user_state SET {col} = {col} + ? WHERE user_id = ?", (val, user_id))
-                    results.append(f"{stat} {val:+}")
+                if etype == "stat_change":
+                    stat = effect['stat']
+                    field = {"오염도": "pollution"}.get(stat, stat)
+                    if field in STAT_FIELDS:
+                        stat_deltas[field] = stat_deltas.get(field, 0) + val
+                        results.append(f"{stat} {val:+}")
                     
-            elif etype == "trigger_add":
-                if session:
-                    if not hasattr(session, 'triggers'): session.triggers = set()
-                    session.triggers.add(val)
-                results.append(f"트리거 획득: {val}")
+                elif etype == "trigger_add":
+                    if session:
+                        if not hasattr(session, 'triggers'): session.triggers = set()
+                        session.triggers.add(val)
+                    results.append(f"트리거 획득: {val}")
                 
-            elif etype == "trigger_remove":
-                if session and hasattr(session, 'triggers'):
-                    session.triggers.discard(val)
-                results.append(f"트리거 제거: {val}")
-
-            elif etype == "item_add":
-                await db.execute_query("INSERT INTO user_inventory (user_id, item_name, count) VALUES (?, ?, 1) ON CONFLICT(user_id, item_name) DO UPDATE SET count = count + 1", (user_id, val))
-                results.append(f"아이템 획득: {val}")
+                elif etype == "trigger_remove":
+                    if session and hasattr(session, 'triggers'):
+                        session.triggers.discard(val)
+                    results.append(f"트리거 제거: {val}")
+
+                elif etype == "item_add":
+                    await db.execute_query("INSERT INTO user_inventory (user_id, item_name, count) VALUES (?, ?, 1) ON CONFLICT(user_id, item_name) DO UPDATE SET count = count + 1", (user_id, val))
+                    results.append(f"아이템 획득: {val}")
                 
-            elif etype == "item_remove":
-                await db.execute_query("UPDATE user_inventory SET count = count - 1 WHERE user_id = ? AND item_name = ?", (user_id, val))
-                await db.execute_query("DELETE FROM user_inventory WHERE user_id = ? AND item_name = ? AND count <= 0", (user_id, val))
-                results.append(f"아이템 소모: {val}")
+                elif etype == "item_remove":
+                    await db.execute_query("UPDATE user_inventory SET count = count - 1 WHERE user_id = ? AND item_name = ?", (user_id, val))
+                    await db.execute_query("DELETE FROM user_inventory WHERE user_id = ? AND item_name = ? AND count <= 0", (user_id, val))
+                    results.append(f"아이템 소모: {val}")
                 
-            elif etype == "clue_add":
-                 clue_data = self.sheets.get_clue_data(val)
-                 if clue_data:
-                     clue_name = clue_data['name']
-                     clue_desc = clue_data['description']
-                     results.append(f"단서 획득: {clue_name}\n단서 설명: {clue_desc}")
-                     await db.execute_query("INSERT INTO user_clues (user_id, clue_id, clue_name) VALUES (?, ?, ?)", (user_id, val, clue_name))
-                 else:
-                     results.append(f"단서 획득: {val} (데이터 없음)")
+                elif etype == "clue_add":
+                     # 단서 데이터 시트가 없으므로 이름은 ID와 동일하게 저장 (단서 조합 보상과 같은 방식)
+                     results.append(f"단서 획득: {val}")
                      await db.execute_query("INSERT INTO user_clues (user_id, clue_id, clue_name) VALUES (?, ?, ?)", (user_id, val, val))
+                     added_clues.append(val)
                  
-            elif etype == "block_add":
-                 if session:
-                    if not hasattr(session, 'triggers'): session.triggers = set()
-                    session.triggers.add(val)
-                 results.append(f"차단됨: {val}")
-
-            elif etype == "spawn":
-                 results.append(f"이벤트 발생: {val}")
+                elif etype == "block_add":
+                     if session:
+                        if not hasattr(session, 'triggers'): session.triggers = set()
+                        session.triggers.add(val)
+                     results.append(f"차단됨: {val}")
+
+                elif etype == "spawn":
+                     results.append(f"이벤트 발생: {val}")
                  
-            elif etype == "move":
-                 results.append(f"이동: {val}")
+                elif etype == "move":
+                     results.append(f"이동: {val}")
+
+                elif etype == "time_pass":
+                     results.append(f"시간 경과: {val}시간")
+
+            # 스탯 변화는 모아서 1회에 반영 (닉네임은 커밋 이후 갱신)
+            records = await self.apply_stat_changes({user_id: stat_deltas}, update_nicknames=False, limits=limits)
+
+        survival_cog = self.bot.get_cog("Survival")
+        if survival_cog and records:
+            await survival_cog.update_stat_nicknames({user_id: stat_deltas}, records)
 
-            elif etype == "time_pass":
-                 results.append(f"시간 경과: {val}시간")
+        # 단서 조합 엔진에 획득 이벤트 전달 (커밋 이후, 해당 단서가 포함된 레시피만 검사)
+        clues_cog = self.bot.get_cog("Clues")
+        if clues_cog:
+            for clue_id in added_clues:
+                await clues_cog.on_clue_added(user_id, clue_id)
 
         return results, description
 
@@ -1,7 +1,6 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-from utils.sheets import SheetsManager
 from utils.game_logic import GameLogic
 import logging
 from typing import Literal
@@ -34,7 +33,7 @@ class CluesView(discord.ui.View):
 class Stats(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.sheets = SheetsManager()
+        self.sheets = bot.sheets
 
     # Discord 명령어 핸들러
     @app_commands.command(name="현재상태", description="캐릭터의 모든 상태 정보를 확인합니다.")
@@ -67,11 +66,11 @@ class Stats(commands.Cog):
 
         # DB에서 허기 및 광기 로드
         db = self.bot.db_manager
-        logger.debug(f"[현재상태] DB에서 user_state 조회 시작 - User ID: {interaction.user.id}")
-        user_state = await db.fetch_one("SELECT current_hunger, hunger_zero_days FROM user_state WHERE user_id = ?", (interaction.user.id,))
+        logger.debug(f"[현재상태] 유저 상태 조회 시작 - User ID: {interaction.user.id}")
+        user_state = await db.user_states.find(interaction.user.id)
         
-        current_hunger = user_state[0] if user_state else 100
-        hunger_zero_days = user_state[1] if user_state else 0
+        current_hunger = db.user_states.live_values(user_state, stats)[0] if user_state else 100
+        hunger_zero_days = user_state.hunger_zero_days if user_state else 0
         logger.debug(f"[현재상태] 허기 정보 - current_hunger: {current_hunger}, hunger_zero_days: {hunger_zero_days}")
         
         # 정신력 반영 현재 스탯 계산
@@ -117,7 +116,7 @@ class Stats(commands.Cog):
         # 기본 상태
         embed.add_field(name="❤️ 체력 (HP)", value=f"{stats['hp']}", inline=True)
         embed.add_field(name="🧠 정신력 (Sanity)", value=f"{stats['sanity']}%", inline=True)
-        embed.add_field(name="🍞 허기 (Hunger)", value=f"{current_hunger}/50", inline=True)
+        embed.add_field(name="🍞 허기 (Hunger)", value=f"{int(current_hunger)}/50", inline=True)
 
         # 스탯 페널티 표시 로직
         def format_stat(current, base_original):
@@ -254,9 +253,14 @@ class Stats(commands.Cog):
         
         # 정신력 반영 등 기존 로직 수행
         db = self.bot.db_manager
-        user_state = await db.fetch_one("SELECT current_sanity, hunger_zero_days FROM user_state WHERE user_id = ?", (interaction.user.id,))
-        sanity_percent = user_state[0] / 100.0 if user_state else 1.0
-        hunger_zero_days = user_state[1] if user_state else 0
+        user_state = await db.user_states.find(interaction.user.id)
+        if user_state:
+            # lazy 모드에서는 경과 시간이 반영된 현재 정신력으로 판정
+            hunger, sanity = db.user_states.live_values(user_state, stats)
+            sanity_percent = sanity / 100.0
+        else:
+            sanity_percent = 1.0
+        hunger_zero_days = user_state.hunger_zero_days if user_state else 0
         
         # 허기 페널티 적용
         base_stat_value = GameLogic.calculate_hunger_penalty(base_stat_value, hunger_zero_days)
@@ -341,24 +345,22 @@ class Stats(commands.Cog):
                 
             new_hunger = min(MAX_HUNGER, state['hunger'] + recovery)
             
-            await db.execute_query(
-                """UPDATE user_state 
-                   SET current_hunger = ?, hunger_zero_days = 0 
-                   WHERE user_id = ?""",
-                (new_hunger, interaction.user.id)
-            )
-            
-            await db.execute_query(
-                """UPDATE user_inventory 
-                   SET count = count - 1 
-                   WHERE user_id = ? AND item_name = ?""",
-                (interaction.user.id, item_name)
-            )
-            
-            await db.execute_query(
-                "DELETE FROM user_inventory WHERE user_id = ? AND count <= 0",
-                (interaction.user.id,)
-            )
+            async with db.transaction():
+                # lazy 모드: 경과분(정신력 회복 포함)을 기록한 뒤 허기 변경
+                await db.user_states.materialize_meters(user_ids=[interaction.user.id])
+                await db.user_states.update(interaction.user.id, hunger=new_hunger, hunger_zero_days=0)
+                
+                await db.execute_query(
+                    """UPDATE user_inventory 
+                       SET count = count - 1 
+                       WHERE user_id = ? AND item_name = ?""",
+                    (interaction.user.id, item_name)
+                )
+                
+                await db.execute_query(
+                    "DELETE FROM user_inventory WHERE user_id = ? AND count <= 0",
+                    (interaction.user.id,)
+                )
             
             await interaction.response.send_message(
                 f"🍞 {item_name}을(를) 먹었습니다. (허기 {int(state['hunger'])} → {int(new_hunger)})"
@@ -382,9 +384,7 @@ class Stats(commands.Cog):
                 await interaction.response.send_message("❌ 스탯 정보를 불러올 수 없습니다.", ephemeral=True)
                 return
             
-            # hunger_zero_days 조회
-            user_state = await db.fetch_one("SELECT hunger_zero_days FROM user_state WHERE user_id = ?", (interaction.user.id,))
-            hunger_zero_days = user_state[0] if user_state else 0
+            hunger_zero_days = state['hunger_zero_days']
             
             # 페널티 적용된 지성 사용
             effective_intelligence = GameLogic.calculate_hunger_penalty(stats['intelligence'], hunger_zero_days)
@@ -402,10 +402,11 @@ class Stats(commands.Cog):
             recovery = 10 + (effective_willpower / 10)
             new_sanity = min(100, state['sanity'] + recovery)
             
-            await db.execute_query(
-                "UPDATE user_state SET current_sanity = ?, last_sanity_recovery = CURRENT_TIMESTAMP WHERE user_id = ?",
-                (new_sanity, interaction.user.id)
-            )
+            # CURRENT_TIMESTAMP와 같은 UTC 형식으로 기록
+            now_utc = datetime.datetime.now(datetime.timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+            async with db.transaction():
+                await db.user_states.materialize_meters(now_utc, user_ids=[interaction.user.id])
+                await db.user_states.update(interaction.user.id, sanity=new_sanity, last_sanity_recovery=now_utc)
             
             await interaction.response.send_message(
                 f"💤 휴식을 취했습니다. (정신력 {int(state['sanity'])} → {int(new_sanity)})"
@@ -24,3 +24,21 @@ ADMIN_IDS = [1090546247770832910]
 
 # 조사 공지 채널 ID
 NOTICE_CHANNEL_ID = int(os.getenv('NOTICE_CHANNEL_ID', '0'))
+
+# DB 그룹 커밋 모드 (동시 쓰기를 모아 한 트랜잭션으로 커밋)
+DB_GROUP_COMMIT = os.getenv('DB_GROUP_COMMIT', '0') == '1'
+
+# DB 읽기 전용 연결 수 (WAL 모드 읽기 풀)
+DB_READERS = int(os.getenv('DB_READERS', '4'))
+
+# 일일 틱 다운타임 복구 시 최대 재실행 일수
+DAILY_TICK_MAX_CATCHUP_DAYS = int(os.getenv('DAILY_TICK_MAX_CATCHUP_DAYS', '7'))
+
+# 생존 미터 lazy 모드 (허기/정신력을 조회 시 경과 시간으로 계산, 자정 전체 갱신 생략)
+SURVIVAL_LAZY_METERS = os.getenv('SURVIVAL_LAZY_METERS', '0') == '1'
+
+# 닉네임 변경 요청 사이 최소 간격 (초, Discord rate limit 대비)
+NICKNAME_UPDATE_INTERVAL = float(os.getenv('NICKNAME_UPDATE_INTERVAL', '1.0'))
+
+# DM 전송함 동시 전송 수
+DM_CONCURRENCY = int(os.getenv('DM_CONCURRENCY', '5'))
@@ -1,40 +1,9 @@
 import gspread
 import re
 import os
-import time
 import json
-import random
 from google.oauth2.service_account import Credentials
-from googleapiclient.errors import HttpError
-
-def with_backoff(func):
-    """
-    지수 백오프를 적용하는 데코레이터입니다.
-    API 호출 실패 시(특히 429 에러) 재시도합니다.
-    """
-    def wrapper(*args, **kwargs):
-        max_retries = 5
-        base_delay = 1.5  # 초기 대기 시간 (초)
-        
-        for i in range(max_retries):
-            try:
-                return func(*args, **kwargs)
-            except Exception as e:
-                # gspread의 APIError는 내부적으로 googleapiclient.errors.HttpError를 감쌀 수 있음
-                # 또는 gspread.exceptions.APIError 일 수 있음
-                # 여기서는 일반적인 Exception으로 잡아서 메시지나 타입을 확인
-                error_str = str(e)
-                if "429" in error_str or "Quota exceeded" in error_str:
-                    if i == max_retries - 1:
-                        raise e
-                    
-                    # 지수 백오프 + Jitter
-                    delay = (base_delay * (2 ** i)) + random.uniform(0, 1)
-                    print(f"API Quota exceeded. Retrying in {delay:.2f}s... (Attempt {i+1}/{max_retries})")
-                    time.sleep(delay)
-                else:
-                    raise e
-    return wrapper
+from utils.quota import GovernedHTTPClient
 
 class SheetsManager:
     """
@@ -57,8 +26,8 @@ class SheetsManager:
         ]
         # 서비스 계정 자격 증명 로드
         credentials = Credentials.from_service_account_file(creds_path, scopes=scopes)
-        # gspread 클라이언트 인증 및 생성
-        self.gc = gspread.authorize(credentials)
+        # gspread 클라이언트 인증 및 생성 (429 대기/재시도는 공용 할당량 거버너가 처리)
+        self.gc = gspread.authorize(credentials, http_client=GovernedHTTPClient)
         # 스프레드시트 A와 B 열기
         self.sheet_a_id = sheet_a_id
         self.sheet_b_id = sheet_b_id
@@ -132,7 +101,6 @@ class SheetsManager:
         # 여기서는 임시로 시트에서 읽되, 백오프 적용
         return self._fetch_admin_permission_from_sheet(user_id)
 
-    @with_backoff
     def _fetch_admin_permission_from_sheet(self, user_id):
         try:
             ws = self.sheet_a.worksheet("메타데이터시트")
@@ -146,7 +114,6 @@ class SheetsManager:
             print(f"관리자 권한 확인 중 오류 발생: {e}")
             return False
 
-    @with_backoff
     def get_user_row(self, user_name):
         """
         스프레드시트 B의 '인벤토리' 시트에서 특정 유저의 행 번호를 찾습니다.
@@ -157,7 +124,6 @@ class SheetsManager:
             return cell.row
         return None
 
-    @with_backoff
     def get_user_info(self, user_nickname):
         """
         유저의 상태(HP, SP, 허기)와 인벤토리 정보를 가져옵니다.
@@ -204,7 +170,6 @@ class SheetsManager:
             "max_slots": max_slots
         }
 
-    @with_backoff
     def add_item_to_user(self, user_nickname, item_name, count=1):
         """
         유저의 인벤토리에 아이템을 추가합니다.
@@ -241,7 +206,6 @@ class SheetsManager:
 
         return True, "아이템이 지급되었습니다."
 
-    @with_backoff
     def remove_item_from_user(self, user_nickname, item_name, count=1):
         """
         유저의 인벤토리에서 아이템을 제거합니다.
@@ -280,7 +244,6 @@ class SheetsManager:
             
         return True, "아이템이 제거되었습니다."
 
-    @with_backoff
     def register_item_metadata(self, name, type_, description):
         """
         새로운 아이템을 스프레드시트 A의 '아이템데이터' 시트에 등록합니다.
@@ -327,7 +290,6 @@ class SheetsManager:
             return ["C46:D66", "E46:F66", "G46:H66", "I46:J66", "K46:L66"]
         return []
 
-    @with_backoff
     def get_warehouse_items(self, item_type):
         """
         특정 유형의 창고 아이템 목록을 가져옵니다.
@@ -356,7 +318,6 @@ class SheetsManager:
                         items[name] = count
         return items
 
-    @with_backoff
     def update_warehouse_item(self, item_name, item_type, count_change):
         """
         창고(공동아이템)의 아이템 수량을 업데이트합니다.
@@ -456,7 +417,6 @@ class SheetsManager:
             
             return False, "창고에서 해당 아이템을 찾을 수 없습니다."
 
-    @with_backoff
     def get_all_users(self):
         """
         스프레드시트 B에서 모든 유저의 이름 목록을 가져옵니다.
@@ -481,7 +441,6 @@ class SheetsManager:
         # 캐시에 없으면 시트 확인 (백오프 적용)
         return self._fetch_item_type_from_sheet(item_name)
 
-    @with_backoff
     def _fetch_item_type_from_sheet(self, item_name):
         ws = self.sheet_a.worksheet("아이템데이터")
         normalized_name = self.normalize_item_name(item_name)
@@ -0,0 +1,36 @@
+import os
+import sys
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.clue_combiner import ClueCombinationIndex
+
+RECIPES = [
+    {"recipe_id": "comb_001", "required_clues": ["clue_A", "clue_B"], "result_type": "단서", "result_id": "clue_C", "message": ""},
+    {"recipe_id": "comb_002", "required_clues": ["clue_C", "clue_D"], "result_type": "아이템", "result_id": "열쇠", "message": ""},
+    {"recipe_id": "comb_003", "required_clues": ["clue_E"], "result_type": "단서", "result_id": "clue_F", "message": ""},
+]
+
+def test_inverted_index():
+    index = ClueCombinationIndex(RECIPES)
+    
+    assert [r['recipe_id'] for r in index.recipes_for("clue_C")] == ["comb_002"]
+    assert index.recipes_for("clue_X") == []
+
+def test_find_completed_only_touches_new_clue():
+    index = ClueCombinationIndex(RECIPES)
+    user_clues = {"clue_A", "clue_B", "clue_E"}
+    
+    # 새 단서 기준: clue_B가 들어간 레시피만 검사
+    assert [r['recipe_id'] for r in index.find_completed(user_clues, "clue_B")] == ["comb_001"]
+    # 전체 검사
+    assert sorted(r['recipe_id'] for r in index.find_completed(user_clues)) == ["comb_001", "comb_003"]
+
+def test_signature_detects_changes():
+    a = ClueCombinationIndex(RECIPES)
+    b = ClueCombinationIndex(list(reversed(RECIPES)))
+    c = ClueCombinationIndex(RECIPES[:2])
+    
+    assert a.signature == b.signature
+    assert a.signature != c.signature
@@ -0,0 +1,95 @@
+import os
+import sys
+import asyncio
+import datetime
+import logging
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.database import DatabaseManager
+from utils.daily_tick import DailyTickPipeline, CHECKPOINT_KEY
+from utils.game_logic import GameLogic
+
+logging.basicConfig(level=logging.INFO)
+
+async def make_db(tmp_path):
+    db = DatabaseManager(str(tmp_path / "tick.db"))
+    await db.initialize()
+    await db.executemany(
+        "INSERT INTO user_state (user_id, current_hp, current_sanity, current_hunger, hunger_zero_days) VALUES (?, ?, ?, ?, ?)",
+        [(1, 100, 50, 0, 0), (2, 100, 78, 50, 0)]
+    )
+    await db.executemany(
+        "INSERT INTO character_stats (user_id, name, max_hp, max_sanity, intelligence, willpower) VALUES (?, ?, ?, ?, ?, ?)",
+        [(1, "굶은자", 100, 80, 0, 0), (2, "든든한자", 100, 80, 50, 50)]
+    )
+    await db.execute_query("INSERT INTO user_madness (user_id, madness_id, madness_name) VALUES (2, 'M1', '공포증')")
+    return db
+
+def test_daily_tick_replays_missed_days(tmp_path, monkeypatch):
+    monkeypatch.setattr(GameLogic, "roll_dice", staticmethod(lambda: 100))
+    today = datetime.date(2026, 1, 10)
+    
+    async def scenario():
+        db = await make_db(tmp_path)
+        try:
+            pipeline = DailyTickPipeline(db)
+            
+            # 첫 실행은 체크포인트만 기록
+            assert await pipeline.run_pending(today) == []
+            assert await db.get_world_value(CHECKPOINT_KEY) == "2026-01-10"
+            
+            # 3일간 꺼져 있었던 경우 날짜 순서대로 재실행
+            await db.set_world_value(CHECKPOINT_KEY, "2026-01-07")
+            results = await pipeline.run_pending(today)
+            assert [r["day"] for r in results] == [datetime.date(2026, 1, 8), datetime.date(2026, 1, 9), today]
+            assert await db.get_world_value(CHECKPOINT_KEY) == "2026-01-10"
+            
+            # 유저 1: 허기 0으로 3일 -> 체력 -5, -5, -10 / 3일차 정신력 -5
+            state = await db.user_states.find(1)
+            assert (state.hp, state.sanity, state.hunger, state.hunger_zero_days) == (80, 45, 0, 3)
+            # 유저 2: 의지 50(페널티 -5% = 48) -> 하루 14.8씩 감소, 첫날만 회복 임계치(29.6) 이상
+            state = await db.user_states.find(2)
+            assert (state.hp, state.sanity, round(state.hunger, 1)) == (100, 80, 5.6)
+            # 메모리 값과 DB 값이 일치
+            assert await db.fetch_one("SELECT current_hp, current_sanity FROM user_state WHERE user_id = 1") == (80, 45)
+            
+            # 광기 회복 + 단계별 소요 시간 기록
+            assert await db.fetch_all("SELECT * FROM user_madness") == []
+            assert [msg for _, msg in results[0]["messages"]][-1].startswith("✨")
+            assert await db.fetch_one("SELECT COUNT(*) FROM daily_tick_runs") == (12,)
+            assert set(results[0]["timings"]) == {"hunger_penalties", "hunger_decay", "sanity_recovery", "madness_recovery"}
+            
+            # 같은 날 다시 호출하면 아무것도 하지 않음
+            assert await pipeline.run_pending(today) == []
+        finally:
+            await db.close()
+    
+    asyncio.run(scenario())
+
+def test_daily_tick_failure_keeps_checkpoint(tmp_path):
+    async def scenario():
+        db = await make_db(tmp_path)
+        try:
+            pipeline = DailyTickPipeline(db)
+            await db.set_world_value(CHECKPOINT_KEY, "2026-01-09")
+            
+            async def broken_stage(result):
+                raise RuntimeError("stage failed")
+            pipeline.stages[-1] = ("madness_recovery", broken_stage)
+            
+            try:
+                await pipeline.run_pending(datetime.date(2026, 1, 10))
+                assert False, "should raise"
+            except RuntimeError:
+                pass
+            
+            # 앞 단계 변경까지 모두 롤백되고 체크포인트도 그대로 (다음 실행에서 재시도)
+            assert await db.get_world_value(CHECKPOINT_KEY) == "2026-01-09"
+            assert (await db.user_states.find(1)).hp == 100
+            assert await db.fetch_one("SELECT COUNT(*) FROM daily_tick_runs") == (0,)
+        finally:
+            await db.close()
+    
+    asyncio.run(scenario())
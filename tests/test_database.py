@@ -2,6 +2,7 @@ import os
 import sys
 import logging
 import sqlite3
+import asyncio
 
 # Add project root to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -47,5 +48,160 @@ def test_database_creation():
     if os.path.exists(db_path):
         os.remove(db_path)
 
+def test_replace_inventory_single_swap(tmp_path):
+    async def scenario():
+        db = DatabaseManager(str(tmp_path / "replace.db"))
+        await db.initialize()
+        try:
+            await db.execute_query("INSERT INTO user_inventory (user_id, item_name, count) VALUES (1, '낡은 칼', 1)")
+            
+            await db.replace_inventory([(1, "빵", 2), (2, "붕대", 1)], "abc123")
+            
+            rows = await db.fetch_all("SELECT user_id, item_name, count FROM user_inventory ORDER BY user_id")
+            assert rows == [(1, "빵", 2), (2, "붕대", 1)]
+            assert await db.get_world_value("inventory_import_hash") == "abc123"
+            # 임시 스테이징 테이블은 쓰기 연결에만 존재
+            async with db.transaction():
+                assert await db.fetch_all("SELECT * FROM user_inventory_staging") == []
+        finally:
+            await db.close()
+    
+    asyncio.run(scenario())
+
+def test_transaction_commit_rollback_and_savepoint(tmp_path):
+    async def scenario():
+        db = DatabaseManager(str(tmp_path / "tx.db"))
+        await db.initialize()
+        try:
+            commits = []
+            original_commit = db.writer.commit
+            async def counting_commit():
+                commits.append(1)
+                await original_commit()
+            db.writer.commit = counting_commit
+            
+            # 여러 쓰기 -> 커밋 1회
+            async with db.transaction():
+                await db.execute_query("INSERT INTO user_inventory (user_id, item_name, count) VALUES (1, '빵', 3)")
+                await db.execute_query("UPDATE user_inventory SET count = count - 1 WHERE user_id = 1")
+            assert len(commits) == 1
+            
+            # 예외 -> 전체 롤백
+            try:
+                async with db.transaction():
+                    await db.execute_query("DELETE FROM user_inventory")
+                    raise RuntimeError("boom")
+            except RuntimeError:
+                pass
+            assert await db.fetch_one("SELECT count FROM user_inventory WHERE user_id = 1") == (2,)
+            
+            # 중첩 -> 안쪽 블록만 롤백 (SAVEPOINT)
+            async with db.transaction():
+                await db.execute_query("INSERT INTO user_inventory (user_id, item_name, count) VALUES (2, '붕대', 1)")
+                try:
+                    async with db.transaction():
+                        await db.execute_query("DELETE FROM user_inventory WHERE user_id = 1")
+                        raise RuntimeError("inner")
+                except RuntimeError:
+                    pass
+            rows = await db.fetch_all("SELECT user_id, item_name, count FROM user_inventory ORDER BY user_id")
+            assert rows == [(1, "빵", 2), (2, "붕대", 1)]
+            assert len(commits) == 2
+        finally:
+            await db.close()
+    
+    asyncio.run(scenario())
+
+def test_group_commit_batches_concurrent_writes(tmp_path):
+    async def scenario():
+        db = DatabaseManager(str(tmp_path / "group.db"), group_commit=True)
+        await db.initialize()
+        try:
+            commits = []
+            original_commit = db.writer.commit
+            async def counting_commit():
+                commits.append(1)
+                await original_commit()
+            db.writer.commit = counting_commit
+            
+            writes = [
+                db.execute_query("INSERT INTO user_inventory (user_id, item_name, count) VALUES (?, '빵', 1)", (uid,))
+                for uid in range(50)
+            ]
+            # 실패한 쓰기는 해당 호출자에게만 예외로 전달
+            writes.append(db.execute_query("INSERT INTO no_such_table VALUES (1)"))
+            results = await asyncio.gather(*writes, return_exceptions=True)
+            
+            assert all(not isinstance(r, Exception) for r in results[:50])
+            assert isinstance(results[50], Exception)
+            assert len(commits) < 5, f"커밋 횟수: {len(commits)}"
+            assert await db.fetch_one("SELECT COUNT(*) FROM user_inventory") == (50,)
+        finally:
+            await db.close()
+    
+    asyncio.run(scenario())
+
+def test_reads_do_not_wait_for_writes(tmp_path):
+    async def scenario():
+        db = DatabaseManager(str(tmp_path / "wal.db"), readers=2)
+        await db.initialize()
+        try:
+            assert await db.fetch_one("PRAGMA journal_mode") == ("wal",)
+            await db.execute_query("INSERT INTO user_inventory (user_id, item_name, count) VALUES (1, '빵', 1)")
+            
+            in_tx = asyncio.Event()
+            release = asyncio.Event()
+            async def long_write():
+                async with db.transaction():
+                    await db.execute_query("UPDATE user_inventory SET count = 99 WHERE user_id = 1")
+                    in_tx.set()
+                    await release.wait()
+            writer = asyncio.create_task(long_write())
+            await in_tx.wait()
+            
+            # 쓰기 트랜잭션이 열려 있어도 읽기는 즉시, 커밋된 값으로 응답
+            row = await asyncio.wait_for(db.fetch_one("SELECT count FROM user_inventory WHERE user_id = 1"), timeout=1)
+            assert row == (1,)
+            
+            release.set()
+            await writer
+            assert await db.fetch_one("SELECT count FROM user_inventory WHERE user_id = 1") == (99,)
+        finally:
+            await db.close()
+    
+    asyncio.run(scenario())
+
+def test_migrations_and_query_plans(tmp_path):
+    async def scenario():
+        db = DatabaseManager(str(tmp_path / "migrate.db"))
+        await db.initialize()
+        await db.close()
+        # 재시작 시 이미 적용된 마이그레이션은 다시 실행하지 않음
+        await db.initialize()
+        try:
+            from utils.database import MIGRATIONS
+            assert await db.fetch_one("PRAGMA user_version") == (MIGRATIONS[-1][0],)
+            
+            columns = [row[1] for row in await db.fetch_all("PRAGMA table_info(user_state)")]
+            assert "current_pollution" in columns
+            
+            # Cog의 조회 경로가 전체 스캔 없이 인덱스를 사용하는지 확인
+            hot_queries = [
+                ("SELECT madness_name FROM user_madness WHERE user_id = ?", (1,)),
+                ("SELECT thought_name FROM user_thoughts WHERE user_id = ? AND status = ?", (1, "thinking")),
+                ("SELECT clue_name, acquired_at FROM user_clues WHERE user_id = ? ORDER BY acquired_at DESC", (1,)),
+                ("SELECT clue_id FROM user_clues WHERE user_id = ?", (1,)),
+                ("SELECT item_name, count FROM user_inventory WHERE user_id = ?", (1,)),
+                ("SELECT count FROM user_inventory WHERE user_id = ? AND item_name = ?", (1, "빵")),
+                ("SELECT current_hp FROM user_state WHERE user_id = ?", (1,)),
+            ]
+            for query, params in hot_queries:
+                plan = " | ".join(row[3] for row in await db.fetch_all(f"EXPLAIN QUERY PLAN {query}", params))
+                assert "USING" in plan and "TEMP B-TREE" not in plan, f"{query} -> {plan}"
+        finally:
+            await db.close()
+    
+    asyncio.run(scenario())
+
 if __name__ == "__main__":
     test_database_creation()
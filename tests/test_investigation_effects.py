@@ -0,0 +1,161 @@
+import os
+import sys
+import asyncio
+import logging
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.database import DatabaseManager
+from utils.outbox import DMOutbox
+from utils.sheets import SheetsManager
+from cogs.clues import Clues
+from cogs.investigation import Investigation
+from cogs.survival import Survival
+
+logging.basicConfig(level=logging.INFO)
+
+RECIPES = [
+    {"recipe_id": "comb_001", "required_clues": ["clue_A", "clue_B"], "result_type": "단서", "result_id": "clue_C", "message": "두 단서가 이어집니다."},
+]
+
+class FakeBot:
+    """조사 효과 -> 단서 조합 -> DM 전송함 경로에 필요한 부분만 가진 봇"""
+    def __init__(self, db, sheets, sender):
+        self.db_manager = db
+        self.sheets = sheets
+        self.outbox = DMOutbox(db, sender)
+        self.guilds = []
+        self.cogs = {}
+        self._ready = asyncio.Event() # 루프 태스크가 실행되지 않도록 준비 완료되지 않은 상태 유지
+
+    def get_cog(self, name):
+        return self.cogs.get(name)
+
+    async def wait_until_ready(self):
+        await self._ready.wait()
+
+def make_sheets():
+    sheets = SheetsManager()
+    sheets.client = None
+    sheets.save_cache = lambda: None
+    sheets.cached_data = {
+        "metadata": {"111": "홍길동"},
+        "stats": [{"name": "홍길동", "hp": 100, "sanity": 80, "perception": 50, "intelligence": 40, "willpower": 30}],
+        "clue_combinations": RECIPES,
+    }
+    sheets.rebuild_stats_index()
+    return sheets
+
+def test_clue_effect_triggers_combination_dm(tmp_path):
+    async def scenario():
+        db = DatabaseManager(str(tmp_path / "effects.db"))
+        await db.initialize()
+        sent = []
+        async def sender(user_id, content, embeds):
+            sent.append((user_id, content, embeds))
+        
+        bot = FakeBot(db, make_sheets(), sender)
+        bot.cogs = {"Survival": Survival(bot), "Clues": Clues(bot)}
+        bot.cogs["Investigation"] = Investigation(bot)
+        try:
+            await db.execute_query("INSERT INTO user_clues (user_id, clue_id, clue_name) VALUES (?, ?, ?)", (111, "clue_A", "clue_A"))
+            
+            results, description = await bot.cogs["Investigation"].apply_effects(111, "clue+clue_B,묘사:서랍 속 쪽지")
+            assert results == ["단서 획득: clue_B"]
+            assert description == "서랍 속 쪽지"
+            
+            # 획득한 단서로 조합이 완성되어 결과 단서 지급 + DM 예약
+            clues = await db.fetch_all("SELECT clue_id FROM user_clues WHERE user_id = ? ORDER BY clue_id", (111,))
+            assert [row[0] for row in clues] == ["clue_A", "clue_B", "clue_C"]
+            
+            assert await bot.outbox.dispatch_once() == 1
+            assert sent[0][0] == 111 and sent[0][2][0]["title"] == "🧩 단서 조합 성공!"
+        finally:
+            for cog in bot.cogs.values():
+                cog.cog_unload()
+            await db.close()
+    
+    asyncio.run(scenario())
+
+def test_effect_stat_limits_resolved_outside_transaction(tmp_path):
+    async def scenario():
+        db = DatabaseManager(str(tmp_path / "effects.db"))
+        await db.initialize()
+        async def sender(user_id, content, embeds): pass
+        
+        sheets = make_sheets()
+        lookups = []
+        original = sheets.get_user_stats_async
+        async def get_user_stats_async(*args, **kwargs):
+            # 시트 캐시 조회(스레드 이동) 중에는 쓰기 잠금을 잡고 있지 않아야 함
+            lookups.append(db.in_transaction() or db._lock.locked())
+            return await original(*args, **kwargs)
+        sheets.get_user_stats_async = get_user_stats_async
+        
+        bot = FakeBot(db, sheets, sender)
+        bot.cogs = {"Survival": Survival(bot)}
+        bot.cogs["Investigation"] = Investigation(bot)
+        try:
+            results, _ = await bot.cogs["Investigation"].apply_effects(111, "오염+3,item+쪽지")
+            assert results == ["오염도 +3", "아이템 획득: 쪽지"]
+            assert not any(lookups)
+            assert (await db.user_states.find(111)).pollution == 3
+            assert await db.fetch_one("SELECT count FROM user_inventory WHERE user_id = ? AND item_name = ?", (111, "쪽지")) == (1,)
+        finally:
+            for cog in bot.cogs.values():
+                cog.cog_unload()
+            await db.close()
+    
+    asyncio.run(scenario())
+
+def test_condition_state_reads_repository(tmp_path):
+    async def scenario():
+        db = DatabaseManager(str(tmp_path / "effects.db"))
+        await db.initialize()
+        async def sender(user_id, content, embeds): pass
+        
+        bot = FakeBot(db, make_sheets(), sender)
+        investigation = Investigation(bot)
+        try:
+            # 상태가 없는 유저는 초기값(최대 스탯)으로 판정
+            state = await investigation.get_user_state(111)
+            assert (state["hp"], state["sanity"], state["hunger"], state["inventory"]) == (100, 80, 50, [])
+            
+            await db.user_states.get(111)
+            await db.user_states.update(111, hp=42, pollution=7)
+            await db.execute_query("INSERT INTO user_inventory (user_id, item_name, count) VALUES (?, ?, ?)", (111, "열쇠", 1))
+            state = await investigation.get_user_state(111)
+            assert (state["hp"], state["pollution"], state["inventory"]) == (42, 7, ["열쇠"])
+            assert state["stats"]["perception"] == 50
+        finally:
+            investigation.cog_unload()
+            await db.close()
+    
+    asyncio.run(scenario())
+
+def test_stat_limits_from_character_stats_mirror(tmp_path):
+    async def scenario():
+        db = DatabaseManager(str(tmp_path / "effects.db"))
+        await db.initialize()
+        async def sender(user_id, content, embeds): pass
+        
+        bot = FakeBot(db, make_sheets(), sender)
+        survival = Survival(bot)
+        try:
+            await db.replace_character_stats([(111, "홍길동", 90, 70, 50, 40, 30)])
+            
+            # 상한은 미러에서 1회 조회, 상태가 없는 유저는 한 번에 생성 (미러에 없으면 기본 100/80)
+            limits = await survival.stat_limits([111, 222])
+            assert limits == {111: {"hp": 90, "sanity": 70, "hunger": 50}, 222: {"hp": 100, "sanity": 80, "hunger": 50}}
+            assert (await db.user_states.find(222)).hp == 100
+            
+            records = await survival.apply_stat_changes({111: {"hp": -30}, 222: {"sanity": -5}}, update_nicknames=False)
+            records = await survival.apply_stat_changes({111: {"hp": 50}}, update_nicknames=False)
+            assert records[111].hp == 90
+            assert (await db.user_states.find(222)).sanity == 75
+        finally:
+            survival.cog_unload()
+            await db.close()
+    
+    asyncio.run(scenario())
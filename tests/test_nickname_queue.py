@@ -0,0 +1,95 @@
+import os
+import sys
+import asyncio
+import logging
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.nickname_queue import NicknameUpdater
+
+logging.basicConfig(level=logging.INFO)
+
+def test_nickname_updates_coalesce_per_member():
+    async def scenario():
+        edits = []
+        async def editor(user_id, nick):
+            edits.append((user_id, nick))
+            return True
+        
+        updater = NicknameUpdater(editor, interval=0)
+        
+        # 전투 라운드/일일 틱처럼 연속 변경 -> 멤버별 마지막 값만 전송
+        updater.submit(1, "홍길동/90/80")
+        updater.submit(2, "김철수/70/60")
+        updater.submit(1, "홍길동/85/80")
+        updater.submit(1, "홍길동/80/75")
+        await updater.drain()
+        assert edits == [(1, "홍길동/80/75"), (2, "김철수/70/60")]
+        assert updater.coalesced_count == 2
+        
+        # 마지막으로 설정한 값과 같으면 큐에 넣지 않음
+        assert updater.submit(1, "홍길동/80/75") is False
+        await updater.drain()
+        assert len(edits) == 2
+        
+        # 외부에서 닉네임이 바뀌면 같은 수치라도 다시 설정
+        updater.observe(1, "홍길동")
+        assert updater.submit(1, "홍길동/80/75") is True
+        await updater.drain()
+        assert edits[-1] == (1, "홍길동/80/75")
+    
+    asyncio.run(scenario())
+
+def test_nickname_updater_background_pacing():
+    async def scenario():
+        edits = []
+        async def editor(user_id, nick):
+            if user_id == 3: raise RuntimeError("Missing Permissions")
+            edits.append((user_id, nick))
+            return True
+        
+        updater = NicknameUpdater(editor, interval=0.01)
+        updater.start()
+        try:
+            for user_id in (1, 2, 3):
+                updater.submit(user_id, f"유저{user_id}/100/80")
+            await asyncio.sleep(0.1)
+            # 실패한 멤버가 있어도 나머지는 전송되고, 실패한 값은 적용된 것으로 기록하지 않음
+            assert edits == [(1, "유저1/100/80"), (2, "유저2/100/80")]
+            assert updater.submit(3, "유저3/100/80") is True
+        finally:
+            updater.stop()
+    
+    asyncio.run(scenario())
+
+def test_nickname_failure_is_retried():
+    async def scenario():
+        failures = {"left": 1}
+        edits = []
+        async def editor(user_id, nick):
+            if failures["left"]:
+                failures["left"] -= 1
+                raise RuntimeError("503 Service Unavailable")
+            edits.append((user_id, nick))
+            return True
+        
+        updater = NicknameUpdater(editor, interval=0, max_attempts=3)
+        updater.submit(1, "홍길동/80/75")
+        await updater.drain()
+        # 일시적 실패 후 재시도로 적용되고, 이후 같은 값은 큐에 넣지 않음
+        assert edits == [(1, "홍길동/80/75")]
+        assert updater.submit(1, "홍길동/80/75") is False
+        
+        # 계속 실패하면 max_attempts번 시도 후 포기 (다음 요청 때 다시 시도)
+        attempts = []
+        async def broken(user_id, nick):
+            attempts.append(nick)
+            raise RuntimeError("Missing Permissions")
+        updater.editor = broken
+        updater.submit(1, "홍길동/70/75")
+        await updater.drain()
+        assert len(attempts) == 3 and not updater.is_pending(1)
+        assert updater.submit(1, "홍길동/70/75") is True
+    
+    asyncio.run(scenario())
@@ -0,0 +1,106 @@
+import os
+import sys
+import asyncio
+import logging
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.database import DatabaseManager
+from utils.outbox import DMOutbox, PermanentDeliveryError
+
+logging.basicConfig(level=logging.INFO)
+
+def test_outbox_merges_and_fans_out(tmp_path):
+    async def scenario():
+        db = DatabaseManager(str(tmp_path / "outbox.db"))
+        await db.initialize()
+        try:
+            sent = []
+            active = {"now": 0, "max": 0}
+            async def sender(user_id, content, embeds):
+                active["now"] += 1
+                active["max"] = max(active["max"], active["now"])
+                await asyncio.sleep(0.01)
+                active["now"] -= 1
+                sent.append((user_id, content, embeds))
+            
+            outbox = DMOutbox(db, sender, concurrency=2)
+            
+            # 같은 틱에서 한 유저에게 쌓인 메시지는 1건으로 합쳐 전송
+            await outbox.enqueue_many([(1, "⚠️ 배고픔"), (2, "💀 아사"), (1, "✨ 광기 극복")])
+            await outbox.enqueue(1, embed={"title": "🧩 단서 조합 성공!"})
+            for user_id in (3, 4, 5):
+                await outbox.enqueue(user_id, "알림")
+            
+            assert await outbox.dispatch_once() == 5
+            assert sorted(sent)[0] == (1, "⚠️ 배고픔\n\n✨ 광기 극복", [{"title": "🧩 단서 조합 성공!"}])
+            assert len(sent) == 5
+            assert active["max"] == 2 # 동시 전송 수 제한
+            assert await db.fetch_all("SELECT * FROM dm_outbox") == []
+            
+            # 롤백된 트랜잭션에서 예약한 DM은 남지 않음
+            try:
+                async with db.transaction():
+                    await outbox.enqueue(1, "롤백")
+                    raise RuntimeError("rollback")
+            except RuntimeError:
+                pass
+            assert await db.fetch_all("SELECT * FROM dm_outbox") == []
+        finally:
+            await db.close()
+    
+    asyncio.run(scenario())
+
+def test_outbox_retries_transient_and_drops_permanent(tmp_path):
+    async def scenario():
+        db = DatabaseManager(str(tmp_path / "outbox.db"))
+        await db.initialize()
+        try:
+            async def sender(user_id, content, embeds):
+                if user_id == 1: raise ConnectionError("temporary")
+                if user_id == 2: raise PermanentDeliveryError("Cannot send messages to this user")
+            
+            outbox = DMOutbox(db, sender, retry_base=30)
+            await outbox.enqueue_many([(1, "a"), (2, "b"), (3, "c")])
+            assert await outbox.dispatch_once() == 1
+            
+            # 일시적 실패는 백오프 후 재시도 대기, 영구 실패는 폐기
+            rows = await db.fetch_all("SELECT user_id, attempts, last_error, next_attempt_at > CURRENT_TIMESTAMP FROM dm_outbox")
+            assert rows == [(1, 1, "temporary", 1)]
+            assert await outbox.dispatch_once() == 0
+            
+            # 재시작 후에도(새 전송함) 남은 DM은 시각이 되면 전송
+            await db.execute_query("UPDATE dm_outbox SET next_attempt_at = CURRENT_TIMESTAMP")
+            delivered = []
+            async def working_sender(user_id, content, embeds):
+                delivered.append((user_id, content))
+            assert await DMOutbox(db, working_sender).dispatch_once() == 1
+            assert delivered == [(1, "a")]
+        finally:
+            await db.close()
+    
+    asyncio.run(scenario())
+
+def test_outbox_times_out_hung_sends(tmp_path):
+    async def scenario():
+        db = DatabaseManager(str(tmp_path / "outbox.db"))
+        await db.initialize()
+        try:
+            delivered = []
+            async def sender(user_id, content, embeds):
+                if user_id == 1: await asyncio.sleep(60) # 응답 없는 전송
+                delivered.append(user_id)
+            
+            outbox = DMOutbox(db, sender, concurrency=1, send_timeout=0.05)
+            await outbox.enqueue_many([(1, "a"), (2, "b")])
+            assert await asyncio.wait_for(outbox.dispatch_once(), timeout=1) == 1
+            
+            # 시간 초과는 일시적 실패로 재시도 대기, 다른 유저 전송은 막히지 않음
+            assert delivered == [2]
+            rows = await db.fetch_all("SELECT user_id, attempts, last_error FROM dm_outbox")
+            assert rows == [(1, 1, "send timed out after 0.05s")]
+        finally:
+            await db.close()
+    
+    asyncio.run(scenario())
@@ -0,0 +1,70 @@
+import os
+import sys
+import asyncio
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.quota import SheetsQuotaGovernor, PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND, background_priority, _current_priority
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+    def __call__(self):
+        return self.now
+
+def test_background_keeps_reserve_for_interactive():
+    clock = FakeClock()
+    governor = SheetsQuotaGovernor(read_per_minute=10, write_per_minute=10, reserve_ratio=0.3, clock=clock)
+    
+    # 백그라운드는 예약분(3개)을 남기고 멈춤
+    granted = 0
+    while governor.acquire('read', PRIORITY_BACKGROUND, timeout=0):
+        granted += 1
+    assert granted == 7, f"백그라운드 허용 개수: {granted}"
+    assert governor.should_yield('read')
+    
+    # 인터랙티브는 예약분까지 사용 가능
+    for _ in range(3):
+        assert governor.acquire('read', PRIORITY_INTERACTIVE, timeout=0)
+    assert not governor.acquire('read', PRIORITY_INTERACTIVE, timeout=0)
+    
+    # 쓰기 버킷은 별도
+    assert governor.snapshot()['write']['available'] == 10
+
+def test_refill_and_penalize():
+    clock = FakeClock()
+    governor = SheetsQuotaGovernor(read_per_minute=60, write_per_minute=60, clock=clock)
+    
+    governor.penalize('write')
+    assert not governor.acquire('write', PRIORITY_INTERACTIVE, timeout=0)
+    
+    # 분당 60개 -> 1초에 1개 충전
+    clock.now += 1.0
+    assert governor.acquire('write', PRIORITY_INTERACTIVE, timeout=0)
+    assert governor.snapshot()['throttled'] == 1
+
+def test_background_priority_context():
+    assert _current_priority.get() == PRIORITY_INTERACTIVE
+    with background_priority():
+        assert _current_priority.get() == PRIORITY_BACKGROUND
+    assert _current_priority.get() == PRIORITY_INTERACTIVE
+
+def test_wait_async_backs_off_after_429():
+    clock = FakeClock()
+    governor = SheetsQuotaGovernor(read_per_minute=600, write_per_minute=600, clock=clock)
+    
+    async def scenario():
+        # 토큰이 있으면 바로 반환 (소비하지 않음)
+        await governor.wait_async('read')
+        assert governor.snapshot()['read']['available'] == 600
+        
+        # 429로 버킷이 비면 충전될 때까지 이벤트 루프에서 대기
+        governor.penalize('read')
+        waiter = asyncio.create_task(governor.wait_async('read'))
+        await asyncio.sleep(0.05)
+        assert not waiter.done()
+        clock.now += 1.0
+        await asyncio.wait_for(waiter, timeout=1)
+    
+    asyncio.run(scenario())
@@ -0,0 +1,59 @@
+import os
+import sys
+import asyncio
+import datetime
+import logging
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.scheduler import TimerScheduler
+
+logging.basicConfig(level=logging.INFO)
+
+def test_timer_scheduler_fires_in_due_order():
+    async def scenario():
+        fired = []
+        async def handler(key, kind):
+            fired.append((key, kind))
+        
+        scheduler = TimerScheduler(handler)
+        scheduler.start()
+        try:
+            now = datetime.datetime.now()
+            # 먼 예약 -> 대기 중 더 이른 예약 추가 시 다시 계산해야 함
+            scheduler.schedule(now + datetime.timedelta(hours=1), "late", "start")
+            await asyncio.sleep(0.01)
+            scheduler.schedule(now + datetime.timedelta(milliseconds=60), "b", "start")
+            scheduler.schedule(now + datetime.timedelta(milliseconds=30), "a", "notify")
+            # 이미 지난 예약은 즉시 실행
+            scheduler.schedule(now - datetime.timedelta(minutes=1), "past", "start")
+            await asyncio.sleep(0.15)
+            
+            assert fired == [("past", "start"), ("a", "notify"), ("b", "start")]
+            assert len(scheduler) == 1
+        finally:
+            scheduler.stop()
+    
+    asyncio.run(scenario())
+
+def test_timer_scheduler_handler_errors_do_not_stop_timer():
+    async def scenario():
+        fired = []
+        async def handler(key, kind):
+            if key == "bad": raise RuntimeError("channel missing")
+            fired.append(key)
+        
+        scheduler = TimerScheduler(handler)
+        scheduler.start()
+        try:
+            now = datetime.datetime.now()
+            scheduler.schedule(now, "bad", "start")
+            scheduler.schedule(now + datetime.timedelta(milliseconds=20), "good", "start")
+            await asyncio.sleep(0.1)
+            assert fired == ["good"]
+            assert len(scheduler) == 0
+        finally:
+            scheduler.stop()
+    
+    asyncio.run(scenario())
@@ -0,0 +1,352 @@
+import os
+import sys
+import asyncio
+import logging
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.sheets import SheetsManager
+from utils.database import DatabaseManager
+
+logging.basicConfig(level=logging.INFO)
+
+def make_manager():
+    """구글 연결 없이 캐시만 사용하는 SheetsManager 생성"""
+    sheets = SheetsManager()
+    sheets.client = None
+    sheets.cached_data = {
+        "metadata": {"111": "홍길동", "222": "김 철수"},
+        "metadata_last_update": "2999-01-01T00:00:00",
+        "stats": [
+            {"name": "홍길동", "hp": 100, "sanity": 80, "perception": 50, "intelligence": 40, "willpower": 30},
+            {"name": "김철수", "hp": 90, "sanity": 90, "perception": 40, "intelligence": 60, "willpower": 50},
+        ],
+    }
+    sheets.rebuild_stats_index()
+    return sheets
+
+def test_stats_index_lookup():
+    sheets = make_manager()
+    
+    # Discord ID / 정규화된 이름 / 닉네임 모두 같은 스탯을 반환해야 함
+    assert sheets.get_user_stats(discord_id="111")["hp"] == 100
+    assert sheets.get_user_stats(discord_id="222")["intelligence"] == 60
+    assert sheets.get_user_stats(nickname="[탐사자] 김 철수/90/90")["name"] == "김철수"
+
+def test_stats_negative_cache():
+    sheets = make_manager()
+    calls = []
+    sheets.fetch_all_stats = lambda: calls.append(1) or []
+    
+    # 미등록 유저는 최초 1회만 시트를 조회하고 이후에는 캐시된 실패를 반환
+    for _ in range(5):
+        assert sheets.get_user_stats(nickname="없는사람") is None
+    assert len(calls) == 1, f"fetch_all_stats 호출 횟수: {len(calls)}"
+    
+    # 갱신(인덱스 재구성) 후에는 다시 조회 가능
+    sheets.rebuild_stats_index()
+    sheets.get_user_stats(nickname="없는사람")
+    assert len(calls) == 2
+
+def test_item_catalog_index():
+    sheets = make_manager()
+    sheets.cached_data['items'] = [
+        sheets.parse_item_row(["item_001", "건빵", "음식", "딱딱한 빵", "허기+15"]),
+        sheets.parse_item_row(["item_002", "통조림", "음식", "고기 통조림", "30"]),
+        sheets.parse_item_row(["item_003", "손전등", "도구", "빛을 비춘다"]),
+    ]
+    sheets.cached_data['items_last_update'] = "2999-01-01T00:00:00"
+    sheets.rebuild_item_index()
+    sheets.load_item_catalog = lambda: (_ for _ in ()).throw(AssertionError("시트 조회 발생"))
+    
+    assert sheets.get_item_data("건빵")["hunger_recovery"] == 15
+    assert sheets.get_item_data("통 조림")["hunger_recovery"] == 30
+    assert sheets.get_item_data("item_003")["name"] == "손전등"
+    assert sheets.get_item_data("손전등")["hunger_recovery"] == 0
+    assert sheets.get_item_data("없는아이템") is None
+
+def test_admin_permission_resolver():
+    import config
+    sheets = make_manager()
+    sheets.cached_data['admin_ids'] = ["333"]
+    sheets.rebuild_admin_ids()
+    
+    assert sheets.get_admin_permission(333)
+    assert sheets.get_admin_permission(config.ADMIN_IDS[0])
+    assert not sheets.get_admin_permission(111)
+
+def test_single_flight_coalesces_concurrent_fetches():
+    import threading
+    import time
+    
+    class SlowWorksheet:
+        def __init__(self):
+            self.calls = 0
+        def get_all_values(self):
+            self.calls += 1
+            time.sleep(0.2)
+            return [[], [], ["", "홍길동", "", "", "100", "80", "50", "40", "30"]]
+    
+    worksheet = SlowWorksheet()
+    
+    class FakeSpreadsheet:
+        def worksheet(self, name):
+            return worksheet
+    
+    class FakeClient:
+        def open_by_key(self, key):
+            return FakeSpreadsheet()
+    
+    sheets = make_manager()
+    sheets.client = FakeClient()
+    sheets.save_cache = lambda: None
+    
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(sheets.fetch_all_stats())) for _ in range(5)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    
+    assert worksheet.calls == 1, f"시트 조회 횟수: {worksheet.calls}"
+    assert len(results) == 5 and all(r == results[0] for r in results)
+    assert sheets.coalesced_count == 4
+
+def test_metadata_cache_hit_skips_single_flight():
+    import threading
+    from utils.sheets import _InFlightCall
+    
+    sheets = make_manager()
+    # 진행 중인(끝나지 않는) 메타데이터 조회가 있어도 캐시 적중은 기다리지 않음
+    sheets._inflight['metadata'] = _InFlightCall()
+    results = []
+    reader = threading.Thread(target=lambda: results.append(sheets.get_metadata_map()))
+    reader.start()
+    reader.join(timeout=1)
+    
+    assert results == [{"111": "홍길동", "222": "김 철수"}]
+    assert sheets.coalesced_count == 0
+
+class FakeHTTPClient:
+    """values:batchGet / 메타데이터 조회 호출만 기록하는 가짜 HTTP 클라이언트"""
+    def __init__(self, tabs):
+        self.tabs = tabs
+        self.batch_calls = []
+        self.metadata_calls = 0
+        self.update_calls = []
+
+    def fetch_sheet_metadata(self, spreadsheet_id, params=None):
+        self.metadata_calls += 1
+        return {"sheets": [{"properties": {"title": t}} for t in self.tabs]}
+
+    def values_batch_get(self, spreadsheet_id, ranges, params=None):
+        self.batch_calls.append(list(ranges))
+        return {"valueRanges": [{"values": self.tabs[r.strip("'")]} if self.tabs[r.strip("'")] else {} for r in ranges]}
+
+    def values_batch_update(self, spreadsheet_id, body=None):
+        self.update_calls.append(body["data"])
+        return {}
+
+class FakeClient:
+    def __init__(self, tabs):
+        self.http_client = FakeHTTPClient(tabs)
+
+def test_master_data_snapshot_single_batch_get():
+    sheets = make_manager()
+    sheets.save_cache = lambda: None
+    sheets.client = FakeClient({
+        "메타데이터시트": [["이름", "ID"], ["홍길동", "111"]],
+        "아이템데이터": [["ID", "이름", "종류", "설명", "효과"], ["1", "빵", "소모품", "", "허기+20"]],
+        "관리자권한": [["ID"], ["999"]],
+        "광기데이터": [["ID", "이름", "효과"], ["m1", "공포", "정신-5"]],
+        # 마지막 열(메시지)이 비어 잘린 행도 get_all_values()처럼 채워져야 함
+        "단서조합": [["조합", "단서", "결과", "타입", "메시지"], ["c1", "a,b", "c", "clue"], ["c2", "x,y", "z", "clue", "완성"]],
+    })
+    
+    assert sheets.load_master_data_snapshot() is True
+    
+    http = sheets.client.http_client
+    assert len(http.batch_calls) == 1 and len(http.batch_calls[0]) == 5
+    assert http.metadata_calls == 0
+    assert sheets.get_item_data("빵")["name"] == "빵"
+    assert sheets.get_admin_permission(999)
+    assert len(sheets.cached_data["clue_combinations"]) == 2
+    # 광기 데이터는 스냅샷 캐시에서 반환 (시트 재조회 없음)
+    assert [m["name"] for m in sheets.get_madness_data()] == ["공포"]
+
+def test_investigation_snapshot_skips_ignored_tabs():
+    sheets = make_manager()
+    header = [[""] * 18]
+    sheets.client = FakeClient({
+        "0.설명": header,
+        "예시 지역": header,
+        "저택": header + [["1층", "거실", "", "", "", "", "", "", "", "", "", "", "", "", "", "", "", ""]],
+    })
+    
+    world_map = sheets.fetch_investigation_data()
+    
+    http = sheets.client.http_client
+    assert http.metadata_calls == 1
+    assert http.batch_calls == [["'저택'"]]
+    assert list(world_map.keys()) == ["저택"]
+    # 조회 시 노드 ID 그래프도 함께 컴파일
+    assert sheets.investigation_graph.parent("저택_1층_거실")["id"] == "저택_1층"
+
+def test_inventory_delta_sync(tmp_path):
+    sheets = make_manager()
+    sheets.client = FakeClient({
+        "인벤토리": [["", "이름", "", "", "", "F", "G", "H", "I", "J"], ["", "홍길동", "", "", "", "빵", "", "", "", ""], ["", "김 철수", "", "", "", "", "", "", "", ""]],
+    })
+    http = sheets.client.http_client
+    
+    async def scenario():
+        db = DatabaseManager(str(tmp_path / "inventory.db"))
+        await db.initialize()
+        try:
+            # 시트 -> DB 가져오기로 섀도가 채워지고, 내용이 같으므로 쓰기 없음
+            await sheets.sync_sheet_inventory_to_db_async(db)
+            await sheets.sync_db_inventory_to_sheet_async(db)
+            assert http.update_calls == []
+            assert await db.fetch_dirty_inventory_users() == []
+            
+            # 시트 내용이 마지막 가져오기와 같으면 DB를 다시 쓰지 않음
+            await sheets.sync_sheet_inventory_to_db_async(db)
+            assert await db.fetch_dirty_inventory_users() == []
+            
+            # 변경이 없으면 구글 API 호출 없음
+            reads = len(http.batch_calls)
+            await sheets.sync_db_inventory_to_sheet_async(db)
+            assert len(http.batch_calls) == reads and http.update_calls == []
+            
+            # 변경된 유저의 행만 1회의 batchUpdate로 반영
+            await db.execute_query("INSERT INTO user_inventory (user_id, item_name, count) VALUES (222, '붕대', 2)")
+            await sheets.sync_db_inventory_to_sheet_async(db)
+            assert http.update_calls == [[{"range": "'인벤토리'!F3:J3", "values": [["붕대", "붕대", "", "", ""]]}]]
+            assert len(http.batch_calls) == reads
+            assert await db.fetch_dirty_inventory_users() == []
+        finally:
+            await db.close()
+    
+    asyncio.run(scenario())
+
+def test_user_state_range_diff_writer():
+    sheets = make_manager()
+    header = ["Discord ID", "캐릭터명", "현재 체력", "현재 정신력", "현재 허기", "감염도", "마지막 허기 업데이트", "마지막 정신력 회복"]
+    sheets.client = FakeClient({
+        "유저_상태": [header, ["111", "홍길동", "100", "80", "50", "0", "", ""], ["999", "탈퇴자", "1", "1", "1", "0", "", ""]],
+    })
+    http = sheets.client.http_client
+    
+    states = [(111, 100, 70, 50, 0, None, None, 0), (222, 90, 90, 100, 0, None, None, 0)]
+    sheets.sync_db_to_sheets(states)
+    
+    # 바뀐 셀(정신력)만 갱신하고 새 유저는 맨 아래에 추가 - 1회의 batchUpdate
+    assert http.update_calls == [[
+        {"range": "'유저_상태'!D2:D2", "values": [[70]]},
+        {"range": "'유저_상태'!A4:H4", "values": [["222", "김 철수", 90, 90, 100, 0, "", ""]]},
+    ]]
+    
+    # 변경이 없으면 시트를 다시 읽거나 쓰지 않음
+    sheets.sync_db_to_sheets(states)
+    assert len(http.batch_calls) == 1 and len(http.update_calls) == 1
+
+def test_hunger_sync_batches_changed_rows(tmp_path):
+    sheets = make_manager()
+    sheets.client = FakeClient({
+        "인벤토리": [["", "이름", "체력", "정신력", "허기"], ["", "홍길동", "100", "80", "40"], ["", "김 철수", "90", "", "100"]],
+    })
+    
+    async def scenario():
+        db = DatabaseManager(str(tmp_path / "hunger.db"))
+        await db.initialize()
+        try:
+            await db.executemany("INSERT INTO user_state (user_id, current_hp, current_sanity, current_hunger) VALUES (?, ?, ?, ?)",
+                                 [(111, 100, 80, 50), (222, 90, 90, 100)])
+            commits = []
+            original_commit = db.writer.commit
+            async def counting_commit():
+                commits.append(1)
+                await original_commit()
+            db.writer.commit = counting_commit
+            
+            await sheets.sync_hunger_from_sheet_async(db)
+            
+            # 허기가 바뀐 1명만 갱신, 값이 같은 유저는 건너뜀 - 커밋 1회
+            assert len(commits) == 1
+            rows = await db.fetch_all("SELECT user_id, current_hp, current_sanity, current_hunger FROM user_state ORDER BY user_id")
+            assert rows == [(111, 100, 80, 40), (222, 90, 90, 100)]
+            
+            # 모두 일치하면 커밋하지 않음
+            await sheets.sync_hunger_from_sheet_async(db)
+            assert len(commits) == 1
+        finally:
+            await db.close()
+    
+    asyncio.run(scenario())
+
+def test_character_stats_mirror(tmp_path):
+    sheets = make_manager()
+    
+    async def scenario():
+        db = DatabaseManager(str(tmp_path / "stats.db"))
+        await db.initialize()
+        try:
+            await db.execute_query("INSERT INTO character_stats (user_id, name) VALUES (999, '탈퇴자')")
+            await sheets.sync_character_stats_async(db)
+            
+            # Discord ID 기준으로 미러링, 시트에서 사라진 유저는 삭제
+            rows = await db.fetch_all("SELECT user_id, name, max_hp, max_sanity, intelligence, willpower FROM character_stats ORDER BY user_id")
+            assert rows == [(111, "홍길동", 100, 80, 40, 30), (222, "김철수", 90, 90, 60, 50)]
+            
+            # user_state와 JOIN해 일괄 계산에 사용
+            await db.execute_query("INSERT INTO user_state (user_id, current_hunger) VALUES (222, 30)")
+            joined = await db.fetch_all(
+                "SELECT s.user_id, s.current_hunger, c.willpower FROM user_state s JOIN character_stats c ON c.user_id = s.user_id"
+            )
+            assert joined == [(222, 30, 50)]
+            
+            # 변경된 스탯만 갱신
+            sheets.cached_data["stats"][1]["willpower"] = 70
+            sheets.rebuild_stats_index()
+            await sheets.sync_character_stats_async(db)
+            assert await db.fetch_one("SELECT willpower FROM character_stats WHERE user_id = 222") == (70,)
+        finally:
+            await db.close()
+    
+    asyncio.run(scenario())
+
+def test_stats_miss_refresh_updates_mirror(tmp_path):
+    sheets = make_manager()
+    sheets.save_cache = lambda: None
+    sheets.cached_data["metadata"]["333"] = "이영희"
+    sheets.rebuild_stats_index()
+    
+    class FakeWorksheet:
+        def get_all_values(self):
+            return [[], [], ["", "홍길동", "", "", "100", "80", "50", "40", "30"], ["", "이영희", "", "", "110", "70", "45", "55", "35"]]
+    
+    class FakeSpreadsheet:
+        def worksheet(self, name):
+            return FakeWorksheet()
+    
+    class FakeSheetClient:
+        def open_by_key(self, key):
+            return FakeSpreadsheet()
+    
+    async def scenario():
+        db = DatabaseManager(str(tmp_path / "stats.db"))
+        await db.initialize()
+        try:
+            sheets.attach_db(db)
+            
+            # 캐시 미스로 시트를 다시 읽으면 (스레드 안) DB 미러도 갱신
+            sheets.client = FakeSheetClient()
+            stat = await sheets.get_user_stats_async(discord_id="333")
+            assert stat["hp"] == 110
+            await sheets.wait_character_stats_mirror()
+            
+            rows = await db.fetch_all("SELECT user_id, max_hp, intelligence FROM character_stats ORDER BY user_id")
+            assert rows == [(111, 100, 40), (333, 110, 55)]
+        finally:
+            await db.close()
+    
+    asyncio.run(scenario())
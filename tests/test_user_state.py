@@ -0,0 +1,164 @@
+import os
+import sys
+import asyncio
+import logging
+import datetime
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.database import DatabaseManager
+from utils.user_state import UserStateRecord
+
+logging.basicConfig(level=logging.INFO)
+
+def test_user_state_repository_write_through(tmp_path):
+    async def scenario():
+        db = DatabaseManager(str(tmp_path / "state.db"))
+        await db.initialize()
+        try:
+            repo = db.user_states
+            queries = []
+            original_fetch_one = db.fetch_one
+            async def counting_fetch_one(query, params=()):
+                queries.append(query)
+                return await original_fetch_one(query, params)
+            db.fetch_one = counting_fetch_one
+            
+            # 최초 조회 시 INSERT ... RETURNING 1회로 생성
+            state = await repo.get(1, hp=90, sanity=90, hunger=50)
+            assert isinstance(state, UserStateRecord)
+            assert (state.hp, state.sanity, state.hunger, state.pollution) == (90, 90, 50, 0)
+            
+            # 이후 조회는 메모리 (SELECT 없음)
+            assert (await repo.get(1)).hp == 90
+            assert (await repo.find(1)).sanity == 90
+            assert queries == []
+            
+            # 변경은 DB에 먼저 기록
+            await repo.update(1, hp=40, hunger_zero_days=2)
+            assert (await repo.find(1)).hp == 40
+            assert await original_fetch_one("SELECT current_hp, hunger_zero_days FROM user_state WHERE user_id = 1") == (40, 2)
+            
+            # 롤백되면 메모리 값도 DB 값으로 돌아감
+            try:
+                async with db.transaction():
+                    await repo.update(1, hp=0)
+                    raise RuntimeError("rollback")
+            except RuntimeError:
+                pass
+            assert (await repo.find(1)).hp == 40
+        finally:
+            await db.close()
+    
+    asyncio.run(scenario())
+
+def test_apply_deltas_clamps_multiple_users(tmp_path):
+    async def scenario():
+        db = DatabaseManager(str(tmp_path / "state.db"))
+        await db.initialize()
+        try:
+            repo = db.user_states
+            await repo.get(1, hp=10, sanity=70, hunger=40)
+            await repo.get(2, hp=100, sanity=85, hunger=5)
+            
+            # 여러 유저의 변화량을 1문장으로 적용 - 0 ~ 상한(유저별 최대치)으로 제한
+            records = await repo.apply_deltas(
+                {1: {"hp": -30, "pollution": 15}, 2: {"sanity": 20, "hunger": -10}, 3: {"hp": -5}},
+                {2: {"sanity": 90}}
+            )
+            assert set(records) == {1, 2} # 행이 없는 유저는 제외
+            assert (records[1].hp, records[1].sanity, records[1].pollution) == (0, 70, 15)
+            assert (records[2].hp, records[2].sanity, records[2].hunger) == (100, 90, 0)
+            
+            # RETURNING 결과가 메모리에 반영되어 DB와 일치
+            assert (await repo.find(2)).sanity == 90
+            assert await db.fetch_one("SELECT current_hp, current_pollution FROM user_state WHERE user_id = 1") == (0, 15)
+            
+            # 변화량이 없으면 쿼리 없이 빈 결과
+            assert await repo.apply_deltas({1: {"hp": 0}}) == {}
+        finally:
+            await db.close()
+    
+    asyncio.run(scenario())
+
+def test_lazy_meters_match_sql_and_tick(tmp_path):
+    from utils.daily_tick import DailyTickPipeline
+    
+    async def scenario():
+        db = DatabaseManager(str(tmp_path / "state.db"))
+        await db.initialize()
+        try:
+            repo = db.user_states
+            await db.executemany(
+                "INSERT INTO user_state (user_id, current_hp, current_sanity, current_hunger) VALUES (?, ?, ?, ?)",
+                [(1, 100, 50, 5), (2, 100, 70, 50)]
+            )
+            await db.executemany(
+                "INSERT INTO character_stats (user_id, name, max_hp, max_sanity, intelligence, willpower) VALUES (?, ?, ?, ?, ?, ?)",
+                [(1, "A", 100, 80, 0, 0), (2, "B", 100, 80, 50, 50)]
+            )
+            await repo.prepare_meters(True, now="2026-01-01 00:00:00")
+            assert repo.lazy_meters
+            stats = {"sanity": 80, "intelligence": 50, "willpower": 50}
+            
+            # 허기 14.8/일 감소, 허기가 29.6 이상인 동안만 정신력 +5/일 (약 1.38일)
+            state = await repo.find(2)
+            hunger, sanity = repo.live_values(state, stats, now="2026-01-02 00:00:00")
+            assert (round(hunger, 1), round(sanity, 1)) == (35.2, 75.0)
+            hunger, sanity = repo.live_values(state, stats, now="2026-01-03 12:00:00")
+            assert (round(hunger, 1), round(sanity, 2)) == (13.0, 76.89)
+            
+            # 쓰기 직전 기록(SQL)은 조회 계산(Python)과 같은 값
+            records = await repo.materialize_meters(now="2026-01-03 12:00:00", user_ids=[2])
+            assert (round(records[2].hunger, 1), round(records[2].sanity, 2)) == (13.0, 76.89)
+            assert records[2].last_hunger_update == "2026-01-03 12:00:00"
+            assert (await repo.find(1)).hunger == 5 # 대상이 아닌 유저는 그대로
+            
+            # 일일 틱: 전체 감소/회복 단계 없이 허기 0에 도달한 유저만 기록 후 페널티
+            pipeline = DailyTickPipeline(db, lazy_meters=True)
+            result = await pipeline.run_day(datetime.date(2026, 1, 4))
+            assert set(result["timings"]) == {"materialize_meters", "hunger_penalties", "madness_recovery"}
+            state = await repo.find(1)
+            assert (state.hunger, state.hunger_zero_days, state.hp) == (0, 1, 95)
+            
+            # eager 모드로 돌아가면 경과분을 기록
+            await repo.prepare_meters(False, now="2026-01-04 00:00:00")
+            assert not repo.lazy_meters
+            assert round((await repo.find(2)).hunger, 1) == 5.6
+        finally:
+            await db.close()
+    
+    asyncio.run(scenario())
+
+def test_late_tick_keeps_newer_meter_baseline(tmp_path):
+    from utils.daily_tick import DailyTickPipeline
+    
+    async def scenario():
+        db = DatabaseManager(str(tmp_path / "state.db"))
+        await db.initialize()
+        try:
+            repo = db.user_states
+            await db.execute_query(
+                "INSERT INTO user_state (user_id, current_hp, current_sanity, current_hunger, hunger_zero_days) VALUES (?, ?, ?, ?, ?)",
+                (2, 100, 80, 50, 1)
+            )
+            await db.execute_query(
+                "INSERT INTO character_stats (user_id, name, max_hp, max_sanity, intelligence, willpower) VALUES (?, ?, ?, ?, ?, ?)",
+                (2, "B", 100, 80, 50, 50)
+            )
+            await repo.prepare_meters(True, now="2026-01-04 08:00:00")
+            
+            # 08시 기준값이 있는 상태에서 그날 틱이 늦게(재시작 후 따라잡기) 실행되어도 기준 시각은 자정으로 돌아가지 않음
+            pipeline = DailyTickPipeline(db, lazy_meters=True)
+            await pipeline.run_day(datetime.date(2026, 1, 4))
+            state = await repo.find(2)
+            assert (state.hunger, state.last_hunger_update, state.last_sanity_update) == (50, "2026-01-04 08:00:00", "2026-01-04 08:00:00")
+            
+            # 감소는 08시부터 16시간분만 (14.8/일)
+            hunger, _ = repo.live_values(state, {"sanity": 80, "intelligence": 50, "willpower": 50}, now="2026-01-05 00:00:00")
+            assert round(hunger, 2) == 40.13
+        finally:
+            await db.close()
+    
+    asyncio.run(scenario())
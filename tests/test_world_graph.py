@@ -0,0 +1,86 @@
+import os
+import sys
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.world_graph import WorldGraph
+
+def make_node(node_id, name, children=(), is_channel=False):
+    return {"id": node_id, "name": name, "children": {c["name"]: c for c in children}, "items": [], "is_channel": is_channel}
+
+WORLD_MAP = {
+    "저택": make_node("저택", "저택", [
+        make_node("저택_1층", "1층", [
+            make_node("저택_1층_거실", "거실", [make_node("저택_1층_거실_벽난로", "벽난로")]),
+        ], is_channel=True),
+        make_node("저택_정원", "정원", is_channel=True),
+    ]),
+    "숲": make_node("숲", "숲", [make_node("숲_오두막", "오두막", is_channel=True)]),
+}
+
+class FakeChannel:
+    def __init__(self, channel_id, name):
+        self.id = channel_id
+        self.name = name
+
+class FakeGuild:
+    def __init__(self, channels):
+        self.id = 1
+        self._channels = channels
+        self.scans = 0
+
+    @property
+    def channels(self):
+        self.scans += 1
+        return self._channels
+
+    def get_channel(self, channel_id):
+        return next((c for c in self._channels if c.id == channel_id), None)
+
+def test_parent_and_depth_lookup():
+    graph = WorldGraph(WORLD_MAP)
+    
+    assert len(graph) == 7
+    assert graph.parent("저택_1층_거실_벽난로")["id"] == "저택_1층_거실"
+    assert graph.parent("저택_1층")["id"] == "저택"
+    assert graph.parent("저택") is None
+    assert graph.depth("저택_1층_거실_벽난로") == 3
+    assert graph.categories["숲_오두막"] == "숲"
+    # 노드 dict는 원본 트리와 공유
+    assert graph.node("저택_정원") is WORLD_MAP["저택"]["children"]["정원"]
+
+def test_channel_binding_rebinds_on_rename():
+    graph = WorldGraph(WORLD_MAP)
+    garden = FakeChannel(10, "정원")
+    guild = FakeGuild([FakeChannel(9, "1층"), garden])
+    
+    assert graph.channel_for(guild, graph.node("저택_정원")) is garden
+    assert graph.channel_bindings == {"저택_1층": 9, "저택_정원": 10}
+    assert graph.channel_for(guild, graph.node("숲_오두막")) is None
+    
+    # 채널 이름이 바뀌면 다시 연결
+    garden.name = "옛정원"
+    cabin = FakeChannel(11, "정원")
+    guild._channels.append(cabin)
+    assert graph.channel_for(guild, graph.node("저택_정원")) is cabin
+
+def test_missing_channel_is_not_rescanned():
+    graph = WorldGraph(WORLD_MAP)
+    guild = FakeGuild([FakeChannel(9, "1층"), FakeChannel(10, "정원")])
+    
+    # 갱신 시점에 바인딩 -> 이후 이동은 길드 채널을 다시 훑지 않음
+    graph.bind_channels(guild)
+    assert guild.scans == 1
+    assert graph.missing_channels == {"숲_오두막"}
+    for _ in range(3):
+        assert graph.channel_for(guild, graph.node("숲_오두막")) is None
+        assert graph.channel_for(guild, graph.node("저택_정원")).id == 10
+    assert guild.scans == 1
+    
+    # 다음 갱신(재컴파일 + 바인딩)에서 새로 생긴 채널을 찾음
+    guild._channels.append(FakeChannel(11, "오두막"))
+    graph.compile(WORLD_MAP)
+    graph.bind_channels(guild)
+    assert graph.channel_for(guild, graph.node("숲_오두막")).id == 11
+    assert guild.scans == 2
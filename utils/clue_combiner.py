@@ -0,0 +1,51 @@
+import logging
+
+logger = logging.getLogger('utils.clue_combiner')
+
+class ClueCombinationIndex:
+    """
+    단서 조합 레시피를 단서 ID 기준 역색인으로 컴파일한 클래스입니다.
+    새 단서가 추가되면 그 단서를 필요로 하는 레시피만 검사합니다.
+    """
+
+    def __init__(self, recipes=None):
+        self.recipes = []
+        self.by_clue = {} # clue_id -> [recipe, ...]
+        self.signature = ()
+        if recipes:
+            self.compile(recipes)
+
+    def compile(self, recipes):
+        """레시피 목록을 역색인으로 컴파일합니다."""
+        compiled = []
+        by_clue = {}
+        
+        for recipe in recipes:
+            required = frozenset(recipe['required_clues'])
+            if not required: continue
+            
+            entry = dict(recipe, required=required)
+            compiled.append(entry)
+            for clue_id in required:
+                by_clue.setdefault(clue_id, []).append(entry)
+        
+        self.recipes = compiled
+        self.by_clue = by_clue
+        # 레시피 변경 여부 판단용 (내용 기준 비교)
+        self.signature = tuple(sorted(
+            (r['recipe_id'], tuple(sorted(r['required'])), r['result_type'], r['result_id'])
+            for r in compiled
+        ))
+        logger.debug(f"Compiled {len(compiled)} clue recipes ({len(by_clue)} indexed clues)")
+
+    def recipes_for(self, clue_id):
+        """해당 단서를 재료로 사용하는 레시피 목록"""
+        return self.by_clue.get(clue_id, [])
+
+    def find_completed(self, user_clues, new_clue_id=None):
+        """
+        보유 단서(set)로 완성되는 레시피를 반환합니다.
+        new_clue_id가 주어지면 그 단서가 포함된 레시피만 검사합니다.
+        """
+        candidates = self.recipes if new_clue_id is None else self.recipes_for(new_clue_id)
+        return [r for r in candidates if r['required'] <= user_clues]
@@ -0,0 +1,186 @@
+import datetime
+import logging
+import time
+from utils.game_logic import GameLogic
+from utils.meters import HUNGER_DECAY_SQL, SANITY_THRESHOLD_SQL, LIVE_HUNGER_SQL
+from utils.user_state import STATE_COLUMNS
+
+logger = logging.getLogger('utils.daily_tick')
+
+# 마지막으로 처리한 일일 틱 날짜 (world_state 키, ISO 날짜)
+CHECKPOINT_KEY = "daily_tick_last_day"
+
+class DailyTickPipeline:
+    """
+    일일 생존 틱 (허기 페널티 -> 허기 감소 -> 정신력 회복 -> 광기 회복)
+    하루치 단계 전체와 체크포인트 기록을 한 트랜잭션으로 처리하므로, 중간에 실패하면 그날은 다시 실행됩니다.
+    각 단계는 user_state / character_stats에 대한 일괄 SQL로 실행되며 단계별 소요 시간을 daily_tick_runs에 남깁니다.
+    lazy_meters 모드에서는 허기/정신력을 조회 시점에 계산하므로 전체 허기 감소/정신력 회복 단계가 없고,
+    허기 페널티 대상(허기 0 도달 또는 0 지속 중인 유저)만 틱 시각 기준으로 기록합니다.
+    """
+
+    def __init__(self, db, max_catchup_days=7, lazy_meters=False, outbox=None):
+        self.db = db
+        self.outbox = outbox # 알림 DM은 같은 트랜잭션에서 DM 전송함에 기록
+        self.max_catchup_days = max_catchup_days
+        if lazy_meters:
+            self.stages = [
+                ("materialize_meters", self.stage_materialize_meters),
+                ("hunger_penalties", self.stage_hunger_penalties),
+                ("madness_recovery", self.stage_madness_recovery),
+            ]
+        else:
+            self.stages = [
+                ("hunger_penalties", self.stage_hunger_penalties),
+                ("hunger_decay", self.stage_hunger_decay),
+                ("sanity_recovery", self.stage_sanity_recovery),
+                ("madness_recovery", self.stage_madness_recovery),
+            ]
+
+    async def pending_days(self, today):
+        """체크포인트 다음 날부터 today까지 처리할 날짜 목록"""
+        last = await self.db.get_world_value(CHECKPOINT_KEY)
+        if last is None:
+            # 첫 실행: 오늘 틱은 처리된 것으로 보고 다음 날부터 시작
+            await self.db.set_world_value(CHECKPOINT_KEY, today.isoformat())
+            return []
+
+        last_day = datetime.date.fromisoformat(last)
+        missed = (today - last_day).days
+        if missed <= 0: return []
+        if missed > self.max_catchup_days:
+            logger.warning(f"Daily tick missed {missed} days; replaying only the last {self.max_catchup_days}.")
+            missed = self.max_catchup_days
+        return [today - datetime.timedelta(days=offset) for offset in range(missed - 1, -1, -1)]
+
+    async def run_day(self, day):
+        """
+        하루치 틱 실행 (트랜잭션 1회)
+        반환: {"day", "timings": {단계: ms}, "messages": [(user_id, 메시지)], "changed_users": set}
+        """
+        result = {"day": day, "timings": {}, "messages": [], "changed_users": set()}
+        async with self.db.transaction():
+            for name, stage in self.stages:
+                started = time.perf_counter()
+                affected = await stage(result)
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                result["timings"][name] = elapsed_ms
+                await self.db.execute_query(
+                    "INSERT INTO daily_tick_runs (day, stage, duration_ms, affected_rows) VALUES (?, ?, ?, ?)",
+                    (day.isoformat(), name, round(elapsed_ms, 3), affected)
+                )
+            if self.outbox:
+                await self.outbox.enqueue_many(result["messages"])
+            await self.db.set_world_value(CHECKPOINT_KEY, day.isoformat())
+
+        timings = ", ".join(f"{name} {ms:.1f}ms" for name, ms in result["timings"].items())
+        logger.info(f"Daily tick {day.isoformat()} done ({timings})")
+        return result
+
+    async def run_pending(self, today):
+        """밀린 날짜를 순서대로 처리 (다운타임 복구 포함)"""
+        results = []
+        for day in await self.pending_days(today):
+            results.append(await self.run_day(day))
+        return results
+
+    def _store(self, result, rows):
+        """RETURNING으로 받은 user_state 행을 메모리 저장소에 반영"""
+        records = [self.db.user_states.store(row) for row in rows]
+        result["changed_users"].update(record.user_id for record in records)
+        return records
+
+    # --- Stages ---
+
+    async def stage_materialize_meters(self, result):
+        """[lazy] 틱 시각 기준 허기가 0인 유저(또는 0 지속 일수가 있는 유저)만 현재 값을 기록"""
+        records = await self.db.user_states.materialize_meters(
+            now=f"{result['day'].isoformat()} 00:00:00",
+            condition=f"({LIVE_HUNGER_SQL} <= 0 OR hunger_zero_days > 0)"
+        )
+        result["changed_users"].update(records)
+        return len(records)
+
+    async def stage_hunger_penalties(self, result):
+        """
+        허기 0 지속 일수 갱신과 페널티
+        - 허기 > 0: 일수 0으로 리셋
+        - 허기 = 0: 일수 +1, 1~2일차 체력 -5 / 3~6일차 체력 -10, 정신력 -5 / 7일차 이상 체력 0 (행동불능)
+        """
+        days = "(COALESCE(hunger_zero_days, 0) + 1)"
+        rows = await self.db.execute_returning(
+            f"""UPDATE user_state SET
+                hunger_zero_days = CASE WHEN current_hunger > 0 THEN 0 ELSE {days} END,
+                current_hp = CASE
+                    WHEN current_hunger > 0 THEN current_hp
+                    WHEN {days} >= 7 THEN 0
+                    WHEN {days} >= 3 THEN MAX(0, current_hp - 10)
+                    ELSE MAX(0, current_hp - 5) END,
+                current_sanity = CASE
+                    WHEN current_hunger <= 0 AND {days} BETWEEN 3 AND 6 THEN MAX(0, current_sanity - 5)
+                    ELSE current_sanity END
+            WHERE current_hunger <= 0 OR hunger_zero_days > 0
+            RETURNING {STATE_COLUMNS}"""
+        )
+        for record in self._store(result, rows):
+            if record.hunger > 0: continue
+            if record.hunger_zero_days >= 7:
+                msg = "💀 **아사**\n극심한 굶주림 끝에 의식을 잃고 쓰러졌습니다. (행동불능)"
+            elif record.hunger_zero_days >= 3:
+                msg = "⚠️ **굶주림**\n굶주림으로 몸이 쇠약해집니다. (체력 -10, 정신력 -5)"
+            else:
+                msg = "⚠️ **배고픔**\n배가 고파 몸이 무겁습니다. (체력 -5)"
+            result["messages"].append((record.user_id, msg))
+        return len(rows)
+
+    async def stage_hunger_decay(self, result):
+        """허기 감소: 소모량 = 10 + (페널티 적용된 의지 * 0.1)"""
+        rows = await self.db.execute_returning(
+            f"""UPDATE user_state SET
+                current_hunger = MAX(0, current_hunger - {HUNGER_DECAY_SQL})
+            FROM character_stats c WHERE c.user_id = user_state.user_id
+            RETURNING {STATE_COLUMNS}"""
+        )
+        self._store(result, rows)
+        return len(rows)
+
+    async def stage_sanity_recovery(self, result):
+        """정신력 회복: 허기 >= 20 + (페널티 적용된 지성 * 0.2) 이면 +5 (최대 정신력까지)"""
+        rows = await self.db.execute_returning(
+            f"""UPDATE user_state SET
+                current_sanity = MAX(0, MIN(c.max_sanity, COALESCE(current_sanity, 0) + 5))
+            FROM character_stats c
+            WHERE c.user_id = user_state.user_id
+              AND current_hunger >= {SANITY_THRESHOLD_SQL}
+            RETURNING {STATE_COLUMNS}"""
+        )
+        self._store(result, rows)
+        return len(rows)
+
+    async def stage_madness_recovery(self, result):
+        """
+        광기 회복: 목표치 = 100 - (지성*0.4 + 의지*0.6) (5~95로 제한), 1d100 >= 목표치면 회복
+        판정은 광기별 주사위이므로 조회 1회 + 일괄 삭제 1회로 처리합니다.
+        """
+        entries = await self.db.fetch_all(
+            "SELECT m.id, m.user_id, m.madness_name, c.intelligence, c.willpower "
+            "FROM user_madness m JOIN character_stats c ON c.user_id = m.user_id"
+        )
+
+        recovered = []
+        for entry_id, user_id, madness_name, intelligence, willpower in entries:
+            target_threshold = max(5, min(95, 100 - (intelligence * 0.4 + willpower * 0.6)))
+            dice = GameLogic.roll_dice()
+            logger.debug(f"Madness Recovery: User {user_id} | Stat({intelligence}/{willpower}) | Target {target_threshold} | Dice {dice}")
+
+            if dice >= target_threshold:
+                recovered.append((entry_id,))
+                result["messages"].append((user_id,
+                    f"✨ **내면의 힘으로 광기 극복!**\n"
+                    f"지성({intelligence})과 의지({willpower})가 당신을 붙잡아주었습니다.\n"
+                    f"'{madness_name}' 증세가 사라졌습니다. (주사위 {dice} ≥ 목표 {int(target_threshold)})"
+                ))
+
+        if recovered:
+            await self.db.executemany("DELETE FROM user_madness WHERE id = ?", recovered)
+        return len(recovered)
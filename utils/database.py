@@ -1,23 +1,124 @@
 import aiosqlite
+import asyncio
+import sqlite3
+import urllib.parse
+import contextlib
+import contextvars
 import logging
 import datetime
 import json
 import os
+from utils.user_state import UserStateRepository
 
 logger = logging.getLogger('utils.database')
 
+GROUP_COMMIT_INTERVAL = 0.005 # 그룹 커밋: 쓰기를 모으는 최대 대기 시간 (초)
+GROUP_COMMIT_MAX_BATCH = 64 # 그룹 커밋: 한 트랜잭션에 묶는 최대 쓰기 수
+BUSY_TIMEOUT_MS = 5000 # 잠금 대기 시간 (PRAGMA busy_timeout)
+LOCK_RETRY_ATTEMPTS = 5 # 'database is locked' 재시도 횟수
+LOCK_RETRY_DELAY = 0.05 # 재시도 간격 (초, 시도마다 2배)
+
+# 스키마 마이그레이션 (버전, 설명, SQL 목록)
+# create_tables의 테이블을 기준(버전 0)으로, PRAGMA user_version보다 높은 버전만 순서대로 적용합니다.
+# 이미 배포된 항목은 수정하지 말고 새 버전을 추가하세요.
+MIGRATIONS = [
+    (1, "user_state.current_pollution 컬럼 추가", [
+        "ALTER TABLE user_state ADD COLUMN current_pollution INTEGER DEFAULT 0",
+    ]),
+    (2, "조회 경로 인덱스 추가", [
+        # /현재상태, 광기 회복: WHERE user_id = ?
+        "CREATE INDEX IF NOT EXISTS idx_user_madness_user ON user_madness (user_id)",
+        # 사고 목록: WHERE user_id = ? AND status = ?
+        "CREATE INDEX IF NOT EXISTS idx_user_thoughts_user_status ON user_thoughts (user_id, status)",
+        # /현재상태 단서 목록: WHERE user_id = ? ORDER BY acquired_at DESC
+        "CREATE INDEX IF NOT EXISTS idx_user_clues_user_acquired ON user_clues (user_id, acquired_at)",
+    ]),
+    (3, "Sheet A 캐릭터 스탯 미러 테이블 추가", [
+        # Discord ID 기준 최대 스탯/판정 스탯 (user_state와 JOIN해 일괄 계산에 사용)
+        """CREATE TABLE IF NOT EXISTS character_stats (
+            user_id INTEGER PRIMARY KEY,
+            name TEXT,
+            max_hp INTEGER DEFAULT 0,
+            max_sanity INTEGER DEFAULT 0,
+            perception INTEGER DEFAULT 0,
+            intelligence INTEGER DEFAULT 0,
+            willpower INTEGER DEFAULT 0,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )""",
+    ]),
+    (4, "일일 틱 단계별 실행 기록 테이블 추가", [
+        """CREATE TABLE IF NOT EXISTS daily_tick_runs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            day TEXT,
+            stage TEXT,
+            duration_ms REAL,
+            affected_rows INTEGER,
+            finished_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )""",
+        "CREATE INDEX IF NOT EXISTS idx_daily_tick_runs_day ON daily_tick_runs (day)",
+    ]),
+    (5, "user_state.last_sanity_update 컬럼 추가 (lazy 정신력 미터 기준 시각)", [
+        # last_sanity_recovery는 /회복 휴식 쿨다운 용도로 그대로 사용
+        "ALTER TABLE user_state ADD COLUMN last_sanity_update TIMESTAMP",
+    ]),
+    (6, "DM 전송함(dm_outbox) 테이블 추가", [
+        """CREATE TABLE IF NOT EXISTS dm_outbox (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER,
+            content TEXT,
+            embed TEXT,
+            attempts INTEGER DEFAULT 0,
+            next_attempt_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            last_error TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )""",
+        "CREATE INDEX IF NOT EXISTS idx_dm_outbox_next_attempt ON dm_outbox (next_attempt_at)",
+    ]),
+    (7, "investigation_sessions 조사 예약 컬럼 추가", [
+        # session_id: 예약 ID, location_id: 카테고리(지역) 이름
+        "ALTER TABLE investigation_sessions ADD COLUMN channel_id INTEGER",
+        "ALTER TABLE investigation_sessions ADD COLUMN scheduled_at TIMESTAMP",
+        "ALTER TABLE investigation_sessions ADD COLUMN notified INTEGER DEFAULT 0",
+        "CREATE INDEX IF NOT EXISTS idx_investigation_sessions_state_time ON investigation_sessions (state, scheduled_at)",
+    ]),
+]
+
 class DatabaseManager:
-    def __init__(self, db_path="game_data.db"):
+    def __init__(self, db_path="game_data.db", group_commit=False, readers=4):
         self.db_path = db_path
-        self.pool = None
+        # 쓰기 전용 연결 1개 + 읽기 전용 연결 풀 (WAL 모드이므로 읽기가 쓰기를 기다리지 않음)
+        self.writer = None
+        self.reader_count = readers if db_path != ":memory:" else 0
+        self._readers = None
+        self._reader_conns = []
+        # 그룹 커밋 모드: 트랜잭션 밖의 단일 쓰기를 모아 한 트랜잭션으로 커밋
+        self.group_commit = group_commit
+        self._write_queue = None
+        self._flusher = None
+        # 쓰기 연결을 공유하므로 트랜잭션은 한 번에 하나만 열리도록 직렬화
+        self._lock = asyncio.Lock()
+        # 현재 태스크가 열고 있는 트랜잭션 깊이 (0이면 트랜잭션 밖)
+        self._tx_depth = contextvars.ContextVar(f"db_tx_depth_{id(self)}", default=0)
+        # 메모리 상주 유저 상태 (write-through)
+        self.user_states = UserStateRepository(self)
 
     async def initialize(self):
         """봇 시작 시 호출: DB 연결 생성 및 테이블 초기화"""
         try:
-            self.pool = await aiosqlite.connect(self.db_path)
+            self.writer = await aiosqlite.connect(self.db_path)
             # Row Factory 설정 (딕셔너리처럼 접근 가능하게 하려면 aiosqlite.Row 사용 가능하나, 기존 코드 호환성을 위해 기본 튜플 유지)
-            # self.pool.row_factory = aiosqlite.Row 
+            # self.writer.row_factory = aiosqlite.Row 
+            await self.writer.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+            if self.reader_count:
+                await self.writer.execute("PRAGMA journal_mode = WAL")
+                await self.writer.execute("PRAGMA synchronous = NORMAL")
             await self.create_tables()
+            await self.run_migrations()
+            await self._open_readers()
+            await self.user_states.load_all()
+            if self.group_commit:
+                self._write_queue = asyncio.Queue()
+                self._flusher = asyncio.create_task(self._group_commit_loop())
             logger.info("DB Connection established.")
         except Exception as e:
             logger.error(f"Failed to initialize database: {e}")
@@ -25,10 +126,49 @@ class DatabaseManager:
 
     async def close(self):
         """봇 종료 시 호출"""
-        if self.pool:
-            await self.pool.close()
+        if self._flusher:
+            # 대기 중인 쓰기를 모두 커밋한 뒤 종료
+            await self._write_queue.join()
+            self._flusher.cancel()
+            self._flusher = None
+            self._write_queue = None
+        for conn in self._reader_conns:
+            await conn.close()
+        self._reader_conns = []
+        self._readers = None
+        if self.writer:
+            await self.writer.close()
             logger.info("DB Connection closed.")
 
+    async def run_migrations(self):
+        """적용되지 않은 스키마 마이그레이션을 버전 순서대로 적용 (버전마다 트랜잭션 1회)"""
+        version = (await self.fetch_one("PRAGMA user_version"))[0]
+        
+        for target, description, statements in MIGRATIONS:
+            if target <= version: continue
+            async with self.transaction():
+                for statement in statements:
+                    try:
+                        await self.execute_query(statement)
+                    except sqlite3.OperationalError as e:
+                        # 수동으로 먼저 추가된 컬럼은 건너뜀
+                        if "duplicate column name" not in str(e): raise
+                await self.execute_query(f"PRAGMA user_version = {target}")
+            version = target
+            logger.info(f"Applied DB migration {target}: {description}")
+
+    async def _open_readers(self):
+        """읽기 전용 연결 풀 생성 (테이블 생성 이후)"""
+        if not self.reader_count: return
+        
+        uri = f"file:{urllib.parse.quote(os.path.abspath(self.db_path))}?mode=ro"
+        self._readers = asyncio.Queue()
+        for _ in range(self.reader_count):
+            conn = await aiosqlite.connect(uri, uri=True)
+            await conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+            self._reader_conns.append(conn)
+            self._readers.put_nowait(conn)
+
     async def create_tables(self):
         """데이터베이스 테이블 초기화"""
         # 1. 유저 상태 (user_state)
@@ -175,39 +315,331 @@ class DatabaseManager:
         )
         ''')
         
+        # 13. 인벤토리 변경 추적 (inventory_dirty)
+        # 시트에 아직 반영되지 않은 인벤토리 변경 유저. seq는 변경될 때마다 증가하며,
+        # 동기화 도중 다시 변경된 유저의 표시가 지워지지 않도록 하는 데 사용합니다.
+        await self.execute_query('''
+        CREATE TABLE IF NOT EXISTS inventory_dirty (
+            user_id INTEGER PRIMARY KEY,
+            seq INTEGER NOT NULL DEFAULT 1
+        )
+        ''')
+        
+        # 어느 Cog에서 인벤토리를 수정하든 DB 계층에서 변경 유저를 기록
+        for event, row in (("INSERT", "NEW"), ("UPDATE", "NEW"), ("DELETE", "OLD")):
+            await self.execute_query(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_inventory_dirty_{event.lower()}
+            AFTER {event} ON user_inventory
+            BEGIN
+                INSERT INTO inventory_dirty (user_id) VALUES ({row}.user_id)
+                ON CONFLICT(user_id) DO UPDATE SET seq = seq + 1;
+            END
+            ''')
+        
         logger.info("Database tables initialized.")
 
+    @contextlib.asynccontextmanager
+    async def transaction(self):
+        """
+        여러 쓰기를 커밋 1회로 묶는 트랜잭션 (Unit of Work)
+        블록이 정상 종료되면 커밋하고, 예외가 발생하면 롤백한 뒤 예외를 다시 던집니다.
+        트랜잭션 안에서 다시 호출하면 SAVEPOINT로 중첩되어 안쪽 블록만 롤백됩니다.
+
+            async with db.transaction():
+                await db.execute_query(...)
+                await db.execute_query(...)
+        """
+        if not self.writer:
+            raise Exception("Database not initialized.")
+        
+        depth = self._tx_depth.get()
+        if depth:
+            async with self._savepoint(depth):
+                yield self
+            return
+        
+        async with self._lock:
+            # 다른 프로세스가 잠그고 있으면 busy_timeout 이후에도 재시도
+            await self._retry_on_locked(lambda: self.writer.execute("BEGIN IMMEDIATE"))
+            token = self._tx_depth.set(1)
+            try:
+                yield self
+            except BaseException:
+                await self.writer.rollback()
+                # 롤백된 변경이 메모리에 남지 않도록 유저 상태 캐시 무효화
+                self.user_states.invalidate()
+                raise
+            else:
+                await self.writer.commit()
+            finally:
+                self._tx_depth.reset(token)
+
+    @contextlib.asynccontextmanager
+    async def _savepoint(self, depth):
+        """중첩 트랜잭션 (SAVEPOINT)"""
+        name = f"sp_{depth}"
+        await self.writer.execute(f"SAVEPOINT {name}")
+        token = self._tx_depth.set(depth + 1)
+        try:
+            yield
+        except BaseException:
+            await self.writer.execute(f"ROLLBACK TO {name}")
+            await self.writer.execute(f"RELEASE {name}")
+            self.user_states.invalidate()
+            raise
+        else:
+            await self.writer.execute(f"RELEASE {name}")
+        finally:
+            self._tx_depth.reset(token)
+
+    def in_transaction(self):
+        """현재 태스크가 트랜잭션 안에 있는지"""
+        return self._tx_depth.get() > 0
+
+    @contextlib.asynccontextmanager
+    async def _autocommit(self):
+        """트랜잭션 안이면 그대로 실행, 밖이면 단독 트랜잭션(커밋 1회)으로 실행"""
+        if self.in_transaction():
+            yield
+        else:
+            async with self.transaction():
+                yield
+
+    @contextlib.asynccontextmanager
+    async def _read(self):
+        """
+        조회용 연결 대여
+        - 트랜잭션 안: 자신의 커밋 전 변경이 보이도록 쓰기 연결 사용
+        - 그 외: 읽기 전용 연결 풀에서 대여 (커밋된 상태만 보이며 쓰기를 기다리지 않음)
+        """
+        if self.in_transaction():
+            yield self.writer
+        elif self._readers is None:
+            # 읽기 풀이 없으면(:memory:) 다른 태스크의 트랜잭션이 끝난 뒤 쓰기 연결로 조회
+            async with self._lock:
+                yield self.writer
+        else:
+            conn = await self._readers.get()
+            try:
+                yield conn
+            finally:
+                self._readers.put_nowait(conn)
+
+    async def _retry_on_locked(self, operation):
+        """'database is locked' 오류 시 잠시 물러났다가 재시도"""
+        for attempt in range(LOCK_RETRY_ATTEMPTS):
+            try:
+                return await operation()
+            except sqlite3.OperationalError as e:
+                if "locked" not in str(e) or attempt == LOCK_RETRY_ATTEMPTS - 1:
+                    raise
+                logger.warning(f"Database is locked. Retrying ({attempt + 1}/{LOCK_RETRY_ATTEMPTS})...")
+                await asyncio.sleep(LOCK_RETRY_DELAY * (2 ** attempt))
+
+    async def _group_commit_loop(self):
+        """그룹 커밋: 큐에 쌓인 쓰기를 짧게 모아 한 트랜잭션으로 적용"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._write_queue.get()]
+            deadline = loop.time() + GROUP_COMMIT_INTERVAL
+            while len(batch) < GROUP_COMMIT_MAX_BATCH:
+                timeout = deadline - loop.time()
+                if timeout <= 0: break
+                try:
+                    batch.append(await asyncio.wait_for(self._write_queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            try:
+                await self._apply_write_batch(batch)
+            except Exception as e:
+                logger.error(f"Group commit failed: {e}")
+            finally:
+                for _ in batch:
+                    self._write_queue.task_done()
+
+    async def _apply_write_batch(self, batch):
+        """
+        모은 쓰기를 한 트랜잭션으로 적용
+        쓰기마다 SAVEPOINT를 두어 실패한 쓰기만 되돌리고, 각 호출자의 future는 커밋 이후에 완료합니다.
+        """
+        results = []
+        try:
+            async with self.transaction():
+                for query, params, many, future in batch:
+                    try:
+                        async with self._savepoint(1):
+                            async with self.writer.cursor() as cursor:
+                                if many:
+                                    await cursor.executemany(query, params)
+                                else:
+                                    await cursor.execute(query, params)
+                                results.append((future, cursor.lastrowid, None))
+                    except Exception as e:
+                        results.append((future, None, e))
+        except Exception as e:
+            # 커밋 실패: 묶인 쓰기 모두 실패 처리
+            for _, _, _, future in batch:
+                if not future.done(): future.set_exception(e)
+            raise
+        
+        for future, value, error in results:
+            if future.done(): continue # 호출자가 취소한 경우
+            if error: future.set_exception(error)
+            else: future.set_result(value)
+
+    async def _enqueue_write(self, query, params, many):
+        """그룹 커밋 큐에 쓰기를 넣고 공동 커밋이 끝날 때까지 대기"""
+        future = asyncio.get_running_loop().create_future()
+        self._write_queue.put_nowait((query, params, many, future))
+        return await future
+
+    def _use_group_commit(self):
+        return self._write_queue is not None and not self.in_transaction()
+
     async def execute_query(self, query, params=()):
         """비동기 쿼리 실행 (INSERT, UPDATE, DELETE)"""
-        if not self.pool:
+        if not self.writer:
             raise Exception("Database not initialized. Call initialize() first.")
+        if self._use_group_commit():
+            return await self._enqueue_write(query, params, False)
             
-        async with self.pool.cursor() as cursor:
-            await cursor.execute(query, params)
-            await self.pool.commit()
-            return cursor.lastrowid
+        async with self._autocommit():
+            async with self.writer.cursor() as cursor:
+                await cursor.execute(query, params)
+                return cursor.lastrowid
 
     async def executemany(self, query, params_list):
         """비동기 대량 쿼리 실행 (Batch Processing)"""
-        if not self.pool:
+        if not self.writer:
             raise Exception("Database not initialized.")
+        if self._use_group_commit():
+            await self._enqueue_write(query, params_list, True)
+            return
             
-        async with self.pool.cursor() as cursor:
-            await cursor.executemany(query, params_list)
-            await self.pool.commit()
+        async with self._autocommit():
+            async with self.writer.cursor() as cursor:
+                await cursor.executemany(query, params_list)
+
+    async def execute_batches(self, batches):
+        """여러 (쿼리, 파라미터 목록) 묶음을 executemany로 실행하고 한 번만 커밋"""
+        async with self.transaction():
+            for query, params_list in batches:
+                await self.executemany(query, params_list)
+
+    async def execute_returning(self, query, params=()):
+        """RETURNING 절이 있는 쓰기 실행 후 반환 행 목록 (그룹 커밋 큐를 거치지 않음)"""
+        if not self.writer:
+            raise Exception("Database not initialized.")
+        
+        async with self._autocommit():
+            async with self.writer.execute(query, params) as cursor:
+                return await cursor.fetchall()
 
     async def fetch_one(self, query, params=()):
         """비동기 단일 결과 조회"""
-        if not self.pool:
+        if not self.writer:
             raise Exception("Database not initialized.")
             
-        async with self.pool.execute(query, params) as cursor:
-            return await cursor.fetchone()
+        async with self._read() as conn:
+            async def run():
+                async with conn.execute(query, params) as cursor:
+                    return await cursor.fetchone()
+            return await self._retry_on_locked(run)
 
     async def fetch_all(self, query, params=()):
         """비동기 다중 결과 조회"""
-        if not self.pool:
+        if not self.writer:
             raise Exception("Database not initialized.")
             
-        async with self.pool.execute(query, params) as cursor:
-            return await cursor.fetchall()
+        async with self._read() as conn:
+            async def run():
+                async with conn.execute(query, params) as cursor:
+                    return await cursor.fetchall()
+            return await self._retry_on_locked(run)
+
+    async def fetch_dirty_inventory_users(self):
+        """시트에 반영되지 않은 인벤토리 변경 유저 조회 [(user_id, seq), ...]"""
+        return await self.fetch_all("SELECT user_id, seq FROM inventory_dirty")
+
+    async def clear_dirty_inventory_users(self, flushed):
+        """시트 반영이 끝난 유저의 변경 표시 해제 (조회 이후 다시 변경된 유저는 유지)"""
+        if not flushed: return
+        await self.executemany("DELETE FROM inventory_dirty WHERE user_id = ? AND seq = ?", flushed)
+
+    async def get_world_value(self, key):
+        """world_state 키-값 조회 (없으면 None)"""
+        row = await self.fetch_one("SELECT value FROM world_state WHERE key = ?", (key,))
+        return row[0] if row else None
+
+    async def set_world_value(self, key, value):
+        """world_state 키-값 기록 (upsert)"""
+        await self.execute_query(
+            "INSERT INTO world_state (key, value, updated_at) VALUES (?, ?, CURRENT_TIMESTAMP) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at",
+            (key, value)
+        )
+
+    async def replace_inventory(self, rows, content_hash=None):
+        """
+        인벤토리 전체 교체 (시트 -> DB 가져오기)
+        rows를 임시 스테이징 테이블에 executemany로 적재한 뒤, 삭제/복사까지 한 트랜잭션(커밋 1회)으로 교체합니다.
+        다른 조회는 트랜잭션이 끝난 뒤 실행되므로 비어 있는 중간 상태를 보지 않습니다.
+        content_hash를 주면 같은 트랜잭션에서 'inventory_import_hash'로 기록합니다.
+        """
+        async with self.transaction():
+            await self.execute_query(
+                "CREATE TEMP TABLE IF NOT EXISTS user_inventory_staging (user_id INTEGER, item_name TEXT, count INTEGER)"
+            )
+            await self.execute_query("DELETE FROM user_inventory_staging")
+            await self.executemany(
+                "INSERT INTO user_inventory_staging (user_id, item_name, count) VALUES (?, ?, ?)", rows
+            )
+            
+            await self.execute_query("DELETE FROM user_inventory")
+            await self.execute_query(
+                "INSERT INTO user_inventory (user_id, item_name, count) "
+                "SELECT user_id, item_name, count FROM user_inventory_staging"
+            )
+            await self.execute_query("DELETE FROM user_inventory_staging")
+            
+            if content_hash:
+                await self.execute_query(
+                    "INSERT INTO world_state (key, value, updated_at) VALUES ('inventory_import_hash', ?, CURRENT_TIMESTAMP) "
+                    "ON CONFLICT(key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at",
+                    (content_hash,)
+                )
+
+    async def replace_character_stats(self, rows):
+        """
+        Sheet A 스탯 미러 교체
+        rows: [(user_id, name, max_hp, max_sanity, perception, intelligence, willpower), ...]
+        값이 바뀐 행만 갱신하고, 시트에서 사라진 유저는 삭제합니다. (한 트랜잭션, 커밋 1회)
+        """
+        async with self.transaction():
+            await self.execute_query(
+                "CREATE TEMP TABLE IF NOT EXISTS character_stats_staging ("
+                "user_id INTEGER PRIMARY KEY, name TEXT, max_hp INTEGER, max_sanity INTEGER, "
+                "perception INTEGER, intelligence INTEGER, willpower INTEGER)"
+            )
+            await self.execute_query("DELETE FROM character_stats_staging")
+            await self.executemany(
+                "INSERT OR REPLACE INTO character_stats_staging "
+                "(user_id, name, max_hp, max_sanity, perception, intelligence, willpower) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            
+            await self.execute_query(
+                "INSERT INTO character_stats (user_id, name, max_hp, max_sanity, perception, intelligence, willpower, updated_at) "
+                "SELECT user_id, name, max_hp, max_sanity, perception, intelligence, willpower, CURRENT_TIMESTAMP "
+                "FROM character_stats_staging WHERE true "
+                "ON CONFLICT(user_id) DO UPDATE SET name = excluded.name, max_hp = excluded.max_hp, "
+                "max_sanity = excluded.max_sanity, perception = excluded.perception, "
+                "intelligence = excluded.intelligence, willpower = excluded.willpower, updated_at = excluded.updated_at "
+                "WHERE (name, max_hp, max_sanity, perception, intelligence, willpower) IS NOT "
+                "(excluded.name, excluded.max_hp, excluded.max_sanity, excluded.perception, excluded.intelligence, excluded.willpower)"
+            )
+            await self.execute_query(
+                "DELETE FROM character_stats WHERE user_id NOT IN (SELECT user_id FROM character_stats_staging)"
+            )
+            await self.execute_query("DELETE FROM character_stats_staging")
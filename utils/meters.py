@@ -0,0 +1,71 @@
+import datetime
+from utils.game_logic import GameLogic
+
+# 생존 미터(허기/정신력) 공식
+# - 허기 소모량 (하루): 10 + (페널티 적용된 의지 * 0.1)
+# - 정신력 자연 회복 (하루): 허기 >= 20 + (페널티 적용된 지성 * 0.2) 인 동안 +5 (최대 정신력까지)
+# 일일 틱(eager)과 lazy 모드가 같은 공식을 쓰도록 Python/SQL 구현을 이 모듈에 모아 둡니다.
+
+SANITY_RECOVERY_PER_DAY = 5
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S" # CURRENT_TIMESTAMP와 같은 UTC 형식
+
+def utc_now():
+    """현재 UTC 시각 (CURRENT_TIMESTAMP 형식 문자열)"""
+    return datetime.datetime.now(datetime.timezone.utc).strftime(TIMESTAMP_FORMAT)
+
+def hunger_decay_per_day(willpower, zero_days):
+    return 10 + GameLogic.calculate_hunger_penalty(willpower, zero_days or 0) * 0.1
+
+def sanity_recovery_threshold(intelligence, zero_days):
+    return 20 + GameLogic.calculate_hunger_penalty(intelligence, zero_days or 0) * 0.2
+
+def _elapsed_days(since, now):
+    return (now - since).total_seconds() / 86400
+
+def evaluate_meters(hunger, sanity, hunger_since, sanity_since, zero_days, stats, now=None):
+    """
+    기준값(마지막 기록 값/시각)과 경과 시간으로 현재 허기/정신력 계산
+    stats: Sheet A 스탯 (willpower, intelligence, sanity=최대 정신력). 없으면 변화 없음
+    반환: (허기, 정신력)
+    """
+    if not stats: return hunger, sanity
+    now = datetime.datetime.strptime(now or utc_now(), TIMESTAMP_FORMAT)
+    hunger_since = datetime.datetime.strptime(hunger_since, TIMESTAMP_FORMAT) if hunger_since else now
+    sanity_since = datetime.datetime.strptime(sanity_since, TIMESTAMP_FORMAT) if sanity_since else now
+    hunger = hunger or 0
+    sanity = sanity or 0
+
+    rate = hunger_decay_per_day(stats.get('willpower', 0), zero_days)
+    threshold = sanity_recovery_threshold(stats.get('intelligence', 0), zero_days)
+    live_hunger = max(0, hunger - rate * max(0, _elapsed_days(hunger_since, now)))
+
+    # 허기가 임계치 아래로 내려가는 시각까지만 정신력 회복
+    crossing = hunger_since + datetime.timedelta(days=(hunger - threshold) / rate)
+    recovery_days = max(0, _elapsed_days(sanity_since, min(now, crossing)))
+    max_sanity = stats.get('sanity', 80)
+    live_sanity = sanity if sanity >= max_sanity else min(max_sanity, sanity + SANITY_RECOVERY_PER_DAY * recovery_days)
+    return live_hunger, live_sanity
+
+# --- SQL (user_state 컬럼 + character_stats 별칭 c, 기준 시각 파라미터 :now) ---
+
+def effective_stat_sql(stat, zero_days="hunger_zero_days"):
+    """GameLogic.calculate_hunger_penalty와 같은 계산 (허기 0 지속 3일 이상 -10%, 그 외 -5%)"""
+    return (
+        f"MAX(0, {stat} - ({stat} * CASE WHEN COALESCE({zero_days}, 0) >= 3 THEN 10 ELSE 5 END) / 100)"
+    )
+
+HUNGER_DECAY_SQL = f"(10 + {effective_stat_sql('c.willpower')} * 0.1)"
+SANITY_THRESHOLD_SQL = f"(20 + {effective_stat_sql('c.intelligence')} * 0.2)"
+
+_NOW = "julianday(:now)"
+_HUNGER_SINCE = "julianday(COALESCE(last_hunger_update, :now))"
+_SANITY_SINCE = "julianday(COALESCE(last_sanity_update, :now))"
+
+LIVE_HUNGER_SQL = (
+    f"MAX(0, COALESCE(current_hunger, 0) - {HUNGER_DECAY_SQL} * MAX(0, {_NOW} - {_HUNGER_SINCE}))"
+)
+LIVE_SANITY_SQL = (
+    f"CASE WHEN COALESCE(current_sanity, 0) >= c.max_sanity THEN current_sanity "
+    f"ELSE MIN(c.max_sanity, COALESCE(current_sanity, 0) + {SANITY_RECOVERY_PER_DAY} * MAX(0, "
+    f"MIN({_NOW}, {_HUNGER_SINCE} + (COALESCE(current_hunger, 0) - {SANITY_THRESHOLD_SQL}) / {HUNGER_DECAY_SQL}) - {_SANITY_SINCE})) END"
+)
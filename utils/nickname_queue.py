@@ -0,0 +1,93 @@
+import asyncio
+import logging
+
+logger = logging.getLogger('utils.nickname_queue')
+
+# 닉네임 변경 요청 사이 최소 간격 (초) - Discord 길드별 멤버 수정 rate limit 대비
+NICKNAME_UPDATE_INTERVAL = 1.0
+# 변경 실패 시 같은 값을 다시 시도하는 횟수
+NICKNAME_MAX_ATTEMPTS = 3
+
+class NicknameUpdater:
+    """
+    닉네임 변경을 백그라운드에서 일정 간격으로 전송하는 큐입니다.
+    - 멤버별 우편함은 마지막 값만 보관(last-write-wins)하므로, 전송 전에 여러 번 바뀌어도 최종 값만 1회 전송합니다.
+    - 마지막으로 설정한 닉네임을 기억해 두고 같은 값은 큐에 넣지 않습니다.
+    - 실제 변경은 editor(user_id, nick) 코루틴이 담당합니다. (성공 시 True)
+    - 변경에 실패하면 큐 뒤로 다시 넣어 최대 max_attempts번까지 재시도합니다.
+    """
+
+    def __init__(self, editor, interval=NICKNAME_UPDATE_INTERVAL, max_attempts=NICKNAME_MAX_ATTEMPTS):
+        self.editor = editor
+        self.interval = interval
+        self.max_attempts = max_attempts
+        self._pending = {} # user_id -> 보낼 닉네임 (삽입 순서 = 전송 순서)
+        self._last_set = {} # user_id -> 마지막으로 설정한 닉네임
+        self._attempts = {} # user_id -> 대기 중인 값의 실패 횟수
+        self._wakeup = asyncio.Event()
+        self._task = None
+        self.sent_count = 0
+        self.coalesced_count = 0
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    def submit(self, user_id, nick):
+        """닉네임 변경 요청 (대기 중인 값이 있으면 덮어씀). 전송이 필요 없으면 False"""
+        if user_id in self._pending:
+            self.coalesced_count += 1
+        elif self._last_set.get(user_id) == nick:
+            return False
+
+        self._pending[user_id] = nick
+        self._attempts.pop(user_id, None)
+        self._wakeup.set()
+        return True
+
+    def is_pending(self, user_id):
+        return user_id in self._pending
+
+    def observe(self, user_id, nick):
+        """실제 닉네임 변경 이벤트 반영 (유저/관리자가 직접 바꾼 경우 캐시를 맞춤)"""
+        self._last_set[user_id] = nick
+
+    async def drain(self):
+        """대기 중인 변경을 모두 전송 (간격 유지)"""
+        while self._pending:
+            user_id = next(iter(self._pending))
+            nick = self._pending.pop(user_id)
+            if self._last_set.get(user_id) == nick: continue
+
+            try:
+                if await self.editor(user_id, nick):
+                    self.sent_count += 1
+                # 성공한 경우에만 적용된 값으로 기록
+                self._last_set[user_id] = nick
+                self._attempts.pop(user_id, None)
+            except Exception as e:
+                attempts = self._attempts.get(user_id, 0) + 1
+                if attempts < self.max_attempts and user_id not in self._pending:
+                    # 큐 뒤로 다시 넣어 간격을 두고 재시도 (그 사이 새 값이 들어왔으면 새 값 우선)
+                    self._pending[user_id] = nick
+                    self._attempts[user_id] = attempts
+                    logger.warning(f"Failed to update nickname for {user_id} (attempt {attempts}/{self.max_attempts}): {e}")
+                else:
+                    # 포기해도 적용된 값으로 기록하지 않으므로 다음 요청 때 다시 시도
+                    self._attempts.pop(user_id, None)
+                    logger.error(f"Failed to update nickname for {user_id}: {e}")
+
+            if self._pending:
+                await asyncio.sleep(self.interval)
+
+    async def _run(self):
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            await self.drain()
+            await asyncio.sleep(self.interval)
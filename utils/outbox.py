@@ -0,0 +1,172 @@
+import asyncio
+import json
+import logging
+
+logger = logging.getLogger('utils.outbox')
+
+# 동시에 보낼 DM 수 (Discord 전역 rate limit 대비)
+DM_CONCURRENCY = 5
+# 재시도 횟수 / 대기 (초, 시도마다 2배)
+DM_MAX_ATTEMPTS = 5
+DM_RETRY_BASE_SECONDS = 30
+# DM 1건 전송 제한 시간 (초) - 초과하면 일시적 실패로 재시도
+DM_SEND_TIMEOUT = 30
+# 대기 중인 DM이 없을 때 다시 확인하는 주기 (초)
+DM_POLL_INTERVAL = 60
+# Discord 메시지 한도
+MAX_CONTENT_LENGTH = 2000
+MAX_EMBEDS = 10
+
+class PermanentDeliveryError(Exception):
+    """재시도해도 보낼 수 없는 DM (DM 차단, 존재하지 않는 유저 등)"""
+
+class DMOutbox:
+    """
+    DM 알림을 dm_outbox 테이블에 기록한 뒤 백그라운드에서 보내는 전송함입니다.
+    - enqueue는 INSERT 1회이므로 트랜잭션 안에서 호출하면 상태 변경과 함께 커밋되고, 재시작해도 유실되지 않습니다.
+    - 전송 시 같은 유저의 대기 메시지를 하나로 합치고, 유저별 전송은 동시에(최대 concurrency개) 진행합니다.
+    - 일시적인 실패는 지수 백오프로 재시도하고, PermanentDeliveryError나 최대 시도 초과 시 폐기합니다.
+    - 실제 전송은 sender(user_id, content, embeds) 코루틴이 담당합니다. (embeds: dict 목록)
+    """
+
+    def __init__(self, db, sender, concurrency=DM_CONCURRENCY, max_attempts=DM_MAX_ATTEMPTS,
+                 retry_base=DM_RETRY_BASE_SECONDS, poll_interval=DM_POLL_INTERVAL, send_timeout=DM_SEND_TIMEOUT):
+        self.db = db
+        self.sender = sender
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.poll_interval = poll_interval
+        self.send_timeout = send_timeout
+        self._wakeup = asyncio.Event()
+        self._task = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    def notify(self):
+        """새 DM이 커밋되었음을 전송 루프에 알림"""
+        self._wakeup.set()
+
+    async def enqueue(self, user_id, content=None, embed=None):
+        """DM 1건 예약 (embed는 discord.Embed.to_dict() 결과)"""
+        await self.enqueue_many([(user_id, content, embed)])
+
+    async def enqueue_many(self, messages):
+        """DM 여러 건 예약 - [(user_id, content), ...] 또는 [(user_id, content, embed), ...]"""
+        rows = []
+        for message in messages:
+            user_id, content, embed = (tuple(message) + (None,))[:3]
+            rows.append((user_id, content, json.dumps(embed, ensure_ascii=False) if embed else None))
+        if not rows: return
+
+        await self.db.executemany("INSERT INTO dm_outbox (user_id, content, embed) VALUES (?, ?, ?)", rows)
+        # 트랜잭션 안이면 커밋 이후 루프가 다음 확인 때 전송
+        if not self.db.in_transaction():
+            self.notify()
+
+    @staticmethod
+    def merge(entries):
+        """
+        같은 유저의 대기 메시지를 Discord 한도 안에서 최소 개수의 메시지로 합침
+        entries: [(id, content, embed_json), ...] -> [([id, ...], content, [embed, ...]), ...]
+        """
+        messages = []
+        ids, content, embeds = [], "", []
+        for entry_id, text, embed in entries:
+            text = text or ""
+            overflow = content and len(content) + 2 + len(text) > MAX_CONTENT_LENGTH
+            if overflow or (embed and len(embeds) >= MAX_EMBEDS):
+                messages.append((ids, content or None, embeds))
+                ids, content, embeds = [], "", []
+            ids.append(entry_id)
+            if text:
+                content = f"{content}\n\n{text}" if content else text
+            if embed:
+                embeds.append(json.loads(embed))
+        if ids:
+            messages.append((ids, content or None, embeds))
+        return messages
+
+    async def dispatch_once(self):
+        """보낼 시각이 된 DM 전송 (유저별로 합쳐 동시에). 반환: 전송 완료된 유저 수"""
+        rows = await self.db.fetch_all(
+            "SELECT id, user_id, content, embed, attempts FROM dm_outbox "
+            "WHERE next_attempt_at <= CURRENT_TIMESTAMP ORDER BY id"
+        )
+        if not rows: return 0
+
+        by_user = {}
+        for entry_id, user_id, content, embed, attempts in rows:
+            by_user.setdefault(user_id, []).append((entry_id, content, embed, attempts))
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        async def deliver(user_id, entries):
+            """반환: (전송된 id 목록, 오류)"""
+            sent = []
+            async with semaphore:
+                try:
+                    for ids, content, embeds in self.merge([entry[:3] for entry in entries]):
+                        # 응답 없는 전송이 동시 전송 슬롯을 계속 잡고 있지 않도록 제한 시간 적용
+                        await asyncio.wait_for(self.sender(user_id, content, embeds), timeout=self.send_timeout)
+                        sent.extend(ids)
+                    return sent, None
+                except asyncio.TimeoutError:
+                    return sent, TimeoutError(f"send timed out after {self.send_timeout}s")
+                except Exception as e:
+                    return sent, e
+
+        user_ids = list(by_user)
+        outcomes = await asyncio.gather(*(deliver(user_id, by_user[user_id]) for user_id in user_ids))
+
+        delivered, dropped, retry = [], [], []
+        failed_users = 0
+        for user_id, (sent, error) in zip(user_ids, outcomes):
+            delivered.extend((entry_id,) for entry_id in sent)
+            if error is None: continue
+
+            failed_users += 1
+            # 이미 전송된 메시지는 다시 보내지 않음
+            entries = [entry for entry in by_user[user_id] if entry[0] not in sent]
+            ids = [(entry[0],) for entry in entries]
+            attempts = max(entry[3] for entry in entries) + 1
+            if isinstance(error, PermanentDeliveryError) or attempts >= self.max_attempts:
+                logger.warning(f"Dropping {len(ids)} DM(s) to user {user_id} after {attempts} attempt(s): {error}")
+                dropped.extend(ids)
+            else:
+                delay = self.retry_base * (2 ** (attempts - 1))
+                logger.info(f"DM to user {user_id} failed ({error}); retrying in {delay}s")
+                retry.extend((attempts, f"+{delay} seconds", str(error), entry_id) for (entry_id,) in ids)
+
+        # 결과 반영은 커밋 1회
+        batches = []
+        if delivered or dropped:
+            batches.append(("DELETE FROM dm_outbox WHERE id = ?", delivered + dropped))
+        if retry:
+            batches.append((
+                "UPDATE dm_outbox SET attempts = ?, next_attempt_at = datetime('now', ?), last_error = ? WHERE id = ?",
+                retry
+            ))
+        await self.db.execute_batches(batches)
+
+        sent_users = len(user_ids) - failed_users
+        logger.info(f"Dispatched DMs to {sent_users}/{len(user_ids)} users ({len(rows)} queued messages)")
+        return sent_users
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.dispatch_once()
+            except Exception as e:
+                logger.error(f"Error dispatching DM outbox: {e}", exc_info=True)
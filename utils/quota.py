@@ -0,0 +1,173 @@
+import asyncio
+import contextlib
+import contextvars
+import logging
+import threading
+import time
+
+from gspread.exceptions import APIError
+from gspread.http_client import HTTPClient
+
+logger = logging.getLogger('utils.quota')
+
+# 요청 우선순위 (낮을수록 먼저 처리)
+PRIORITY_INTERACTIVE = 0 # 플레이어 명령어/버튼
+PRIORITY_BACKGROUND = 1  # 주기적 동기화 작업
+
+# Google Sheets API 분당 할당량 (사용자당 기본값 기준)
+READ_QUOTA_PER_MINUTE = 60
+WRITE_QUOTA_PER_MINUTE = 60
+# 버킷 중 인터랙티브 요청 전용으로 남겨둘 비율 (백그라운드는 이 아래로 소비 불가)
+BACKGROUND_RESERVE_RATIO = 0.3
+
+_current_priority = contextvars.ContextVar('sheets_request_priority', default=PRIORITY_INTERACTIVE)
+
+@contextlib.contextmanager
+def background_priority():
+    """
+    이 블록 안에서 발생하는 시트 호출을 백그라운드 우선순위로 처리합니다.
+    asyncio.to_thread는 컨텍스트를 복사하므로 스레드 안의 호출에도 적용됩니다.
+    """
+    token = _current_priority.set(PRIORITY_BACKGROUND)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+class TokenBucket:
+    """분당 capacity개의 토큰이 연속적으로 채워지는 버킷"""
+
+    def __init__(self, capacity, period=60.0, clock=time.monotonic):
+        self.capacity = capacity
+        self.rate = capacity / period # 초당 충전량
+        self.tokens = float(capacity)
+        self.clock = clock
+        self.updated_at = clock()
+
+    def refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def seconds_until(self, amount):
+        """토큰이 amount개가 될 때까지 남은 시간 (초)"""
+        if self.tokens >= amount: return 0.0
+        return (amount - self.tokens) / self.rate
+
+class SheetsQuotaGovernor:
+    """
+    Google Sheets 읽기/쓰기 할당량을 토큰 버킷으로 관리합니다.
+    - 인터랙티브 요청은 버킷 전체를 사용할 수 있습니다.
+    - 백그라운드 요청은 예약분(reserve) 위의 토큰만 사용하며, 인터랙티브 대기자가 있으면 양보합니다.
+    - 시트 호출은 스레드에서 실행되므로 threading.Condition으로 동기화합니다.
+    """
+
+    def __init__(self, read_per_minute=READ_QUOTA_PER_MINUTE, write_per_minute=WRITE_QUOTA_PER_MINUTE,
+                 reserve_ratio=BACKGROUND_RESERVE_RATIO, clock=time.monotonic):
+        self._cond = threading.Condition()
+        self.clock = clock
+        self.reserve_ratio = reserve_ratio
+        self.buckets = {
+            'read': TokenBucket(read_per_minute, clock=clock),
+            'write': TokenBucket(write_per_minute, clock=clock)
+        }
+        self._waiting = {kind: {PRIORITY_INTERACTIVE: 0, PRIORITY_BACKGROUND: 0} for kind in self.buckets}
+        self.throttled_count = 0
+
+    def _floor(self, kind, priority):
+        if priority == PRIORITY_INTERACTIVE: return 0
+        return self.buckets[kind].capacity * self.reserve_ratio
+
+    def acquire(self, kind, priority=None, timeout=None):
+        """
+        토큰 1개를 확보할 때까지 대기합니다.
+        timeout(초) 안에 확보하지 못하면 False를 반환합니다.
+        """
+        if priority is None:
+            priority = _current_priority.get()
+        bucket = self.buckets[kind]
+        deadline = None if timeout is None else self.clock() + timeout
+        
+        with self._cond:
+            self._waiting[kind][priority] += 1
+            try:
+                while True:
+                    bucket.refill()
+                    floor = self._floor(kind, priority)
+                    blocked_by_interactive = priority == PRIORITY_BACKGROUND and self._waiting[kind][PRIORITY_INTERACTIVE] > 0
+                    
+                    if not blocked_by_interactive and bucket.tokens - 1 >= floor:
+                        bucket.tokens -= 1
+                        return True
+                    
+                    wait = bucket.seconds_until(floor + 1) or 0.05
+                    if deadline is not None:
+                        remaining = deadline - self.clock()
+                        if remaining <= 0:
+                            return False
+                        wait = min(wait, remaining)
+                    self._cond.wait(wait)
+            finally:
+                self._waiting[kind][priority] -= 1
+                self._cond.notify_all()
+
+    async def wait_async(self, kind, priority=None):
+        """
+        토큰을 쓸 수 있을 때까지 이벤트 루프에서 대기합니다. (토큰은 소비하지 않음)
+        429로 버킷이 비워진 동안 워커 스레드를 잡아두지 않도록 to_thread 전에 호출합니다.
+        """
+        if priority is None:
+            priority = _current_priority.get()
+        while True:
+            with self._cond:
+                bucket = self.buckets[kind]
+                bucket.refill()
+                wait = bucket.seconds_until(self._floor(kind, priority) + 1)
+            if wait <= 0: return
+            await asyncio.sleep(wait)
+
+    def penalize(self, kind):
+        """429 응답을 받은 경우: 버킷을 비워 모든 요청이 충전될 때까지 물러나게 합니다."""
+        with self._cond:
+            self.buckets[kind].refill()
+            self.buckets[kind].tokens = 0.0
+            self.throttled_count += 1
+        logger.warning(f"Sheets API quota exceeded ({kind}). Backing off until the bucket refills.")
+
+    def should_yield(self, kind='read'):
+        """백그라운드 작업이 이번 주기를 건너뛰어야 하는지 (예약분 이하로 떨어졌거나 대기자가 있음)"""
+        with self._cond:
+            bucket = self.buckets[kind]
+            bucket.refill()
+            return self._waiting[kind][PRIORITY_INTERACTIVE] > 0 or bucket.tokens - 1 < self._floor(kind, PRIORITY_BACKGROUND)
+
+    def snapshot(self):
+        """현재 예산 상태 (진단용)"""
+        with self._cond:
+            result = {}
+            for kind, bucket in self.buckets.items():
+                bucket.refill()
+                result[kind] = {
+                    "available": int(bucket.tokens),
+                    "capacity": bucket.capacity,
+                    "waiting_interactive": self._waiting[kind][PRIORITY_INTERACTIVE],
+                    "waiting_background": self._waiting[kind][PRIORITY_BACKGROUND]
+                }
+            result["throttled"] = self.throttled_count
+            return result
+
+# 프로세스 전역 거버너 (모든 gspread 요청이 공유)
+quota_governor = SheetsQuotaGovernor()
+
+class GovernedHTTPClient(HTTPClient):
+    """모든 Sheets API 요청을 quota_governor를 거쳐 보내는 gspread HTTP 클라이언트"""
+
+    def request(self, method, endpoint, *args, **kwargs):
+        kind = 'read' if method.upper() == 'GET' else 'write'
+        quota_governor.acquire(kind)
+        try:
+            return super().request(method, endpoint, *args, **kwargs)
+        except APIError as e:
+            if e.code == 429:
+                quota_governor.penalize(kind)
+            raise
@@ -0,0 +1,69 @@
+import asyncio
+import datetime
+import heapq
+import itertools
+import logging
+
+logger = logging.getLogger('utils.scheduler')
+
+class TimerScheduler:
+    """
+    min-heap 기반 단일 타이머 스케줄러입니다.
+    예약이 몇 개든 타이머 태스크는 1개이며, 가장 이른 예약 시각까지만 잠듭니다.
+    더 이른 예약이 추가되면 즉시 깨어나 대기 시간을 다시 계산합니다.
+    만기된 예약은 handler(key, kind)를 별도 태스크로 실행하므로 처리 시간이 타이머를 막지 않습니다.
+    """
+
+    def __init__(self, handler, clock=datetime.datetime.now):
+        self.handler = handler
+        self.clock = clock
+        self._heap = [] # (due, seq, key, kind)
+        self._seq = itertools.count()
+        self._changed = asyncio.Event()
+        self._task = None
+        self._running = set() # 실행 중인 handler 태스크 (GC 방지)
+
+    def __len__(self):
+        return len(self._heap)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    def schedule(self, due, key, kind):
+        """due(datetime)에 handler(key, kind) 실행 예약"""
+        entry = (due, next(self._seq), key, kind)
+        heapq.heappush(self._heap, entry)
+        if self._heap[0] is entry:
+            self._changed.set()
+
+    async def _run(self):
+        while True:
+            self._changed.clear()
+            if not self._heap:
+                await self._changed.wait()
+                continue
+
+            delay = (self._heap[0][0] - self.clock()).total_seconds()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._changed.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            _, _, key, kind = heapq.heappop(self._heap)
+            task = asyncio.create_task(self._fire(key, kind))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _fire(self, key, kind):
+        try:
+            await self.handler(key, kind)
+        except Exception as e:
+            logger.error(f"Error handling scheduled event {kind} for {key}: {e}", exc_info=True)
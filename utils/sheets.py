@@ -3,14 +3,73 @@ import re
 import gspread
 from google.oauth2.service_account import Credentials
 import config
+from utils.effect_parser import EffectParser
+from utils.quota import GovernedHTTPClient, quota_governor
+from utils.world_graph import WorldGraph
 import logging
 import json
 import os
 import datetime
+import time
+import hashlib
+import threading
+import functools
 
 logger = logging.getLogger('sheets_manager')
 
 CACHE_FILE = 'sheets_cache.json'
+STATS_MISS_TTL = 300 # 스탯 조회 실패(미등록 유저) 결과 캐시 유지 시간 (초)
+# 1회의 batchGet으로 함께 읽는 Spreadsheet B 탭
+MASTER_DATA_SHEETS = ("메타데이터시트", "아이템데이터", "관리자권한", "광기데이터", "단서조합")
+MASTER_DATA_REFRESH_MINUTES = 10 # 아이템 카탈로그/관리자 권한 주기적 갱신 간격 (분)
+INVENTORY_SHEET = "인벤토리"
+USER_STATE_SHEET = "유저_상태"
+USER_STATE_HEADER = ["Discord ID", "캐릭터명", "현재 체력", "현재 정신력", "현재 허기", "감염도", "마지막 허기 업데이트", "마지막 정신력 회복"]
+
+class _InFlightCall:
+    """진행 중인 시트 조회 1건 (결과를 대기자들과 공유)"""
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+def single_flight(key):
+    """
+    같은 key의 조회가 이미 진행 중이면 새로 API를 호출하지 않고
+    진행 중인 조회가 끝날 때까지 기다렸다가 그 결과를 함께 반환합니다.
+    (시트 조회는 asyncio.to_thread 스레드에서 실행되므로 스레드 기준으로 동작)
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            with self._inflight_lock:
+                call = self._inflight.get(key)
+                is_leader = call is None
+                if is_leader:
+                    call = _InFlightCall()
+                    self._inflight[key] = call
+                else:
+                    self.coalesced_count += 1
+            
+            if not is_leader:
+                logger.debug(f"[single_flight] '{key}' 조회 진행 중 - 결과 공유 대기")
+                call.event.wait()
+                if call.error:
+                    raise call.error
+                return call.result
+            
+            try:
+                call.result = func(self, *args, **kwargs)
+                return call.result
+            except Exception as e:
+                call.error = e
+                raise
+            finally:
+                with self._inflight_lock:
+                    self._inflight.pop(key, None)
+                call.event.set()
+        return wrapper
+    return decorator
 
 class SheetsManager:
     def __init__(self):
@@ -19,6 +78,34 @@ class SheetsManager:
             'https://www.googleapis.com/auth/drive'
         ]
         self.cached_data = {}
+        # 모든 API 요청은 공용 할당량 거버너를 거침 (읽기/쓰기 분당 예산)
+        self.quota = quota_governor
+        # 단일 비행(single-flight): 데이터셋별 진행 중인 조회
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+        self.coalesced_count = 0
+        # 스탯 인덱스: Discord ID / 정규화된 이름 -> 스탯 (갱신 시 1회 재구성)
+        self._stats_by_id = {}
+        self._stats_by_name = {}
+        self._stats_misses = {} # 정규화된 이름 -> 만료 시각 (monotonic)
+        # 아이템 카탈로그 인덱스: 정규화된 이름 / ID -> 아이템
+        self._items_by_name = {}
+        self._items_by_id = {}
+        # 스탯 갱신 시 character_stats 미러를 함께 갱신할 DB (attach_db로 연결)
+        self.db_manager = None
+        self._db_loop = None
+        self._mirror_future = None
+        # 조사 지역 그래프: 노드 ID -> 노드 / 부모 / 깊이 (지역 데이터 갱신 시 재컴파일)
+        self.investigation_graph = WorldGraph()
+        # 관리자 ID 집합 (config.ADMIN_IDS + '관리자권한' 시트)
+        self._admin_ids = {str(uid) for uid in config.ADMIN_IDS}
+        # 인벤토리 탭 행 위치 / 마지막으로 쓴 셀 값 (DB -> 시트 델타 동기화용)
+        self._inventory_rows = None
+        self._inventory_shadow = {}
+        # 유저_상태 탭 Discord ID -> 행 번호 / 마지막으로 쓴 셀 값 (Sheet D 증분 기록용)
+        self._state_rows = None
+        self._state_shadow = {}
+        self._state_next_row = 2
         self.load_cache()
         
         try:
@@ -26,7 +113,7 @@ class SheetsManager:
                 config.GOOGLE_SERVICE_ACCOUNT_FILE, 
                 scopes=self.scopes
             )
-            self.client = gspread.authorize(self.credentials)
+            self.client = gspread.authorize(self.credentials, http_client=GovernedHTTPClient)
             logger.info("Connected to Google Sheets API")
         except Exception as e:
             logger.error(f"Failed to connect to Google Sheets: {e}")
@@ -38,6 +125,10 @@ class SheetsManager:
             try:
                 with open(CACHE_FILE, 'r', encoding='utf-8') as f:
                     self.cached_data = json.load(f)
+                self.rebuild_stats_index()
+                self.rebuild_item_index()
+                self.rebuild_admin_ids()
+                self.rebuild_investigation_graph()
                 logger.info(f"Loaded data from cache: {CACHE_FILE}")
             except Exception as e:
                 logger.error(f"Failed to load cache: {e}")
@@ -82,6 +173,79 @@ class SheetsManager:
         if not item_name: return ""
         return item_name.replace(" ", "")
 
+    def normalize_character_name(self, name):
+        """캐릭터 이름 정규화 (앞뒤/내부 공백 제거)"""
+        if not name: return ""
+        return "".join(name.split())
+
+    def rebuild_stats_index(self):
+        """
+        캐시된 스탯과 메타데이터로 조회 인덱스를 재구성합니다.
+        스탯/메타데이터 갱신 시 1회 호출되며, 이후 조회는 dict 조회로 끝납니다.
+        """
+        by_name = {}
+        for stat in self.cached_data.get('stats', []):
+            key = self.normalize_character_name(stat.get('name'))
+            if key and key not in by_name:
+                by_name[key] = stat
+        
+        by_id = {}
+        for discord_id, name in self.cached_data.get('metadata', {}).items():
+            stat = by_name.get(self.normalize_character_name(name))
+            if stat:
+                by_id[str(discord_id)] = stat
+        
+        # 새 dict로 교체 (조회 스레드와의 경합 방지)
+        self._stats_by_name = by_name
+        self._stats_by_id = by_id
+        self._stats_misses = {}
+        # DB가 연결되어 있으면 character_stats 미러도 갱신 (스탯/메타데이터 갱신 모두 이 경로를 거침)
+        self.schedule_character_stats_mirror()
+        logger.debug(f"[rebuild_stats_index] 스탯 인덱스 재구성 - 이름 {len(by_name)}개, ID {len(by_id)}개")
+
+    def quote_sheet_title(self, title):
+        """A1 표기법용 탭 이름 인용 ('는 ''로 이스케이프)"""
+        return "'" + title.replace("'", "''") + "'"
+
+    def list_worksheet_titles(self, spreadsheet_id):
+        """스프레드시트의 탭 이름 목록 (메타데이터 1회 조회)"""
+        meta = self.client.http_client.fetch_sheet_metadata(spreadsheet_id, params={"fields": "sheets.properties.title"})
+        return [sheet['properties']['title'] for sheet in meta.get('sheets', [])]
+
+    def read_spreadsheet_snapshot(self, spreadsheet_id, titles=None, title_filter=None):
+        """
+        여러 탭의 전체 값을 values:batchGet 1회로 읽어 {탭 이름: 행 목록} 스냅샷을 반환합니다.
+        titles를 주지 않으면 탭 목록을 먼저 조회합니다.
+        각 탭의 행은 get_all_values()와 같이 가장 긴 행 길이에 맞춰 빈 문자열로 채웁니다.
+        """
+        http = self.client.http_client
+        if titles is None:
+            titles = self.list_worksheet_titles(spreadsheet_id)
+        if title_filter:
+            titles = [t for t in titles if title_filter(t)]
+        if not titles: return {}
+        
+        try:
+            response = http.values_batch_get(spreadsheet_id, [self.quote_sheet_title(t) for t in titles])
+        except gspread.exceptions.APIError as e:
+            if e.code != 400: raise
+            # 존재하지 않는 탭이 포함된 경우: 실제 탭 목록으로 좁혀 재시도
+            existing = set(self.list_worksheet_titles(spreadsheet_id))
+            missing = [t for t in titles if t not in existing]
+            logger.warning(f"[read_spreadsheet_snapshot] 없는 탭 제외 후 재시도 - {missing}")
+            titles = [t for t in titles if t in existing]
+            if not titles: return {}
+            response = http.values_batch_get(spreadsheet_id, [self.quote_sheet_title(t) for t in titles])
+        
+        snapshot = {}
+        for title, value_range in zip(titles, response.get('valueRanges', [])):
+            rows = value_range.get('values', [])
+            width = max((len(r) for r in rows), default=0)
+            snapshot[title] = [r + [""] * (width - len(r)) for r in rows]
+        
+        logger.info(f"[read_spreadsheet_snapshot] {len(snapshot)}개 탭 일괄 조회 완료")
+        return snapshot
+
     async def get_user_stats_async(self, discord_id, nickname=None):
         """[Async] 유저 스탯 조회"""
         return await asyncio.to_thread(self.get_user_stats, discord_id=str(discord_id), nickname=nickname)
@@ -96,6 +260,10 @@ class SheetsManager:
         """
         logger.debug(f"[get_user_stats] 스탯 조회 시작 - nickname: {nickname}, discord_id: {discord_id}")
         
+        # 0. Discord ID 인덱스 확인 (O(1))
+        if discord_id and str(discord_id) in self._stats_by_id:
+            return self._stats_by_id[str(discord_id)]
+        
         # 1. 이름 찾기
         pure_name = None
         metadata = self.get_metadata_map()
@@ -112,29 +280,32 @@ class SheetsManager:
             logger.warning(f"[get_user_stats] 이름을 찾을 수 없음 - nickname: {nickname}, discord_id: {discord_id}")
             return None
         
-        # 2. 캐시 확인
-        if 'stats' in self.cached_data:
-            logger.debug(f"[get_user_stats] 캐시에서 검색 시작 - 찾는 이름: {pure_name}")
-            for stat in self.cached_data['stats']:
-                if stat['name'] == pure_name:
-                    logger.info(f"[get_user_stats] 캐시 히트 - {pure_name}: HP={stat['hp']}, Sanity={stat['sanity']}")
-                    return stat
-            logger.debug(f"[get_user_stats] 캐시 미스 - {pure_name} 캐시에 없음")
-        else:
-            logger.debug(f"[get_user_stats] 스탯 캐시 없음")
+        # 2. 이름 인덱스 확인
+        key = self.normalize_character_name(pure_name)
+        stat = self._stats_by_name.get(key)
+        if stat:
+            logger.debug(f"[get_user_stats] 캐시 히트 - {pure_name}")
+            return stat
+        
+        # 3. 최근에 실패한 이름이면 재조회하지 않음 (Negative Cache)
+        expires_at = self._stats_misses.get(key)
+        if expires_at and expires_at > time.monotonic():
+            logger.debug(f"[get_user_stats] 캐시 미스 (Negative Cache) - {pure_name}")
+            return None
         
-        # 3. 캐시에 없으면 직접 조회 (Fallback)
+        # 4. 캐시에 없으면 직접 조회 (Fallback)
         logger.info(f"[get_user_stats] 캐시 갱신 시작 - fetch_all_stats 호출")
-        all_stats = self.fetch_all_stats()
-        logger.debug(f"[get_user_stats] 갱신된 스탯에서 재검색 - 총 {len(all_stats)}명")
-        for stat in all_stats:
-            if stat['name'] == pure_name:
-                logger.info(f"[get_user_stats] 갱신 후 찾음 - {pure_name}: HP={stat['hp']}, Sanity={stat['sanity']}")
-                return stat
-        
-        logger.warning(f"[get_user_stats] 최종 실패 - {pure_name} 데이터 없음")
+        self.fetch_all_stats()
+        stat = self._stats_by_name.get(key)
+        if stat:
+            logger.info(f"[get_user_stats] 갱신 후 찾음 - {pure_name}: HP={stat['hp']}, Sanity={stat['sanity']}")
+            return stat
+        
+        self._stats_misses[key] = time.monotonic() + STATS_MISS_TTL
+        logger.warning(f"[get_user_stats] 최종 실패 - {pure_name} 데이터 없음 ({STATS_MISS_TTL}초간 재조회 생략)")
         return None
 
+    @single_flight('stats')
     def fetch_all_stats(self):
             """[Sheet A] 전체 유저 스탯 캐싱 (수정됨: B열 3행 시작, 지정된 컬럼만 파싱)"""
             if not self.client: return []
@@ -175,6 +346,7 @@ class SheetsManager:
                         continue
                 
                 self.cached_data['stats'] = stats_list
+                self.rebuild_stats_index()
                 self.save_cache()
                 logger.info(f"[fetch_all_stats] 캐시 업데이트 완료 - {len(stats_list)}명")
                 return stats_list
@@ -187,9 +359,7 @@ class SheetsManager:
         """[Sheet A] 인벤토리 시트에서 현재 상태(체력, 정신력, 허기) 읽기"""
         if not self.client: return []
         try:
-            sheet = self.client.open_by_key(config.SPREADSHEET_ID_A)
-            ws = sheet.worksheet("인벤토리")
-            rows = ws.get_all_values()
+            rows = self.load_inventory_sheet_state()
             
             metadata = self.get_metadata_map()
             name_to_id = {v: k for k, v in metadata.items()}
@@ -303,348 +473,509 @@ class SheetsManager:
                 return self.cached_data.get('metadata', {})
 
         logger.debug(f"[get_metadata_map] 메타데이터 조회 시작 (Force: {force_refresh})")
-        
+        # 캐시 적중은 잠금 없이 반환하고, 실제 조회만 단일 비행으로 합침
+        return self.refresh_metadata_map(now)
+
+    @single_flight('metadata')
+    def refresh_metadata_map(self, now=None):
+        """[Sheet B] 메타데이터시트 조회 후 캐시 갱신 (실패 시 캐시 반환)"""
+        now = now or datetime.datetime.now()
         if self.client:
             try:
-                logger.debug(f"[get_metadata_map] 스프레드시트 열기 - ID: {config.SPREADSHEET_ID_B}")
+                logger.debug(f"[refresh_metadata_map] 스프레드시트 열기 - ID: {config.SPREADSHEET_ID_B}")
                 sheet = self.client.open_by_key(config.SPREADSHEET_ID_B).worksheet("메타데이터시트")
-                logger.debug(f"[get_metadata_map] 워크시트 데이터 가져오기")
+                logger.debug(f"[refresh_metadata_map] 워크시트 데이터 가져오기")
                 rows = sheet.get_all_values()
-                logger.info(f"[get_metadata_map] 총 {len(rows)}개 행 조회 (헤더 포함)")
+                logger.info(f"[refresh_metadata_map] 총 {len(rows)}개 행 조회 (헤더 포함)")
                 
-                metadata = {}
-                for idx, row in enumerate(rows[1:], start=2):  # 헤더 제외
-                    if len(row) >= 2:
-                        name = row[0].strip()  # A열: Name
-                        discord_id = row[1].strip()  # B열: ID
-                        if name and discord_id:
-                            metadata[discord_id] = name
-                            logger.debug(f"[get_metadata_map] 행 {idx} 매핑 추가 - Discord ID: {discord_id}, Name: {name}")
-                        else:
-                            logger.debug(f"[get_metadata_map] 행 {idx} 건너뜀 - Name 또는 ID 비어있음")
-                    else:
-                        logger.debug(f"[get_metadata_map] 행 {idx} 건너뜀 - 컬럼 부족 (최소 2개 필요)")
-                
-                self.cached_data['metadata'] = metadata
-                self.cached_data['metadata_last_update'] = now.isoformat()
+                metadata = self.apply_metadata_rows(rows, now)
                 self.save_cache() # 캐시 파일 저장
-                
-                logger.info(f"[get_metadata_map] 메타데이터 캐시 업데이트 완료 - {len(metadata)}개 매핑")
                 return metadata
             except Exception as e:
-                if "429" in str(e) or "Quota exceeded" in str(e):
-                    logger.warning(f"[get_metadata_map] API 할당량 초과 (429) - 캐시된 데이터 사용 시도")
+                # 429는 GovernedHTTPClient가 거버너에 반영(penalize)하므로 여기서는 캐시로 대체만 함
+                if isinstance(e, gspread.exceptions.APIError) and e.code == 429:
+                    logger.warning(f"[refresh_metadata_map] API 할당량 초과 (429) - 캐시된 데이터 사용 시도")
                 else:
-                    logger.error(f"[get_metadata_map] 조회 실패 - 오류: {e}", exc_info=True)
+                    logger.error(f"[refresh_metadata_map] 조회 실패 - 오류: {e}", exc_info=True)
         else:
-            logger.warning(f"[get_metadata_map] Google Sheets 클라이언트 없음")
+            logger.warning(f"[refresh_metadata_map] Google Sheets 클라이언트 없음")
         
         cached_metadata = self.cached_data.get('metadata', {})
-        logger.info(f"[get_metadata_map] 캐시된 메타데이터 반환 (Fallback) - {len(cached_metadata)}개 항목")
+        logger.info(f"[refresh_metadata_map] 캐시된 메타데이터 반환 (Fallback) - {len(cached_metadata)}개 항목")
         return cached_metadata
 
-    def get_admin_permission(self, user_id):
-        """[Sheet B] 관리자 권한 확인"""
-        if not self.client: return False
+    def apply_metadata_rows(self, rows, now=None):
+        """[Sheet B] 메타데이터시트 행을 파싱하여 캐시와 스탯 인덱스에 반영합니다."""
+        now = now or datetime.datetime.now()
+        metadata = {}
+        for idx, row in enumerate(rows[1:], start=2):  # 헤더 제외
+            if len(row) >= 2:
+                name = row[0].strip()  # A열: Name
+                discord_id = row[1].strip()  # B열: ID
+                if name and discord_id:
+                    metadata[discord_id] = name
+                    logger.debug(f"[get_metadata_map] 행 {idx} 매핑 추가 - Discord ID: {discord_id}, Name: {name}")
+                else:
+                    logger.debug(f"[get_metadata_map] 행 {idx} 건너뜀 - Name 또는 ID 비어있음")
+            else:
+                logger.debug(f"[get_metadata_map] 행 {idx} 건너뜀 - 컬럼 부족 (최소 2개 필요)")
+        
+        self.cached_data['metadata'] = metadata
+        self.cached_data['metadata_last_update'] = now.isoformat()
+        self.rebuild_stats_index()
+        
+        logger.info(f"[get_metadata_map] 메타데이터 캐시 업데이트 완료 - {len(metadata)}개 매핑")
+        return metadata
+
+    def rebuild_admin_ids(self):
+        """config.ADMIN_IDS와 캐시된 시트 관리자 목록을 병합합니다."""
+        admin_ids = {str(uid) for uid in config.ADMIN_IDS}
+        admin_ids.update(self.cached_data.get('admin_ids', []))
+        self._admin_ids = admin_ids
+
+    def apply_admin_rows(self, rows):
+        """[Sheet B] 관리자권한 행을 파싱하여 관리자 ID 집합에 반영합니다."""
+        # 헤더 제외, 숫자로만 된 셀을 Discord ID로 간주
+        sheet_ids = sorted({cell.strip() for row in rows[1:] for cell in row if cell.strip().isdigit()})
+        
+        self.cached_data['admin_ids'] = sheet_ids
+        self.rebuild_admin_ids()
+        logger.info(f"[load_admin_permissions] 관리자 권한 갱신 완료 - {len(self._admin_ids)}명")
+        return self._admin_ids
+
+    @single_flight('admin_ids')
+    def load_admin_permissions(self):
+        """[Sheet B] '관리자권한' 시트를 읽어 관리자 ID 집합을 갱신합니다."""
+        if not self.client: return self._admin_ids
         try:
             sheet = self.client.open_by_key(config.SPREADSHEET_ID_B).worksheet("관리자권한")
-            rows = sheet.get_all_values()
-            for row in rows[1:]:
-                if str(user_id) in row:
-                    return True
-            return False
-        except Exception:
-            return False
+            self.apply_admin_rows(sheet.get_all_values())
+        except Exception as e:
+            logger.error(f"Error loading admin permissions: {e}")
+        return self._admin_ids
 
-    def get_item_data(self, item_name):
-        """[Sheet B] 아이템 데이터 조회"""
-        if not self.client: return None
+    def get_admin_permission(self, user_id):
+        """[Sheet B] 관리자 권한 확인 (메모리 집합 조회, 갱신은 백그라운드에서 수행)"""
+        return str(user_id) in self._admin_ids
+
+    def parse_item_row(self, row):
+        """[Sheet B] 아이템데이터 행을 카탈로그 항목으로 변환 (효과 사전 파싱)"""
+        if len(row) < 5:
+            row = row + [""] * (5 - len(row))
+        
+        effect = row[4].strip()
+        effects, _ = EffectParser.parse_effects(effect)
+        
+        # 음식 회복량: '허기+15' 형식 효과 합계, 숫자만 적힌 경우 그 값
+        hunger_recovery = sum(e['value'] for e in effects if e['type'] == 'stat_change' and e['stat'] == '허기')
+        if not effects and effect.isdigit():
+            hunger_recovery = int(effect)
+        
+        return {
+            "id": row[0].strip(),
+            "name": row[1].strip(),
+            "type": row[2].strip(),
+            "description": row[3].strip(),
+            "effect": effect,
+            "effects": effects,
+            "hunger_recovery": hunger_recovery
+        }
+
+    def rebuild_item_index(self):
+        """캐시된 아이템 목록으로 이름/ID 인덱스를 재구성합니다."""
+        by_name = {}
+        by_id = {}
+        for item in self.cached_data.get('items', []):
+            key = self.normalize_item_name(item.get('name'))
+            if key and key not in by_name:
+                by_name[key] = item
+            if item.get('id') and item['id'] not in by_id:
+                by_id[item['id']] = item
+        
+        self._items_by_name = by_name
+        self._items_by_id = by_id
+        logger.debug(f"[rebuild_item_index] 아이템 인덱스 재구성 - {len(by_name)}개")
+
+    def apply_item_rows(self, rows):
+        """[Sheet B] 아이템데이터 행을 파싱하여 카탈로그와 인덱스에 반영합니다."""
+        items = []
+        for row in rows[1:]:
+            if len(row) < 2 or not row[1].strip(): continue
+            items.append(self.parse_item_row(row))
+        
+        self.cached_data['items'] = items
+        self.cached_data['items_last_update'] = datetime.datetime.now().isoformat()
+        self.rebuild_item_index()
+        logger.info(f"[load_item_catalog] 아이템 카탈로그 갱신 완료 - {len(items)}개")
+        return items
+
+    @single_flight('items')
+    def load_item_catalog(self):
+        """[Sheet B] '아이템데이터' 전체를 1회 읽어 카탈로그(cached_data['items'])를 갱신합니다."""
+        if not self.client: return self.cached_data.get('items', [])
         try:
             sheet = self.client.open_by_key(config.SPREADSHEET_ID_B).worksheet("아이템데이터")
-            rows = sheet.get_all_values()
-            for row in rows[1:]:
-                if row[1] == item_name: # B열: 이름
-                    return {
-                        "id": row[0],
-                        "name": row[1],
-                        "type": row[2],
-                        "description": row[3],
-                        "effect": row[4] if len(row) > 4 else ""
-                    }
-            return None
+            items = self.apply_item_rows(sheet.get_all_values())
+            self.save_cache()
+            return items
         except Exception as e:
-            logger.error(f"Error fetching item data: {e}")
-            return None
+            logger.error(f"Error loading item catalog: {e}")
+            return self.cached_data.get('items', [])
+
+    def get_item_data(self, item_name):
+        """[Sheet B] 아이템 데이터 조회 (카탈로그 인덱스 사용, 최초 1회만 시트 조회)"""
+        if not self._items_by_name and 'items_last_update' not in self.cached_data:
+            self.load_item_catalog()
+        
+        item = self._items_by_name.get(self.normalize_item_name(item_name))
+        if not item and item_name:
+            item = self._items_by_id.get(item_name.strip())
+        return item
+
+    def parse_madness_rows(self, rows):
+        """[Sheet B] 광기데이터 행 파싱"""
+        madness_list = []
+        for row in rows[1:]:
+            if len(row) >= 3:
+                madness_list.append({
+                    "id": row[0],
+                    "name": row[1],
+                    "description": row[2],
+                    "effect": row[3] if len(row) > 3 else ""
+                })
+        self.cached_data['madness'] = madness_list
+        return madness_list
 
+    @single_flight('madness')
     def get_madness_data(self):
-        """[Sheet B] 광기 데이터 조회"""
+        """[Sheet B] 광기 데이터 조회 (마스터 데이터 스냅샷 캐시 사용, 비어 있을 때만 시트 조회)"""
+        if self.cached_data.get('madness'):
+            return self.cached_data['madness']
         if not self.client: return []
         try:
             sheet = self.client.open_by_key(config.SPREADSHEET_ID_B).worksheet("광기데이터")
-            rows = sheet.get_all_values()
-            madness_list = []
-            for row in rows[1:]:
-                if len(row) >= 3:
-                    madness_list.append({
-                        "id": row[0],
-                        "name": row[1],
-                        "description": row[2],
-                        "effect": row[3] if len(row) > 3 else ""
-                    })
-            return madness_list
+            return self.parse_madness_rows(sheet.get_all_values())
         except Exception as e:
             logger.error(f"Error fetching madness data: {e}")
             return []
 
+    def parse_clue_combination_rows(self, rows):
+        """[Sheet B] 단서조합 행 파싱"""
+        recipes = []
+        for row in rows[1:]:
+            if len(row) >= 5:
+                recipe_id = row[0].strip()
+                required_clues = [c.strip() for c in row[1].split(',') if c.strip()]
+                result_type = row[2].strip() # '단서' or '아이템'
+                result_id = row[3].strip()
+                message = row[4].strip()
+                
+                if recipe_id and required_clues and result_id:
+                    recipes.append({
+                        "recipe_id": recipe_id,
+                        "required_clues": required_clues,
+                        "result_type": result_type,
+                        "result_id": result_id,
+                        "message": message
+                    })
+        self.cached_data['clue_combinations'] = recipes
+        return recipes
+
+    @single_flight('clue_combinations')
     def get_clue_combinations(self):
-        """[Sheet B] 단서 조합 레시피 조회"""
-        if not self.client: return []
+        """[Sheet B] 단서 조합 레시피 조회 (실패 시 마지막으로 읽은 레시피 반환)"""
+        if not self.client: return self.cached_data.get('clue_combinations', [])
         try:
             sheet = self.client.open_by_key(config.SPREADSHEET_ID_B).worksheet("단서조합")
-            rows = sheet.get_all_values()
-            recipes = []
-            for row in rows[1:]:
-                if len(row) >= 5:
-                    recipe_id = row[0].strip()
-                    required_clues = [c.strip() for c in row[1].split(',') if c.strip()]
-                    result_type = row[2].strip() # '단서' or '아이템'
-                    result_id = row[3].strip()
-                    message = row[4].strip()
-                    
-                    if recipe_id and required_clues and result_id:
-                        recipes.append({
-                            "recipe_id": recipe_id,
-                            "required_clues": required_clues,
-                            "result_type": result_type,
-                            "result_id": result_id,
-                            "message": message
-                        })
-            return recipes
+            return self.parse_clue_combination_rows(sheet.get_all_values())
         except Exception as e:
-            # 시트가 없거나 오류 발생 시 빈 리스트 반환 (로그는 디버그 레벨로 낮춤)
+            # 시트가 없거나 오류 발생 시 캐시된 레시피 반환 (로그는 디버그 레벨로 낮춤)
             logger.debug(f"No clue combination sheet found or error: {e}")
-            return []
+            return self.cached_data.get('clue_combinations', [])
+
+    @single_flight('master_data')
+    def load_master_data_snapshot(self):
+        """
+        [Sheet B] 마스터 데이터 탭(메타데이터, 아이템, 관리자, 광기, 단서조합)을
+        values:batchGet 1회로 읽어 각 캐시에 반영합니다.
+        """
+        if not self.client: return False
+        try:
+            snapshot = self.read_spreadsheet_snapshot(config.SPREADSHEET_ID_B, titles=list(MASTER_DATA_SHEETS))
+            
+            if "메타데이터시트" in snapshot: self.apply_metadata_rows(snapshot["메타데이터시트"])
+            if "아이템데이터" in snapshot: self.apply_item_rows(snapshot["아이템데이터"])
+            if "관리자권한" in snapshot: self.apply_admin_rows(snapshot["관리자권한"])
+            if "광기데이터" in snapshot: self.parse_madness_rows(snapshot["광기데이터"])
+            if "단서조합" in snapshot: self.parse_clue_combination_rows(snapshot["단서조합"])
+            
+            self.save_cache()
+            logger.info(f"[load_master_data_snapshot] 마스터 데이터 갱신 완료 - {list(snapshot.keys())}")
+            return True
+        except Exception as e:
+            logger.error(f"Error loading master data snapshot: {e}")
+            return False
 
     # =========================================================================
     # 4. Spreadsheet C: 조사/월드맵
     # =========================================================================
 
+    def is_investigation_sheet(self, title):
+        """[Sheet C] 조사 데이터로 사용하는 탭인지 (시트 무시 규칙)"""
+        return not (title.startswith("0.") or title.startswith("예시"))
+
+    @single_flight('investigation')
     def fetch_investigation_data(self):
         """[Sheet C] 조사 데이터 파싱 (명세서 v2.0 호환)"""
         if not self.client: return {}
         try:
-            spreadsheet = self.client.open_by_key(config.SPREADSHEET_ID_C)
-            worksheets = spreadsheet.worksheets()
-            world_map = {}
+            # 지역 탭 전체를 values:batchGet 1회로 읽어온 뒤 메모리에서 파싱
+            snapshot = self.read_spreadsheet_snapshot(config.SPREADSHEET_ID_C, title_filter=self.is_investigation_sheet)
+            world_map = self.build_investigation_map(snapshot)
             
-            for sheet in worksheets:
-                category_name = sheet.title
+            self.cached_data['investigation'] = world_map
+            self.rebuild_investigation_graph()
+            return world_map
+        except Exception as e:
+            logger.error(f"Error fetching investigation data: {e}", exc_info=True)
+            return {}
+
+    def rebuild_investigation_graph(self):
+        """캐시된 지역 트리로 조사 그래프를 다시 컴파일합니다."""
+        # 새 객체로 교체 (조회 스레드와의 경합 방지)
+        self.investigation_graph = WorldGraph(self.cached_data.get('investigation', {}))
+
+    def build_investigation_map(self, snapshot):
+        """[Sheet C] {탭 이름: 행 목록} 스냅샷으로 지역 트리를 구성합니다."""
+        world_map = {}
+        
+        for category_name, rows in snapshot.items():
+            if category_name not in world_map:
+                world_map[category_name] = {
+                    "id": category_name,
+                    "name": category_name,
+                    "description": f"{category_name} 지역입니다.",
+                    "children": {},
+                    "items": [],
+                    "type": "category"
+                }
+            
+            category_root = world_map[category_name]
+            
+            # A~E 열의 이전 값을 저장하기 위한 리스트 (Fill-down 용)
+            last_path = [""] * 5 
+            
+            # 방문한 장소 키(tuple)를 저장하여, 첫 등장 시에만 장소 묘사를 가져오도록 함
+            visited_locations = set()
+
+            # 헤더 스킵 (1행)
+            for row_idx, row in enumerate(rows[1:]):
+                # 행 데이터 확보 (최소 18열 R열까지)
+                if len(row) < 18:
+                    row += [""] * (18 - len(row))
+                
+                # 1. 경로 파싱 (A~E)
+                current_path = [row[i].strip() for i in range(5)]
                 
-                # 시트 무시 규칙
-                if category_name.startswith("0.") or category_name.startswith("예시"):
+                # 빈 행(데이터 없음) 무시 체크
+                # A~E가 모두 비어있고 F(아이템)도 비어있으면 빈 행으로 간주
+                if not any(current_path) and not row[5].strip():
                     continue
 
-                if category_name not in world_map:
-                    world_map[category_name] = {
-                        "id": category_name,
-                        "name": category_name,
-                        "description": f"{category_name} 지역입니다.",
-                        "children": {},
-                        "items": [],
-                        "type": "category"
-                    }
+                # Fill-Down 로직
+                # 명세서: "장소 하나에 해당하는 행들은 연속된 구간에 몰아서 적는다"
+                # A열이 비어있으면 이전 경로를 그대로 사용한다고 가정
+                for i in range(5):
+                    if not current_path[i]:
+                        current_path[i] = last_path[i]
                 
-                category_root = world_map[category_name]
-                rows = sheet.get_all_values()
-                
-                # A~E 열의 이전 값을 저장하기 위한 리스트 (Fill-down 용)
-                last_path = [""] * 5 
+                # 갱신된 경로를 last_path로 저장
+                last_path = list(current_path)
                 
-                # 방문한 장소 키(tuple)를 저장하여, 첫 등장 시에만 장소 묘사를 가져오도록 함
-                visited_locations = set()
-
-                # 헤더 스킵 (1행)
-                for row_idx, row in enumerate(rows[1:]):
-                    # 행 데이터 확보 (최소 18열 R열까지)
-                    if len(row) < 18:
-                        row += [""] * (18 - len(row))
-                    
-                    # 1. 경로 파싱 (A~E)
-                    current_path = [row[i].strip() for i in range(5)]
-                    
-                    # 빈 행(데이터 없음) 무시 체크
-                    # A~E가 모두 비어있고 F(아이템)도 비어있으면 빈 행으로 간주
-                    if not any(current_path) and not row[5].strip():
-                        continue
+                # 유효 경로 추출 (빈 문자열 제외)
+                clean_path = [p for p in current_path if p]
+                if not clean_path: continue
 
-                    # Fill-Down 로직
-                    # 명세서: "장소 하나에 해당하는 행들은 연속된 구간에 몰아서 적는다"
-                    # A열이 비어있으면 이전 경로를 그대로 사용한다고 가정
-                    for i in range(5):
-                        if not current_path[i]:
-                            current_path[i] = last_path[i]
-                    
-                    # 갱신된 경로를 last_path로 저장
-                    last_path = list(current_path)
-                    
-                    # 유효 경로 추출 (빈 문자열 제외)
-                    clean_path = [p for p in current_path if p]
-                    if not clean_path: continue
+                # location_key: 장소를 식별하는 유니크한 키 (튜플)
+                location_key = tuple(clean_path)
 
-                    # location_key: 장소를 식별하는 유니크한 키 (튜플)
-                    location_key = tuple(clean_path)
+                # 2. 트리 구조 생성/탐색
+                current_level = category_root["children"]
+                path_id = category_name
+                target_location = None
+                
+                for depth, loc_name in enumerate(clean_path):
+                    path_id = f"{path_id}_{loc_name}"
+                    if loc_name not in current_level:
+                        is_channel = (depth == 0) # 첫 번째 깊이는 채널급
+                        current_level[loc_name] = {
+                            "id": path_id,
+                            "name": loc_name,
+                            "description": "", # Q열에서 채움
+                            "children": {},
+                            "items": [],
+                            "type": "location",
+                            "is_channel": is_channel,
+                            "description_variants": []
+                        }
+                    target_location = current_level[loc_name]
+                    current_level = current_level[loc_name]["children"]
+                
+                # 3. 데이터 파싱
+                item_name = row[5].strip()      # F: 기물 이름
+                button_text = row[6].strip()    # G: 버튼 텍스트
+                interaction_type = row[7].strip() # H: 타입
+                condition = row[8].strip()      # I: 조건
+                
+                # 결과 및 묘사
+                # M: 대성공, N: 성공, O: 실패, P: 대실패, Q: 묘사
+                variant_data = {
+                    "condition": condition,
+                    "type": interaction_type,
+                    "result_crit_success": row[12].strip(), # M
+                    "result_success": row[13].strip(),      # N
+                    "result_fail": row[14].strip(),         # O
+                    "result_crit_fail": row[15].strip(),    # P
+                    "description": row[16].strip()          # Q
+                }
 
-                    # 2. 트리 구조 생성/탐색
-                    current_level = category_root["children"]
-                    path_id = category_name
-                    target_location = None
-                    
-                    for depth, loc_name in enumerate(clean_path):
-                        path_id = f"{path_id}_{loc_name}"
-                        if loc_name not in current_level:
-                            is_channel = (depth == 0) # 첫 번째 깊이는 채널급
-                            current_level[loc_name] = {
-                                "id": path_id,
-                                "name": loc_name,
-                                "description": "", # Q열에서 채움
-                                "children": {},
-                                "items": [],
-                                "type": "location",
-                                "is_channel": is_channel,
-                                "description_variants": []
-                            }
-                        target_location = current_level[loc_name]
-                        current_level = current_level[loc_name]["children"]
+                # 4. 데이터 적용
+                
+                # 4-1. 장소 묘사 (Location Description)
+                # "각 장소의 첫 번째 행의 Q열은 그 장소 자체의 묘사"
+                if location_key not in visited_locations:
+                    target_location["description"] = variant_data["description"]
                     
-                    # 3. 데이터 파싱
-                    item_name = row[5].strip()      # F: 기물 이름
-                    button_text = row[6].strip()    # G: 버튼 텍스트
-                    interaction_type = row[7].strip() # H: 타입
-                    condition = row[8].strip()      # I: 조건
+                    # 아이템이 없는 경우, 이 행의 조건은 장소 진입 조건으로 간주
+                    if not item_name:
+                        target_location["condition"] = condition
+                        
+                    visited_locations.add(location_key)
                     
-                    # 결과 및 묘사
-                    # M: 대성공, N: 성공, O: 실패, P: 대실패, Q: 묘사
-                    variant_data = {
-                        "condition": condition,
-                        "type": interaction_type,
-                        "result_crit_success": row[12].strip(), # M
-                        "result_success": row[13].strip(),      # N
-                        "result_fail": row[14].strip(),         # O
-                        "result_crit_fail": row[15].strip(),    # P
-                        "description": row[16].strip()          # Q
-                    }
-
-                    # 4. 데이터 적용
+                    # 만약 기물 이름이 없다면 이 행은 순수하게 장소 묘사만을 위한 행임.
+                    # 기물 이름이 있다면, 장소 묘사 + 첫 번째 아이템 정의가 동시에 있는 행임.
+                
+                # 4-2. 아이템/상호작용 추가
+                if item_name:
+                    # 기존 아이템 찾기 (이름과 버튼 텍스트가 모두 같아야 같은 그룹)
+                    existing_item = None
+                    for item in target_location["items"]:
+                        if item["name"] == item_name and item["button_text"] == button_text:
+                            existing_item = item
+                            break
                     
-                    # 4-1. 장소 묘사 (Location Description)
-                    # "각 장소의 첫 번째 행의 Q열은 그 장소 자체의 묘사"
-                    if location_key not in visited_locations:
-                        target_location["description"] = variant_data["description"]
-                        
-                        # 아이템이 없는 경우, 이 행의 조건은 장소 진입 조건으로 간주
-                        if not item_name:
-                            target_location["condition"] = condition
-                            
-                        visited_locations.add(location_key)
-                        
-                        # 만약 기물 이름이 없다면 이 행은 순수하게 장소 묘사만을 위한 행임.
-                        # 기물 이름이 있다면, 장소 묘사 + 첫 번째 아이템 정의가 동시에 있는 행임.
+                    if not existing_item:
+                        existing_item = {
+                            "name": item_name,
+                            "button_text": button_text,
+                            "type": interaction_type, # 대표 타입 (첫 행 기준)
+                            "variants": []
+                        }
+                        target_location["items"].append(existing_item)
                     
-                    # 4-2. 아이템/상호작용 추가
-                    if item_name:
-                        # 기존 아이템 찾기 (이름과 버튼 텍스트가 모두 같아야 같은 그룹)
-                        existing_item = None
-                        for item in target_location["items"]:
-                            if item["name"] == item_name and item["button_text"] == button_text:
-                                existing_item = item
-                                break
-                        
-                        if not existing_item:
-                            existing_item = {
-                                "name": item_name,
-                                "button_text": button_text,
-                                "type": interaction_type, # 대표 타입 (첫 행 기준)
-                                "variants": []
-                            }
-                            target_location["items"].append(existing_item)
-                        
-                        existing_item["variants"].append(variant_data)
+                    existing_item["variants"].append(variant_data)
 
-            self.cached_data['investigation'] = world_map
-            return world_map
-        except Exception as e:
-            logger.error(f"Error fetching investigation data: {e}", exc_info=True)
-            return {}
+        return world_map
 
     # =========================================================================
     # 5. Spreadsheet D: 동적 로그
     # =========================================================================
 
+    def index_user_state_rows(self, rows):
+        """[Sheet D] 유저_상태 탭 행으로 Discord ID별 행 번호와 현재 셀 값(섀도)을 색인"""
+        self._state_rows = {}
+        self._state_shadow = {}
+        # 빈 시트이면 헤더를 써야 하므로 다음 행은 2행부터
+        self._state_next_row = len(rows) + 1 if rows else 2
+        
+        # 헤더가 있을 수 있으므로 첫 줄 확인 (없거나 다르면 전체 데이터로 간주)
+        start = 1 if rows and rows[0] == USER_STATE_HEADER else 0
+        for i, row in enumerate(rows[start:], start=start):
+            if not row: continue
+            uid = str(row[0]).strip()
+            if not uid or uid in self._state_rows: continue
+            self._state_rows[uid] = i + 1
+            self._state_shadow[uid] = [str(v) for v in row[:len(USER_STATE_HEADER)]]
+            self._state_shadow[uid] += [""] * (len(USER_STATE_HEADER) - len(self._state_shadow[uid]))
+        return rows
+
     def sync_db_to_sheets(self, user_states_data):
-        """[Sheet D] DB 데이터를 동적 로그 시트에 동기화 (03:00 AM)"""
+        """
+        [Sheet D] DB 데이터를 동적 로그 시트에 동기화 (03:00 AM)
+        시트를 지우지 않고, 값이 바뀐 셀 구간만 갱신하며 새 유저는 맨 아래에 추가합니다.
+        모든 쓰기는 values:batchUpdate 1회로 처리합니다.
+        """
         if not self.client: return
         try:
-            sheet = self.client.open_by_key(config.SPREADSHEET_ID_D)
-            
-            # 1. 유저_상태 동기화
-            ws_state = sheet.worksheet("유저_상태")
-            
-            # 기존 시트 데이터 가져오기
-            sheet_rows = ws_state.get_all_values()
-            header = ["Discord ID", "캐릭터명", "현재 체력", "현재 정신력", "현재 허기", "감염도", "마지막 허기 업데이트", "마지막 정신력 회복"]
-            
-            if not sheet_rows:
-                existing_data = []
-            else:
-                # 헤더가 있을 수 있으므로 첫 줄 확인
-                if sheet_rows[0] == header:
-                    existing_data = sheet_rows[1:]
-                else:
-                    existing_data = sheet_rows # 헤더가 없거나 다르면 전체 데이터로 간주
+            # 행 위치 색인이 없을 때만 시트를 1회 읽음
+            header_missing = False
+            if self._state_rows is None:
+                snapshot = self.read_spreadsheet_snapshot(config.SPREADSHEET_ID_D, titles=[USER_STATE_SHEET])
+                rows = self.index_user_state_rows(snapshot.get(USER_STATE_SHEET, []))
+                header_missing = not rows
 
             # user_states_data: list of tuples (user_id, hp, sanity, hunger, infection, last_hunger, last_sanity, ...)
             
             metadata = self.get_metadata_map()
+            sheet_name = self.quote_sheet_title(USER_STATE_SHEET)
+            last_col = chr(ord('A') + len(USER_STATE_HEADER) - 1)
+            
+            data = []
+            written = {}
+            new_rows = []
+            if header_missing:
+                data.append({'range': f"{sheet_name}!A1:{last_col}1", 'values': [USER_STATE_HEADER]})
             
-            # DB 데이터를 딕셔너리로 변환 (Key: Discord ID)
-            db_data_map = {}
             for state in user_states_data:
                 uid = str(state[0])
                 name = metadata.get(uid, "Unknown")
-                db_data_map[uid] = [
-                    uid, name, state[1], state[2], state[3], state[4], state[5], state[6]
-                ]
+                # None은 값 유지가 아니라 빈 셀로 기록
+                row_data = ["" if v is None else v for v in (uid, name, state[1], state[2], state[3], state[4], state[5], state[6])]
+                cells = [str(v) for v in row_data]
+                
+                row_no = self._state_rows.get(uid)
+                if row_no is None:
+                    # 시트에 없던 새로운 유저는 맨 아래에 추가
+                    new_rows.append(row_data)
+                    written[uid] = cells
+                    continue
+                
+                old = self._state_shadow.get(uid, [""] * len(cells))
+                changed = [i for i in range(len(cells)) if cells[i] != old[i]]
+                if not changed: continue
+                
+                # 바뀐 첫 셀 ~ 마지막 셀 구간만 갱신
+                first, last = changed[0], changed[-1]
+                data.append({
+                    'range': f"{sheet_name}!{chr(ord('A') + first)}{row_no}:{chr(ord('A') + last)}{row_no}",
+                    'values': [row_data[first:last + 1]]
+                })
+                written[uid] = cells
             
-            final_rows = []
-            processed_ids = set()
+            if new_rows:
+                start_row = self._state_next_row
+                end_row = start_row + len(new_rows) - 1
+                data.append({'range': f"{sheet_name}!A{start_row}:{last_col}{end_row}", 'values': new_rows})
             
-            # 1. 기존 시트 데이터 순회하며 업데이트
-            for row in existing_data:
-                if not row: continue
-                uid = str(row[0]).strip()
-                
-                if uid in db_data_map:
-                    # DB에 있는 데이터면 DB 값으로 교체 (업데이트)
-                    final_rows.append(db_data_map[uid])
-                    processed_ids.add(uid)
-                else:
-                    # DB에 없는 데이터면 기존 값 유지 (보존)
-                    final_rows.append(row)
+            if not data:
+                logger.info("Synced User State to Sheet D (no changes)")
+                return
             
-            # 2. DB에는 있지만 시트에는 없던 새로운 데이터 추가
-            for uid, row_data in db_data_map.items():
-                if uid not in processed_ids:
-                    final_rows.append(row_data)
+            self.client.http_client.values_batch_update(
+                config.SPREADSHEET_ID_D,
+                body={"valueInputOption": "RAW", "data": data}
+            )
             
-            # 시트 클리어 후 재작성
-            ws_state.clear()
-            ws_state.append_row(header)
-            if final_rows:
-                ws_state.append_rows(final_rows)
+            for offset, row_data in enumerate(new_rows):
+                self._state_rows[str(row_data[0])] = self._state_next_row + offset
+            self._state_next_row += len(new_rows)
+            self._state_shadow.update(written)
             
-            logger.info(f"Synced User State to Sheet D (Merged {len(final_rows)} rows)")
+            logger.info(f"Synced User State to Sheet D ({len(written) - len(new_rows)} updated, {len(new_rows)} appended)")
             
         except Exception as e:
+            # 행 위치가 바뀌었을 수 있으므로 다음 동기화에서 시트를 다시 읽음
+            self._state_rows = None
             logger.error(f"Error syncing DB to Sheets: {e}")
 
     # =========================================================================
@@ -671,9 +1002,8 @@ class SheetsManager:
         """[Sheet A -> DB] 시트 인벤토리를 DB로 동기화 (Startup)"""
         if not self.client: return
         try:
-            sheet = self.client.open_by_key(config.SPREADSHEET_ID_A)
-            ws = sheet.worksheet("인벤토리")
-            rows = ws.get_all_values()
+            # 읽은 내용은 DB -> 시트 동기화의 행 위치/섀도 색인으로도 사용
+            rows = self.load_inventory_sheet_state()
             
             metadata = self.get_metadata_map()
             name_to_id = {v: k for k, v in metadata.items()}
@@ -712,66 +1042,90 @@ class SheetsManager:
             logger.error(f"Error reading sheet inventory: {e}")
             return {}
 
-    def sync_db_inventory_to_sheet(self, db_manager, all_inventories):
-        """[DB -> Sheet A] DB 인벤토리를 시트로 동기화 (Periodic)"""
-        if not self.client: return
-        try:
-            sheet = self.client.open_by_key(config.SPREADSHEET_ID_A)
-            ws = sheet.worksheet("인벤토리")
-            rows = ws.get_all_values()
+    def render_inventory_cells(self, items):
+        """[Sheet A] 아이템 목록 -> 인벤토리 탭 셀 값 (기본 슬롯 F-I, 추가 슬롯 J)"""
+        basic = list(items[:4])
+        while len(basic) < 4: basic.append("")
+        
+        extra = items[4:]
+        extra_str = ",".join(extra) if extra else ""
+        return tuple(basic), extra_str
+
+    def index_inventory_rows(self, rows):
+        """[Sheet A] 인벤토리 탭 행으로 이름별 행 번호와 현재 셀 값(섀도)을 색인"""
+        self._inventory_rows = {}
+        self._inventory_shadow = {}
+        
+        for i, row in enumerate(rows):
+            if i == 0: continue
+            if len(row) < 2: continue
+            name = row[1].strip()
+            if not name: continue
             
+            self._inventory_rows[name] = i + 1
+            basic = tuple(row[k].strip() if k < len(row) else "" for k in range(5, 9))
+            extra = row[9].strip() if len(row) > 9 else ""
+            self._inventory_shadow[name] = (basic, extra)
+
+    def load_inventory_sheet_state(self):
+        """[Sheet A] 인벤토리 탭을 1회 읽어 행 위치/섀도 색인을 갱신하고 행 목록을 반환"""
+        snapshot = self.read_spreadsheet_snapshot(config.SPREADSHEET_ID_A, titles=[INVENTORY_SHEET])
+        rows = snapshot.get(INVENTORY_SHEET, [])
+        self.index_inventory_rows(rows)
+        return rows
+
+    def sync_db_inventory_to_sheet(self, user_ids, inventories):
+        """
+        [DB -> Sheet A] 변경된 유저의 인벤토리만 시트로 동기화 (Periodic)
+        마지막으로 쓴 셀 값(섀도)과 비교해 실제로 달라진 행만 batchUpdate 1회로 반영합니다.
+        반영 성공 여부를 반환합니다.
+        """
+        if not self.client: return False
+        try:
             metadata = self.get_metadata_map()
-            name_to_id = {v: k for k, v in metadata.items()}
             
-            # all_inventories: [(user_id, item_name, count), ...]
-            # 유저별 아이템 리스트로 변환
-            user_items_map = {}
-            for uid, item, count in all_inventories:
-                uid = str(uid)
-                if uid not in user_items_map:
-                    user_items_map[uid] = []
-                user_items_map[uid].extend([item] * count)
+            # inventories: [(user_id, item_name, count), ...]
+            # 유저별 아이템 리스트로 변환 (아이템이 모두 사라진 유저도 빈 목록으로 포함)
+            user_items_map = {str(uid): [] for uid in user_ids}
+            for uid, item, count in inventories:
+                user_items_map.setdefault(str(uid), []).extend([item] * count)
             
-            updates = []
+            # 행 위치를 모르는 유저가 있을 때만 시트를 다시 읽음
+            names = [metadata[uid] for uid in user_items_map if uid in metadata]
+            if self._inventory_rows is None or any(name not in self._inventory_rows for name in names):
+                self.load_inventory_sheet_state()
             
-            for i, row in enumerate(rows):
-                if i == 0: continue
-                if len(row) < 2: continue
-                name = row[1].strip()
+            data = []
+            written = {}
+            for uid, items in user_items_map.items():
+                name = metadata.get(uid)
+                row_no = self._inventory_rows.get(name) if name else None
+                if not row_no: continue
                 
-                if name in name_to_id:
-                    uid = name_to_id[name]
-                    current_items = user_items_map.get(uid, [])
-                    
-                    # 시트 데이터 포맷팅
-                    basic = current_items[:4]
-                    while len(basic) < 4: basic.append("")
-                    
-                    extra = current_items[4:]
-                    extra_str = ",".join(extra) if extra else ""
-                    
-                    # 변경 확인 (최적화)
-                    sheet_basic = [row[k].strip() if k < len(row) else "" for k in range(5, 9)]
-                    sheet_extra = row[9].strip() if len(row) > 9 else ""
-                    
-                    if basic != sheet_basic or extra_str != sheet_extra:
-                        # F-I 업데이트
-                        updates.append({
-                            'range': f"F{i+1}:I{i+1}",
-                            'values': [basic]
-                        })
-                        # J 업데이트
-                        updates.append({
-                            'range': f"J{i+1}",
-                            'values': [[extra_str]]
-                        })
+                cells = self.render_inventory_cells(items)
+                if self._inventory_shadow.get(name) == cells: continue
+                
+                basic, extra_str = cells
+                data.append({
+                    'range': f"{self.quote_sheet_title(INVENTORY_SHEET)}!F{row_no}:J{row_no}",
+                    'values': [list(basic) + [extra_str]]
+                })
+                written[name] = cells
             
-            if updates:
-                ws.batch_update(updates)
-                logger.info(f"Synced inventory to Sheet A ({len(updates)//2} users updated)")
+            if data:
+                self.client.http_client.values_batch_update(
+                    config.SPREADSHEET_ID_A,
+                    body={"valueInputOption": "RAW", "data": data}
+                )
+                self._inventory_shadow.update(written)
+                logger.info(f"Synced inventory to Sheet A ({len(data)} users updated)")
+            return True
                 
         except Exception as e:
+            # 행 위치가 바뀌었을 수 있으므로 다음 동기화에서 시트를 다시 읽음
+            self._inventory_rows = None
             logger.error(f"Error syncing inventory to sheet: {e}")
+            return False
 
     def register_item_metadata(self, name, type_, description):
         """[Sheet B] 아이템 데이터 등록"""
@@ -779,35 +1133,57 @@ class SheetsManager:
             sheet = self.client.open_by_key(config.SPREADSHEET_ID_B)
             ws = sheet.worksheet("아이템데이터")
             ws.append_row([name, name, type_, description]) # ID는 이름으로 대체하거나 자동생성 필요
+            
+            # 카탈로그에도 즉시 반영
+            self.cached_data.setdefault('items', []).append(self.parse_item_row([name, name, type_, description]))
+            self.rebuild_item_index()
         except Exception as e:
             logger.error(f"Error registering item: {e}")
     # =========================================================================
     # Async Wrappers
     # =========================================================================
 
+    async def _to_thread_governed(self, kind, func, *args, **kwargs):
+        """항상 시트 API를 호출하는 작업: 할당량 대기는 이벤트 루프에서 한 뒤 스레드로 실행"""
+        await self.quota.wait_async(kind)
+        return await asyncio.to_thread(func, *args, **kwargs)
+
     async def update_user_stats_async(self, discord_id, stats):
         """[Async] 유저 스탯 업데이트"""
-        return await asyncio.to_thread(self.update_user_stats, discord_id, stats)
+        return await self._to_thread_governed('write', self.update_user_stats, discord_id, stats)
 
     async def get_item_data_async(self, item_name):
         """[Async] 아이템 데이터 조회"""
         return await asyncio.to_thread(self.get_item_data, item_name)
 
+    async def load_master_data_snapshot_async(self):
+        """[Async] 마스터 데이터 일괄 갱신"""
+        return await self._to_thread_governed('read', self.load_master_data_snapshot)
+
+    async def load_admin_permissions_async(self):
+        """[Async] 관리자 권한 갱신"""
+        return await self._to_thread_governed('read', self.load_admin_permissions)
+
+    async def load_item_catalog_async(self):
+        """[Async] 아이템 카탈로그 갱신"""
+        return await self._to_thread_governed('read', self.load_item_catalog)
+
     async def get_madness_data_async(self):
         """[Async] 광기 데이터 조회"""
         return await asyncio.to_thread(self.get_madness_data)
         
     async def get_clue_combinations_async(self):
         """[Async] 단서 조합 레시피 조회"""
-        return await asyncio.to_thread(self.get_clue_combinations)
+        return await self._to_thread_governed('read', self.get_clue_combinations)
 
     async def fetch_investigation_data_async(self):
         """[Async] 조사 데이터 파싱"""
-        return await asyncio.to_thread(self.fetch_investigation_data)
+        return await self._to_thread_governed('read', self.fetch_investigation_data)
 
     async def sync_db_to_sheets_async(self, db_manager):
         """[Async] DB -> Sheets 동기화"""
         # 1. DB 데이터 비동기 조회
+        await db_manager.user_states.materialize_meters() # lazy 모드: 현재 값 기록 후 내보내기
         user_states = await db_manager.fetch_all("SELECT * FROM user_state")
         # 2. 시트 동기화 (스레드)
         return await asyncio.to_thread(self.sync_db_to_sheets, user_states)
@@ -817,39 +1193,104 @@ class SheetsManager:
         return await asyncio.to_thread(self.get_metadata_map)
 
     async def fetch_all_stats_async(self):
-        """[Async] 전체 스탯 조회"""
-        return await asyncio.to_thread(self.fetch_all_stats)
+        """[Async] 전체 스탯 조회 (DB가 연결되어 있으면 character_stats 미러 갱신까지 대기)"""
+        stats_list = await self._to_thread_governed('read', self.fetch_all_stats)
+        if stats_list:
+            await self.wait_character_stats_mirror()
+        return stats_list
+
+    def attach_db(self, db_manager):
+        """
+        스탯 캐시를 갱신할 때마다 character_stats 미러도 갱신하도록 DB를 연결합니다.
+        미러 쓰기는 이 메서드를 호출한 이벤트 루프에서 실행됩니다. (DB 초기화 이후 호출)
+        """
+        self.db_manager = db_manager
+        self._db_loop = asyncio.get_running_loop()
+
+    def schedule_character_stats_mirror(self):
+        """[rebuild_stats_index] 갱신된 스탯 인덱스를 DB 미러에 반영하도록 예약 (스레드/루프 어디서든 호출 가능)"""
+        if not self.db_manager or not self._db_loop: return None
+        coro = self.sync_character_stats_async(self.db_manager)
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        
+        if running is self._db_loop:
+            self._mirror_future = running.create_task(coro)
+        else:
+            self._mirror_future = asyncio.run_coroutine_threadsafe(coro, self._db_loop)
+        return self._mirror_future
+
+    async def wait_character_stats_mirror(self):
+        """마지막으로 예약된 미러 갱신이 끝날 때까지 대기"""
+        future = self._mirror_future
+        if future is None: return
+        await (future if isinstance(future, asyncio.Future) else asyncio.wrap_future(future))
+
+    def character_stat_rows(self):
+        """Discord ID가 연결된 스탯 캐시 -> character_stats 행 목록"""
+        return [
+            (int(discord_id), stat['name'], stat.get('hp', 0), stat.get('sanity', 0),
+             stat.get('perception', 0), stat.get('intelligence', 0), stat.get('willpower', 0))
+            for discord_id, stat in self._stats_by_id.items()
+            if str(discord_id).isdigit()
+        ]
+
+    async def sync_character_stats_async(self, db_manager):
+        """[Async] 스탯 캐시 -> DB character_stats 미러 (Discord ID 기준 upsert)"""
+        rows = self.character_stat_rows()
+        if not rows: return # 캐시가 비어 있으면 기존 미러 유지
+        
+        try:
+            await db_manager.replace_character_stats(rows)
+            logger.info(f"Mirrored {len(rows)} character stats to DB")
+        except Exception as e:
+            logger.error(f"Error mirroring character stats to DB: {e}")
 
     async def sync_hunger_from_sheet_async(self, db_manager):
         """[Async] 시트 -> DB 허기 동기화"""
         # 1. 시트 데이터 읽기 (스레드)
         updates = await asyncio.to_thread(self.read_hunger_stats_from_sheet)
         
-        # 2. DB 업데이트 (비동기)
+        # 2. 현재 DB 값과 비교해 달라진 컬럼만 추려 컬럼 조합별로 묶음 (lazy 모드: 현재 값을 먼저 기록)
+        await db_manager.user_states.materialize_meters()
+        current = {
+            row[0]: row[1:]
+            for row in await db_manager.fetch_all("SELECT user_id, current_hp, current_sanity, current_hunger FROM user_state")
+        }
+        
+        groups = {} # (컬럼, ...) -> [(값, ..., user_id), ...]
         for update in updates:
-            query_parts = []
-            params = []
-            
-            if update['hp'] is not None:
-                query_parts.append("current_hp = ?")
-                params.append(update['hp'])
-            if update['sp'] is not None:
-                query_parts.append("current_sanity = ?")
-                params.append(update['sp'])
-            if update['hunger'] is not None:
-                query_parts.append("current_hunger = ?")
-                params.append(update['hunger'])
-                
-            if query_parts:
-                params.append(update['user_id'])
-                query = f"UPDATE user_state SET {', '.join(query_parts)} WHERE user_id = ?"
-                await db_manager.execute_query(query, tuple(params))
+            db_row = current.get(update['user_id'])
+            if db_row is None: continue # DB에 없는 유저는 UPDATE 대상이 아님
+            
+            columns = []
+            values = []
+            for key, column, db_value in (('hp', 'current_hp', db_row[0]), ('sp', 'current_sanity', db_row[1]), ('hunger', 'current_hunger', db_row[2])):
+                if update[key] is not None and update[key] != db_value:
+                    columns.append(column)
+                    values.append(update[key])
+            
+            if columns:
+                groups.setdefault(tuple(columns), []).append((*values, update['user_id']))
         
-        logger.info(f"Synced {len(updates)} users from Sheet A to DB")
+        # 3. DB 업데이트 (컬럼 조합별 executemany, 커밋 1회)
+        if groups:
+            await db_manager.execute_batches([
+                (f"UPDATE user_state SET {', '.join(c + ' = ?' for c in columns)} WHERE user_id = ?", params_list)
+                for columns, params_list in groups.items()
+            ])
+            # 메모리 유저 상태 캐시에서 바뀐 유저 무효화
+            db_manager.user_states.invalidate([params[-1] for params_list in groups.values() for params in params_list])
+        
+        changed = sum(len(params_list) for params_list in groups.values())
+        logger.info(f"Synced {len(updates)} users from Sheet A to DB ({changed} changed)")
 
     async def sync_hunger_to_sheet_async(self, db_manager):
         """[Async] DB -> 시트 허기 동기화"""
-        # 1. DB 데이터 비동기 조회
+        # 1. DB 데이터 비동기 조회 (lazy 모드: 현재 값 기록 후 내보내기)
+        await db_manager.user_states.materialize_meters()
         user_states = await db_manager.fetch_all("SELECT user_id, current_hp, current_sanity, current_hunger FROM user_state")
         # 2. 시트 동기화 (스레드)
         return await asyncio.to_thread(self.sync_hunger_to_sheet, user_states)
@@ -865,29 +1306,39 @@ class SheetsManager:
         
         if not user_items: return
         
-        # 2. DB 업데이트 (비동기)
-        # 전체 인벤토리 초기화 후 재삽입 방식이 안전함 (동기화 관점)
-        # 하지만 유저가 접속 중일 수 있으므로 트랜잭션 주의
-        # 여기서는 간단하게 기존 인벤토리 삭제 후 삽입
+        # 2. 마지막 가져오기와 내용이 같으면 생략
+        rows = [(uid, item_name, count) for uid, items in user_items.items() for item_name, count in items.items()]
+        content_hash = hashlib.sha256(json.dumps(sorted(rows), ensure_ascii=False).encode('utf-8')).hexdigest()
+        
         try:
-            await db_manager.execute_query("DELETE FROM user_inventory")
-            
-            for uid, items in user_items.items():
-                for item_name, count in items.items():
-                    await db_manager.execute_query(
-                        "INSERT INTO user_inventory (user_id, item_name, count) VALUES (?, ?, ?)",
-                        (uid, item_name, count)
-                    )
-            logger.info("Synced inventory from Sheet A to DB")
+            if await db_manager.get_world_value('inventory_import_hash') == content_hash:
+                logger.info("Sheet A inventory unchanged since last import. Skipping.")
+                return
+            
+            # 3. 스테이징 테이블 적재 후 한 트랜잭션으로 교체
+            await db_manager.replace_inventory(rows, content_hash)
+            logger.info(f"Synced inventory from Sheet A to DB ({len(rows)} rows)")
         except Exception as e:
             logger.error(f"Error updating DB inventory: {e}")
 
     async def sync_db_inventory_to_sheet_async(self, db_manager):
-        """[Async] DB -> 시트 인벤토리 동기화"""
-        # 1. DB 데이터 조회
-        all_inventories = await db_manager.fetch_all("SELECT user_id, item_name, count FROM user_inventory")
+        """[Async] DB -> 시트 인벤토리 동기화 (마지막 동기화 이후 변경된 유저만)"""
+        # 1. 변경 유저 조회 - 없으면 구글 API를 전혀 호출하지 않음
+        dirty = await db_manager.fetch_dirty_inventory_users()
+        if not dirty: return
+        
+        user_ids = [uid for uid, _ in dirty]
+        placeholders = ",".join("?" * len(user_ids))
+        inventories = await db_manager.fetch_all(
+            f"SELECT user_id, item_name, count FROM user_inventory WHERE user_id IN ({placeholders})",
+            user_ids
+        )
         # 2. 시트 업데이트 (스레드)
-        await asyncio.to_thread(self.sync_db_inventory_to_sheet, db_manager, all_inventories)
+        synced = await asyncio.to_thread(self.sync_db_inventory_to_sheet, user_ids, inventories)
+        
+        # 3. 반영된 변경 표시 해제 (실패 시 다음 주기에 재시도)
+        if synced:
+            await db_manager.clear_dirty_inventory_users(dirty)
 
     async def initialize_worksheets_async(self):
         """[Async] 워크시트 초기화"""
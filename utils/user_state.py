@@ -0,0 +1,237 @@
+import logging
+from utils.meters import LIVE_HUNGER_SQL, LIVE_SANITY_SQL, evaluate_meters, utc_now
+
+logger = logging.getLogger('utils.user_state')
+
+# 레코드 필드 -> user_state 컬럼 (순서 = SELECT/RETURNING 컬럼 순서)
+FIELD_COLUMNS = {
+    "user_id": "user_id",
+    "hp": "current_hp",
+    "sanity": "current_sanity",
+    "hunger": "current_hunger",
+    "infection": "infection",
+    "pollution": "current_pollution",
+    "last_hunger_update": "last_hunger_update",
+    "last_sanity_recovery": "last_sanity_recovery",
+    "hunger_zero_days": "hunger_zero_days",
+    "last_sanity_update": "last_sanity_update",
+}
+STATE_COLUMNS = ", ".join(FIELD_COLUMNS.values())
+
+# 변화량(delta)으로 변경하는 스탯과 기본 상한 (하한은 모두 0)
+# hp/sanity 상한은 유저별 최대 스탯(Sheet A)으로 덮어씁니다.
+STAT_FIELDS = ("hp", "sanity", "hunger", "pollution")
+DEFAULT_MAX = {"hp": 100, "sanity": 80, "hunger": 50, "pollution": 100}
+
+# 현재 미터 모드 (world_state 키, "eager" | "lazy")
+METER_MODE_KEY = "meter_mode"
+
+class UserStateRecord:
+    """user_state 한 행 (메모리 상주용 경량 레코드)"""
+    __slots__ = tuple(FIELD_COLUMNS)
+
+    def __init__(self, row):
+        for field, value in zip(FIELD_COLUMNS, row):
+            setattr(self, field, value)
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in FIELD_COLUMNS}
+
+class UserStateRepository:
+    """
+    user_state 행을 메모리에 유지하는 write-through 저장소입니다.
+    조회는 메모리에서 처리하고, 변경은 DB에 먼저 쓴 뒤 RETURNING 결과로 메모리를 갱신합니다.
+    이 저장소를 거치지 않고 user_state를 직접 수정한 경우 invalidate()를 호출해야 합니다.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self._records = {} # user_id -> UserStateRecord
+        self._loaded_all = False
+        # lazy 모드: 허기/정신력은 기준값 + 경과 시간으로 조회 시 계산하고, 쓰기 직전에만 기록
+        self.lazy_meters = False
+
+    def store(self, row):
+        """DB 행(STATE_COLUMNS 순서)으로 레코드 저장/갱신"""
+        record = UserStateRecord(row)
+        self._records[record.user_id] = record
+        return record
+
+    def invalidate(self, user_ids=None):
+        """메모리 레코드 무효화 (user_ids가 없으면 전체)"""
+        if user_ids is None:
+            self._records.clear()
+            self._loaded_all = False
+            return
+        if isinstance(user_ids, int):
+            user_ids = (user_ids,)
+        for user_id in user_ids:
+            self._records.pop(user_id, None)
+        self._loaded_all = False
+
+    async def load_all(self):
+        """전체 유저 상태를 1회의 SELECT로 적재"""
+        rows = await self.db.fetch_all(f"SELECT {STATE_COLUMNS} FROM user_state")
+        self._records = {}
+        for row in rows:
+            self.store(row)
+        self._loaded_all = True
+        logger.info(f"Loaded {len(self._records)} user states into memory")
+
+    async def all(self):
+        """전체 유저 상태 레코드 목록 (메모리)"""
+        if not self._loaded_all:
+            await self.load_all()
+        return list(self._records.values())
+
+    async def find(self, user_id):
+        """유저 상태 조회 (없으면 생성하지 않고 None)"""
+        record = self._records.get(user_id)
+        if record or self._loaded_all:
+            return record
+
+        row = await self.db.fetch_one(f"SELECT {STATE_COLUMNS} FROM user_state WHERE user_id = ?", (user_id,))
+        return self.store(row) if row else None
+
+    async def get(self, user_id, hp=100, sanity=80, hunger=50):
+        """유저 상태 조회 (없으면 초기값으로 생성) - 생성/조회는 INSERT ... RETURNING 1회"""
+        record = self._records.get(user_id)
+        if record:
+            return record
+
+        rows = await self.db.execute_returning(
+            f"""INSERT INTO user_state (user_id, current_hp, current_sanity, current_hunger, last_hunger_update, last_sanity_update)
+                VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+                ON CONFLICT(user_id) DO UPDATE SET user_id = excluded.user_id
+                RETURNING {STATE_COLUMNS}""",
+            (user_id, hp, sanity, hunger)
+        )
+        return self.store(rows[0])
+
+    async def ensure(self, defaults):
+        """
+        여러 유저의 상태 행을 보장 (메모리에 없는 유저만 INSERT ... RETURNING 1회)
+        defaults: {user_id: (hp, sanity, hunger)} - 새로 만드는 행의 초기값
+        """
+        missing = [user_id for user_id in defaults if user_id not in self._records]
+        if not missing: return
+        
+        values = ", ".join(["(?, ?, ?, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)"] * len(missing))
+        params = [value for user_id in missing for value in (user_id, *defaults[user_id])]
+        rows = await self.db.execute_returning(
+            f"""INSERT INTO user_state (user_id, current_hp, current_sanity, current_hunger, last_hunger_update, last_sanity_update)
+                VALUES {values}
+                ON CONFLICT(user_id) DO UPDATE SET user_id = excluded.user_id
+                RETURNING {STATE_COLUMNS}""",
+            params
+        )
+        for row in rows:
+            self.store(row)
+
+    async def update(self, user_id, **fields):
+        """필드 값 변경 (write-through). 행이 없으면 None"""
+        assignments = ", ".join(f"{FIELD_COLUMNS[field]} = ?" for field in fields)
+        rows = await self.db.execute_returning(
+            f"UPDATE user_state SET {assignments} WHERE user_id = ? RETURNING {STATE_COLUMNS}",
+            (*fields.values(), user_id)
+        )
+        return self.store(rows[0]) if rows else None
+
+    async def apply_deltas(self, deltas, max_values=None):
+        """
+        여러 유저의 스탯 변화량을 SQL 1문장으로 적용합니다. (0 ~ 상한으로 제한)
+        deltas: {user_id: {"hp": -5, "sanity": 3, ...}}
+        max_values: {user_id: {"hp": 최대 체력, ...}} (없으면 DEFAULT_MAX)
+        반환: {user_id: 변경 후 UserStateRecord} - user_state 행이 없는 유저는 제외
+        """
+        deltas = {user_id: changes for user_id, changes in deltas.items() if any(changes.get(f) for f in STAT_FIELDS)}
+        if not deltas: return {}
+        max_values = max_values or {}
+        
+        values = []
+        params = []
+        for user_id, changes in deltas.items():
+            limits = {**DEFAULT_MAX, **max_values.get(user_id, {})}
+            values.append(f"({', '.join(['?'] * (1 + 2 * len(STAT_FIELDS)))})")
+            # 변화가 없는 스탯은 NULL로 두어 기존 값을 그대로 유지
+            params.append(user_id)
+            params.extend(changes.get(field) or None for field in STAT_FIELDS)
+            params.extend(limits[field] for field in STAT_FIELDS)
+        
+        cte_columns = ", ".join(["uid"] + [f"d_{f}" for f in STAT_FIELDS] + [f"m_{f}" for f in STAT_FIELDS])
+        assignments = ",\n                ".join(
+            f"{FIELD_COLUMNS[f]} = CASE WHEN d.d_{f} IS NULL THEN {FIELD_COLUMNS[f]} "
+            f"ELSE MAX(0, MIN(d.m_{f}, COALESCE({FIELD_COLUMNS[f]}, 0) + d.d_{f})) END"
+            for f in STAT_FIELDS
+        )
+        rows = await self.db.execute_returning(
+            f"""WITH d({cte_columns}) AS (VALUES {", ".join(values)})
+            UPDATE user_state SET
+                {assignments}
+            FROM d WHERE user_state.user_id = d.uid
+            RETURNING {STATE_COLUMNS}""",
+            params
+        )
+        return {row[0]: self.store(row) for row in rows}
+
+    # --- Lazy Meters ---
+
+    def live_values(self, record, stats, now=None):
+        """현재 허기/정신력 (lazy 모드면 경과 시간 반영, 아니면 저장 값)"""
+        if not self.lazy_meters:
+            return record.hunger, record.sanity
+        return evaluate_meters(
+            record.hunger, record.sanity, record.last_hunger_update, record.last_sanity_update,
+            record.hunger_zero_days, stats, now
+        )
+
+    async def materialize_meters(self, now=None, user_ids=None, condition=None):
+        """
+        [lazy] 계산된 현재 허기/정신력을 DB에 기록하고 기준 시각을 now로 옮깁니다. (UPDATE 1문장)
+        허기/정신력을 직접 쓰기 전에 호출해야 경과분이 유실되지 않습니다. eager 모드에서는 아무것도 하지 않습니다.
+        반환: {user_id: UserStateRecord}
+        """
+        if not self.lazy_meters: return {}
+        params = {"now": now or utc_now()}
+        filters = ["c.user_id = user_state.user_id"]
+        if user_ids is not None:
+            if not user_ids: return {}
+            names = [f":u{i}" for i in range(len(user_ids))]
+            params.update({name[1:]: user_id for name, user_id in zip(names, user_ids)})
+            filters.append(f"user_state.user_id IN ({', '.join(names)})")
+        if condition:
+            filters.append(condition)
+        
+        rows = await self.db.execute_returning(
+            f"""UPDATE user_state SET
+                current_hunger = {LIVE_HUNGER_SQL},
+                current_sanity = {LIVE_SANITY_SQL},
+                last_hunger_update = MAX(:now, COALESCE(last_hunger_update, :now)),
+                last_sanity_update = MAX(:now, COALESCE(last_sanity_update, :now))
+            FROM character_stats c WHERE {' AND '.join(filters)}
+            RETURNING {STATE_COLUMNS}""",
+            params
+        )
+        return {row[0]: self.store(row) for row in rows}
+
+    async def prepare_meters(self, lazy, now=None):
+        """
+        미터 모드 설정 (시작 시 1회)
+        eager -> lazy: 모든 기준 시각을 now로 맞춤 / lazy -> eager: 경과분을 기록한 뒤 전환
+        """
+        mode = "lazy" if lazy else "eager"
+        previous = await self.db.get_world_value(METER_MODE_KEY) or "eager"
+        if previous != mode:
+            now = now or utc_now()
+            async with self.db.transaction():
+                if lazy:
+                    await self.db.execute_query(
+                        "UPDATE user_state SET last_hunger_update = ?, last_sanity_update = ?", (now, now)
+                    )
+                else:
+                    self.lazy_meters = True
+                    await self.materialize_meters(now)
+                await self.db.set_world_value(METER_MODE_KEY, mode)
+            self.invalidate()
+            logger.info(f"Switched survival meters from {previous} to {mode}")
+        self.lazy_meters = lazy
@@ -0,0 +1,116 @@
+import logging
+
+logger = logging.getLogger('utils.world_graph')
+
+class WorldGraph:
+    """
+    조사 지역 트리(build_investigation_map 결과)를 노드 ID 기준으로 컴파일한 클래스입니다.
+    노드 dict는 그대로 공유하고, ID -> 노드 / 부모 ID / 깊이 / 소속 지역을 미리 계산해
+    돌아가기 버튼과 채널 이동을 트리 탐색 없이 처리합니다.
+    """
+
+    def __init__(self, world_map=None):
+        self.roots = {} # 지역(카테고리) 이름 -> 루트 노드
+        self.nodes = {} # node_id -> 노드
+        self.parents = {} # node_id -> 부모 node_id (루트는 없음)
+        self.depths = {} # node_id -> 깊이 (루트 0)
+        self.categories = {} # node_id -> 지역 이름
+        self.channel_bindings = {} # node_id -> 채널 ID (is_channel 노드)
+        self.missing_channels = set() # 바인딩 시 채널을 찾지 못한 node_id (다음 바인딩까지 재조회 안 함)
+        self._bound_guild_id = None
+        if world_map:
+            self.compile(world_map)
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def compile(self, world_map):
+        """지역 트리를 한 번 순회하여 인덱스를 구성합니다."""
+        roots, nodes, parents, depths, categories = {}, {}, {}, {}, {}
+        duplicates = 0
+        
+        for category_name, root in world_map.items():
+            roots[category_name] = root
+            stack = [(root, None, 0)]
+            while stack:
+                node, parent_id, depth = stack.pop()
+                node_id = node.get("id")
+                if node_id in nodes:
+                    duplicates += 1
+                    continue
+                nodes[node_id] = node
+                depths[node_id] = depth
+                categories[node_id] = category_name
+                if parent_id is not None:
+                    parents[node_id] = parent_id
+                for child in node.get("children", {}).values():
+                    stack.append((child, node_id, depth + 1))
+        
+        if duplicates:
+            logger.warning(f"[compile] 중복된 노드 ID {duplicates}개는 첫 노드만 사용합니다.")
+        
+        self.roots = roots
+        self.nodes = nodes
+        self.parents = parents
+        self.depths = depths
+        self.categories = categories
+        self.channel_bindings = {}
+        self.missing_channels = set()
+        self._bound_guild_id = None
+        logger.debug(f"[compile] 조사 그래프 컴파일 - 지역 {len(roots)}개, 노드 {len(nodes)}개")
+
+    def node(self, node_id):
+        return self.nodes.get(node_id)
+
+    def parent(self, node_id):
+        """상위 노드 (루트이거나 없는 노드면 None)"""
+        parent_id = self.parents.get(node_id)
+        return self.nodes.get(parent_id) if parent_id is not None else None
+
+    def depth(self, node_id):
+        return self.depths.get(node_id)
+
+    def bind_channels(self, guild):
+        """
+        채널급 노드(is_channel)를 같은 이름의 길드 채널 ID에 연결 (길드 채널 1회 순회)
+        조사 데이터 갱신 직후 호출하며, 채널이 없는 노드는 missing_channels에 기록합니다.
+        """
+        by_name = {}
+        for channel in guild.channels:
+            by_name.setdefault(channel.name, channel.id)
+        
+        bindings, missing = {}, set()
+        for node_id, node in self.nodes.items():
+            if not node.get("is_channel"):
+                continue
+            if node.get("name") in by_name:
+                bindings[node_id] = by_name[node["name"]]
+            else:
+                missing.add(node_id)
+        
+        self.channel_bindings = bindings
+        self.missing_channels = missing
+        self._bound_guild_id = guild.id
+        if missing:
+            logger.warning(f"[bind_channels] 채널을 찾지 못한 노드 {len(missing)}개: {sorted(missing)}")
+
+    def channel_for(self, guild, node):
+        """
+        노드와 연결된 채널 (없으면 None).
+        바인딩 때 없던 채널은 다음 바인딩까지 다시 찾지 않고, 연결된 채널이 삭제/이름 변경된 경우만 1회 다시 연결합니다.
+        """
+        if self._bound_guild_id != guild.id:
+            # 갱신 시점에 바인딩되지 않은 경우(캐시 로드 직후 등)만 여기서 연결
+            self.bind_channels(guild)
+        
+        node_id = node.get("id")
+        if node_id in self.missing_channels:
+            return None
+        
+        channel_id = self.channel_bindings.get(node_id)
+        channel = guild.get_channel(channel_id) if channel_id else None
+        if channel is None or channel.name != node.get("name"):
+            self.bind_channels(guild)
+            channel_id = self.channel_bindings.get(node.get("id"))
+            channel = guild.get_channel(channel_id) if channel_id else None
+        return channel